@@ -1,7 +1,16 @@
+import collections
+
+
 class Anomaly(dict):
     """
     Description: 	Anomaly is an abstract class to be overriden for a specific anomaly and its type.
 
+    Symptoms are kept in a bounded ring (see `add_symptom()`) together with aggregated
+    `symptoms_count`, `ts_first_symptom`, `ts_last_symptom` and `last_symptom_status`,
+    so a long-running anomaly doesn't grow without limit.
+
+    Fields set since the last `to_document()` are tracked, so only changes can be persisted.
+
     :return:
 
     Implement: TYPE, on_tick
@@ -12,6 +21,21 @@ class Anomaly(dict):
 
     TYPE = None
 
+    __slots__ = ("Changed", "Persisted")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.Changed = set(self.keys())
+        self.Persisted = False
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.Changed.add(key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
     def is_closed(self):
         """
         Description:
@@ -32,6 +56,65 @@ class Anomaly(dict):
         self["D"] = self["ts_end"] - self["@timestamp"]
         self["status"] = "closed"
 
+    def add_symptom(self, symptom, max_symptoms=100):
+        """
+        Description: Appends the symptom into the ring of last `max_symptoms` symptoms and updates the aggregates.
+
+        """
+        symptoms = self.get("symptoms")
+        if "symptoms_count" not in self:
+            # Aggregates of symptoms stored without them
+            self["symptoms_count"] = 0
+            for previous in symptoms if symptoms is not None else ():
+                self._aggregate(previous)
+
+        if (
+            not isinstance(symptoms, collections.deque)
+            or symptoms.maxlen != max_symptoms
+        ):
+            symptoms = collections.deque(
+                symptoms if symptoms is not None else (), maxlen=max_symptoms
+            )
+            super().__setitem__("symptoms", symptoms)
+
+        symptoms.append(symptom)
+        self.Changed.add("symptoms")
+        self._aggregate(symptom)
+
+    def _aggregate(self, symptom):
+        self["symptoms_count"] += 1
+        timestamp = symptom.get("@timestamp")
+        if timestamp is None:
+            return
+
+        if timestamp < self.get("ts_first_symptom", timestamp + 1):
+            self["ts_first_symptom"] = timestamp
+
+        if timestamp >= self.get("ts_last_symptom", timestamp):
+            self["ts_last_symptom"] = timestamp
+            self["last_symptom_status"] = symptom.get("status", "open")
+
+    def to_document(self, changes_only=False):
+        """
+        Description: Returns the anomaly as a plain dictionary for an external system
+        and clears the tracked changes.
+
+        :return: all fields, or only fields set since the last call when `changes_only` is True
+
+        """
+        keys = self.Changed if changes_only else self.keys()
+        document = {}
+        for key in keys:
+            if key not in self:
+                continue
+            value = self[key]
+            if isinstance(value, collections.deque):
+                value = list(value)
+            document[key] = value
+
+        self.Changed = set()
+        return document
+
     async def on_tick(self, current_time):
         """
         Description:
@@ -39,3 +122,14 @@ class Anomaly(dict):
         :hint: Implement to perform operations on the anomaly, f. e. close.
         """
         raise NotImplementedError()
+
+    def next_tick(self, current_time):
+        """
+        Description:
+
+        :return: time of the next `on_tick()` or None, when it is called on every flush of the storage.
+                `math.inf` means no `on_tick()` until a new symptom is added to the anomaly.
+
+        :hint: Implement to let the storage skip the anomaly until it can change.
+        """
+        return None
@@ -1,7 +1,9 @@
 from .analyzer import Analyzer
 from .timewindowanalyzer import TimeWindowAnalyzer
+from .watermark import Watermark
 from .timedriftanalyzer import TimeDriftAnalyzer
 from .sessionanalyzer import SessionAnalyzer
+from .sessionaccumulator import SessionAccumulator
 from .geoanalyzer import GeoAnalyzer
 from .latch import LatchAnalyzer
 from .analyzingsource import AnalyzingSource
@@ -11,8 +13,10 @@ from .threshold import ThresholdAnalyzer
 __all__ = (
     "Analyzer",
     "TimeWindowAnalyzer",
+    "Watermark",
     "TimeDriftAnalyzer",
     "SessionAnalyzer",
+    "SessionAccumulator",
     "GeoAnalyzer",
     "LatchAnalyzer",
     "AnalyzingSource",
@@ -1,7 +1,10 @@
 import logging
 
+import numpy as np
+
 from .analyzer import Analyzer
 from ..matrix.geomatrix import GeoMatrix, PersistentGeoMatrix
+from ..scheduler import Batcher
 
 
 L = logging.getLogger(__name__)
@@ -14,12 +17,21 @@ class GeoAnalyzer(Analyzer):
     `GeoAnalyzer` operates over the `GeoMatrix` object.
     `matrix_id` is an id of `GeoMatrix` object defined alternatively.
 
+    When `batch_size` is set, positions of events (`get_position()`) are collected and passed
+    to `evaluate_positions()` as arrays, once per `batch_size` positions, `batch_timeout` seconds
+    after the first collected position or when the application stops.
+    By default, `evaluate_positions()` counts the positions into cells of the matrix.
+
     **Config Defaults**
 
     max_lat : 71.26
     min_lat : 23.33
     min_lon : -10.10
     max_lon : 40.6
+    batch_size : 0
+    batch_timeout : 1
+    lat_attribute : lat
+    lon_attribute : lon
 
     """
 
@@ -28,6 +40,10 @@ class GeoAnalyzer(Analyzer):
         "min_lat": 23.33,
         "min_lon": -10.10,
         "max_lon": 40.6,
+        "batch_size": 0,  # 0 evaluates every event by `evaluate()`
+        "batch_timeout": 1,  # Fractions of a second are allowed
+        "lat_attribute": "lat",
+        "lon_attribute": "lon",
     }
 
     def __init__(
@@ -96,3 +112,56 @@ class GeoAnalyzer(Analyzer):
             svc.add_matrix(self.GeoMatrix)
         else:
             self.GeoMatrix = svc.locate_matrix(matrix_id)
+
+        self.LatAttribute = self.Config["lat_attribute"]
+        self.LonAttribute = self.Config["lon_attribute"]
+
+        batch_size = int(self.Config["batch_size"])
+        if batch_size > 0:
+            self.Batcher = Batcher(
+                app,
+                self._evaluate_batch,
+                batch_size,
+                float(self.Config["batch_timeout"]),
+            )
+        else:
+            self.Batcher = None
+
+    def get_position(self, context, event):
+        """
+        Returns the latitude and the longitude of the event, `None` skips the event.
+        """
+        lat = event.get(self.LatAttribute)
+        lon = event.get(self.LonAttribute)
+        if lat is None or lon is None:
+            return None
+        return lat, lon
+
+    def evaluate_positions(self, lats, lons):
+        """
+        Records a batch of positions given by arrays of latitudes and longitudes into the matrix.
+        Counts the positions into cells by default, positions outside of the bbox are skipped.
+        """
+        self.GeoMatrix.add_points(lats, lons)
+
+    def process(self, context, event):
+        if self.Batcher is None:
+            return super().process(context, event)
+
+        if self.predicate(context, event):
+            position = self.get_position(context, event)
+            if position is not None:
+                self.Batcher.append(position)
+
+        return event
+
+    def flush(self):
+        """
+        Evaluates the collected positions.
+        """
+        if self.Batcher is not None:
+            self.Batcher.flush()
+
+    def _evaluate_batch(self, positions):
+        lats, lons = np.array(positions, dtype=np.float64).T
+        self.evaluate_positions(lats, lons)
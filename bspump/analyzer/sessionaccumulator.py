@@ -0,0 +1,79 @@
+import logging
+
+from ..abc.processor import Processor
+from ..scheduler import Batcher
+from ..matrix.sessionmatrix import SessionMatrix
+
+###
+
+L = logging.getLogger(__name__)
+
+###
+
+
+class SessionAccumulator(Processor):
+    """
+    Stores events into a `SessionMatrix` in batches.
+
+    Events pass through unchanged. Their fields that are columns of the matrix (or `keys`, when configured)
+    are collected and stored by `SessionMatrix.store_events()` once per batch, rows are created as needed.
+
+    A batch is stored when it reaches `batch_size` events, `batch_timeout` seconds after its first event
+    or when the application stops.
+
+    `matrix_id` is an id of a `SessionMatrix` registered in the `bspump.PumpService`,
+    a new matrix with `dtype` is created otherwise.
+    """
+
+    ConfigDefaults = {
+        "batch_size": 1000,
+        "batch_timeout": 1,  # Fractions of a second are allowed
+        "keys": "",  # Comma-separated fields to be stored, empty means all columns of the matrix
+    }
+
+    def __init__(
+        self, app, pipeline, matrix_id=None, dtype="float_", id=None, config=None
+    ):
+        super().__init__(app, pipeline, id=id, config=config)
+        svc = app.get_service("bspump.PumpService")
+        if matrix_id is None:
+            self.Sessions = SessionMatrix(app, dtype, id=self.Id + "Matrix")
+            svc.add_matrix(self.Sessions)
+        else:
+            self.Sessions = svc.locate_matrix(matrix_id)
+
+        keys = [key.strip() for key in self.Config["keys"].split(",") if key.strip()]
+        if len(keys) == 0:
+            keys = list(self.Sessions.Array.dtype.names)
+        self.Keys = keys
+        # Fields copied from events, the batch must not change when an event is modified later in the pipeline
+        self.Fields = keys + [self.Sessions.PrimaryName]
+
+        self.Batcher = Batcher(
+            app,
+            self._store,
+            int(self.Config["batch_size"]),
+            float(self.Config["batch_timeout"]),
+        )
+
+        metrics_service = app.get_service("asab.MetricsService")
+        self.Counter = metrics_service.create_counter(
+            "bspump.session.accumulator",
+            tags={"pipeline": pipeline.Id, "processor": self.Id},
+            init_values={"events": 0, "batches": 0},
+        )
+
+    def process(self, context, event):
+        self.Batcher.append({key: event[key] for key in self.Fields if key in event})
+        return event
+
+    def flush(self):
+        """
+        Stores the current batch into the matrix.
+        """
+        self.Batcher.flush()
+
+    def _store(self, batch):
+        self.Sessions.store_events(batch, self.Keys)
+        self.Counter.add("events", len(batch))
+        self.Counter.add("batches", 1)
@@ -32,6 +32,19 @@ class ThresholdAnalyzer(TimeWindowAnalyzer):
 
             alarm method - Configurable, takes arguments.
 
+            Incremental mode (`incremental` enabled) - instead of scanning the whole matrix, the analysis checks only
+                                            cells written by `evaluate()` since the last analysis. Every row keeps a run-length
+                                            counter of consecutive checked values out of bounds, a value within bounds resets it.
+                                            Rows whose run reached `symptom_occurrence` are passed to the alarm method at once:
+                                            `alarm(x, y, counts, indexes)`, where x and y are rows and columns of checked cells
+                                            (sorted by row and column), counts are the longest runs of alarmed rows
+                                            and indexes are positions of the last cells of those runs in x and y.
+                                            A run is extended only by columns after the last column it counted,
+                                            so a cell written again is not counted twice. A cell written again
+                                            in the last counted column replaces its contribution to the run.
+                                            Counters are reset when a row is closed or the matrix is flushed,
+                                            cells written before are dropped.
+
     ...
 
             Threshold settings:
@@ -53,6 +66,8 @@ class ThresholdAnalyzer(TimeWindowAnalyzer):
         "lower_bound": "-inf",  # Lower bound of the threshold
         "upper_bound": "inf",  # Upper bound of the threshold
         "anomaly_occurrence": 1,  # Number of occurrences of anomaly in array
+        "symptom_occurrence": 1,  # Number of symptoms in a row to call the alarm
+        "incremental": False,  # Analyze only cells written since the last analysis
         "analyze_period": 300,  # Launch period of analyze method
     }
 
@@ -92,6 +107,26 @@ class ThresholdAnalyzer(TimeWindowAnalyzer):
 
         self.WarmingUpLimit = int()
 
+        self.Incremental = self.Config.getboolean("incremental")
+        # Cells written since the last analysis, columns are counted from the first column of the matrix
+        # at the time of creation of the analyzer, so that they survive shifts of the time window
+        self.WrittenRows = []
+        self.WrittenColumns = []
+        self.Origin = self.TimeWindow.TimeConfig.get_start()
+        # Length of the current run of symptoms of every row, the last column it counted
+        # and the length of the run before that column, which is continued when the column is written again
+        self.Runs = np.zeros(0, dtype=np.int64)
+        self.RunColumns = np.zeros(0, dtype=np.int64)
+        self.PreviousRuns = np.zeros(0, dtype=np.int64)
+        # Rows closed since the last analysis, cells written to them before are stale
+        self.ClosedAt = {}
+
+        if self.Incremental and hasattr(self.TimeWindow, "PubSub"):
+            self.TimeWindow.PubSub.subscribe(
+                "Matrix rows closed!", self._on_rows_closed
+            )
+            self.TimeWindow.PubSub.subscribe("Matrix reindexed!", self._on_reindexed)
+
     def predicate(self, context, event):
         """
         Description:
@@ -141,38 +176,26 @@ class ThresholdAnalyzer(TimeWindowAnalyzer):
         # Fill matrix with the values
         self.TimeWindow.Array[row, column] = event[self.EventValue]
 
+        if self.Incremental:
+            self.WrittenRows.append(row)
+            self.WrittenColumns.append(column + self._shift())
+
     def analyze(self):
         """
         Description:
 
         """
+        if self.Incremental:
+            self.analyze_incremental()
+            return
+
         # Checking an empty array
         if self.TimeWindow.Array.shape[0] == 0:
             return
 
         data = self.TimeWindow.Array
-        # Warming up the matrix to avoid procedures on not fully filled matrix and resizing warming_up dimension
-        # to avoid ValueError when checking the conditions of exceedance/subceedance/range.
-        self.WarmingUpLimit = self.TimeWindow.Columns - 1
-        warming_up = np.resize(
-            self.TimeWindow.WarmingUpCount <= self.WarmingUpLimit, data.shape
-        )
-
-        # Exceedance
-        if self.Lower == float("-inf") and self.Upper != float("inf"):
-            x, y = np.where((data > self.Upper) & warming_up)
-
-        # Subceedance
-        elif self.Lower != float("-inf") and self.Upper == float("inf"):
-            x, y = np.where((data < self.Lower) & warming_up)
-
-        # Range
-        elif self.Lower != float("-inf") and self.Upper != float("inf"):
-            x, y = np.where(((data < self.Lower) | (data > self.Upper)) & warming_up)
-
-        # No boundaries set
-        else:
-            raise ValueError("Boundaries of the threshold has not been set!")
+        # Warming up the matrix to avoid procedures on not fully filled matrix
+        x, y = np.where(self._symptoms(data) & self._warmed_up()[:, np.newaxis])
 
         # Symptom occurrence detection
         try:
@@ -199,6 +222,143 @@ class ThresholdAnalyzer(TimeWindowAnalyzer):
             if (count >= self.SymptomOccurrence) and (i + 1 == len(x)):
                 self.alarm(x, y, count, i)
 
+    def analyze_incremental(self):
+        """
+        Checks cells written since the last analysis and calls the alarm for rows
+        with `symptom_occurrence` or more consecutive symptoms.
+
+        """
+        if len(self.WrittenRows) == 0:
+            return
+
+        rows = np.array(self.WrittenRows, dtype=np.int64)
+        columns = np.array(self.WrittenColumns, dtype=np.int64)
+        self.WrittenRows = []
+        self.WrittenColumns = []
+
+        data = self.TimeWindow.Array
+        size, width = data.shape[0], data.shape[1]
+        if size < len(self.Runs):
+            # The matrix has been flushed, row indexes are no longer valid
+            self._reset_runs()
+            return
+        elif size > len(self.Runs):
+            self.Runs = _fit(self.Runs, size, 0)
+            self.RunColumns = _fit(self.RunColumns, size, _NO_COLUMN)
+            self.PreviousRuns = _fit(self.PreviousRuns, size, 0)
+
+        # Cells written to a row before it was closed are skipped
+        valid = np.ones(len(rows), dtype=bool)
+        if len(self.ClosedAt) > 0:
+            closed_at = np.zeros(size, dtype=np.int64)
+            closed_at[list(self.ClosedAt.keys())] = list(self.ClosedAt.values())
+            self.ClosedAt = {}
+            valid = np.arange(len(rows)) >= closed_at[rows]
+
+        # So are cells shifted out of the time window, cells of rows warming up
+        # and cells in columns before the last column the run of the row has counted
+        shift = self._shift()
+        valid &= (columns - shift >= 0) & (columns >= self.RunColumns[rows])
+        valid[valid] = self._warmed_up()[rows[valid]]
+        if not np.any(valid):
+            return
+
+        # Every cell is checked once, in the order of rows and columns
+        cells = np.unique(rows[valid] * width + columns[valid] - shift)
+        x = cells // width
+        y = cells % width
+        symptoms = self._symptoms(data[x, y])
+
+        # Run lengths, the first run of every row continues the run from the previous analysis;
+        # when the last counted column is written again, it continues the run before that column instead
+        positions = np.arange(len(cells))
+        first = np.flatnonzero(np.r_[True, x[1:] != x[:-1]])
+        last = np.r_[first[1:], len(cells)] - 1
+        lengths = last - first + 1
+        row_first = np.repeat(first, lengths)
+        rewritten = y[first] + shift == self.RunColumns[x[first]]
+        carry = np.where(rewritten, self.PreviousRuns[x[first]], self.Runs[x[first]])
+        last_reset = np.maximum.accumulate(np.where(symptoms, -1, positions))
+        runs = np.where(
+            last_reset >= row_first,
+            positions - last_reset,
+            positions - row_first + 1 + np.repeat(carry, lengths),
+        )
+        runs[~symptoms] = 0
+        self.PreviousRuns[x[last]] = np.where(lengths > 1, runs[last - 1], carry)
+        self.Runs[x[last]] = runs[last]
+        self.RunColumns[x[last]] = y[last] + shift
+
+        # The longest run of every row and the position of its last cell
+        longest = np.maximum.reduceat(runs, first)
+        alarmed = longest >= self.SymptomOccurrence
+        if not np.any(alarmed):
+            return
+
+        at_longest = runs == np.repeat(longest, lengths)
+        indexes = np.maximum.reduceat(np.where(at_longest, positions, -1), first)
+        self.alarm(x, y, longest[alarmed], indexes[alarmed])
+
+    def _on_rows_closed(self, message_type, row_indexes):
+        for row_index in row_indexes:
+            row_index = int(row_index)
+            if row_index < len(self.Runs):
+                self.Runs[row_index] = 0
+                self.RunColumns[row_index] = _NO_COLUMN
+                self.PreviousRuns[row_index] = 0
+            self.ClosedAt[row_index] = len(self.WrittenRows)
+
+    def _on_reindexed(self, message_type):
+        # Written cells and runs refer to row indexes before the flush
+        self.WrittenRows = []
+        self.WrittenColumns = []
+        self._reset_runs()
+
+    def _reset_runs(self):
+        size = self.TimeWindow.Array.shape[0]
+        self.Runs = np.zeros(size, dtype=np.int64)
+        self.RunColumns = np.full(size, _NO_COLUMN, dtype=np.int64)
+        self.PreviousRuns = np.zeros(size, dtype=np.int64)
+        self.ClosedAt = {}
+
+    def _symptoms(self, data):
+        # Exceedance
+        if self.Lower == float("-inf") and self.Upper != float("inf"):
+            return data > self.Upper
+
+        # Subceedance
+        elif self.Lower != float("-inf") and self.Upper == float("inf"):
+            return data < self.Lower
+
+        # Range
+        elif self.Lower != float("-inf") and self.Upper != float("inf"):
+            return (data < self.Lower) | (data > self.Upper)
+
+        # No boundaries set
+        else:
+            raise ValueError("Boundaries of the threshold has not been set!")
+
+    def _warmed_up(self):
+        """
+        Returns a mask of rows that are warmed up.
+        """
+        self.WarmingUpLimit = self.TimeWindow.Columns - 1
+        return (
+            self.TimeWindow.WarmingUpCount.WUC[: self.TimeWindow.Array.shape[0]]
+            <= self.WarmingUpLimit
+        )
+
+    def _shift(self):
+        """
+        Returns the number of columns the time window advanced since the analyzer was created.
+        """
+        return int(
+            round(
+                (self.TimeWindow.TimeConfig.get_start() - self.Origin)
+                / self.TimeWindow.TimeConfig.get_resolution()
+            )
+        )
+
     def alarm(self, *args):
         """
         Description:
@@ -206,3 +366,13 @@ class ThresholdAnalyzer(TimeWindowAnalyzer):
         """
 
         pass
+
+
+# Column of a run that has not counted any column yet
+_NO_COLUMN = np.iinfo(np.int64).min
+
+
+def _fit(array, size, fill):
+    fitted = np.full(size, fill, dtype=array.dtype)
+    fitted[: len(array)] = array
+    return fitted
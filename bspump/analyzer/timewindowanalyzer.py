@@ -1,7 +1,11 @@
+import heapq
 import logging
+import itertools
 
 from .analyzer import Analyzer
+from .watermark import Watermark
 from ..matrix.timewindowmatrix import TimeWindowMatrix, PersistentTimeWindowMatrix
+from ..matrix.sparsetimewindowmatrix import SparseTimeWindowMatrix
 
 ###
 
@@ -24,11 +28,31 @@ class TimeWindowAnalyzer(Analyzer):
     else manually. Default value is `True`.
     `matrix_id` is an id of `TimeWindowMatrix` object alternatively passed, if not provided, the new matrix will be created with and ID derived from the Analyzer Id
     `analyze_on_clock` enables enables analyzis by timer.
+    `sparse` creates a `SparseTimeWindowMatrix` instead, suitable for many keys with only a few events each.
 
     If the `TimeWindowAnalyzer` is `clock_driven`, the time should be periodically shifted (`on_clock_tick()`). The same
     function runs analyzis, if it's enabled.
+
+    With `event_time` enabled, the window follows timestamps of events (`timestamp_attr`, in seconds) instead of the clock,
+    so a replay of historical data runs at full speed with the same results.
+    The window advances on the `Watermark` of sources of events (`source_attr`, a single source when empty),
+    held back by the slowest one and by `allowed_lateness`.
+    The window starts at the first event and `analyze()` runs every `analyze_period` seconds of the event time,
+    before the window advances.
+    Events ahead of the window held back by a slower source are evaluated later, when the window covers them.
+    Events older than the watermark or the window are late, they are routed to the `late_events_source` internal source
+    (e.g. `LatePipeline.*InternalSource`) or counted in `events.late` and dropped.
     """
 
+    ConfigDefaults = {
+        "event_time": False,  # Advance the window on timestamps of events instead of the clock
+        "timestamp_attr": "@timestamp",
+        "source_attr": "",  # Event attribute distinguishing sources of the watermark
+        "allowed_lateness": 0,  # Seconds an event may come after newer events of its source
+        "idle_timeout": 0,  # Seconds after which a silent source doesn't hold the watermark, 0 means never
+        "late_events_source": "",  # Internal source of late events, empty drops them
+    }
+
     def __init__(
         self,
         app,
@@ -41,6 +65,7 @@ class TimeWindowAnalyzer(Analyzer):
         start_time=None,
         clock_driven=False,
         persistent=False,
+        sparse=False,
         id=None,
         config=None,
     ):
@@ -55,7 +80,18 @@ class TimeWindowAnalyzer(Analyzer):
         svc = app.get_service("bspump.PumpService")
         if matrix_id is None:
             matrix_id = self.Id + "Matrix"
-            if persistent:
+            if sparse:
+                self.TimeWindow = SparseTimeWindowMatrix(
+                    app,
+                    dtype=dtype,
+                    columns=columns,
+                    resolution=resolution,
+                    clock_driven=clock_driven,
+                    start_time=start_time,
+                    id=matrix_id,
+                    config=config,
+                )
+            elif persistent:
                 self.TimeWindow = PersistentTimeWindowMatrix(
                     app,
                     dtype=dtype,
@@ -81,3 +117,110 @@ class TimeWindowAnalyzer(Analyzer):
         else:
             # locate
             self.TimeWindow = svc.locate_matrix(matrix_id)
+
+        self.EventTime = self.Config.getboolean("event_time")
+        assert not (
+            self.EventTime and clock_driven
+        ), "Event-time window cannot be clock driven"
+        self.TimestampAttr = self.Config["timestamp_attr"]
+        self.SourceAttr = self.Config["source_attr"]
+        self.LateEventsSourceId = self.Config["late_events_source"]
+        self.LateEventsSource = None
+        self.Watermark = Watermark(
+            allowed_lateness=float(self.Config["allowed_lateness"]),
+            idle_timeout=float(self.Config["idle_timeout"]),
+        )
+        self.NextAnalysis = None
+        self.PumpService = svc
+
+        # Events ahead of the window held back by a slower source, (timestamp, sequence, context, event)
+        self.Pending = []
+        self.PendingSequence = itertools.count()
+        if self.EventTime:
+            app.PubSub.subscribe("Application.stop!", self._on_application_stop)
+
+    def _on_application_stop(self, _, __):
+        # The end of the stream, the window covers all events
+        if len(self.Pending) > 0:
+            self.TimeWindow.advance(self.Watermark.MaxTimestamp)
+            self._evaluate_pending()
+
+    def process(self, context, event):
+        if not self.EventTime:
+            return super().process(context, event)
+
+        if not self.predicate(context, event):
+            return event
+
+        timestamp = event.get(self.TimestampAttr)
+        if timestamp is None:
+            self.evaluate(context, event)
+            return event
+
+        if self.NextAnalysis is None:
+            # The window starts at the first event
+            self.TimeWindow.reset_window(timestamp)
+            self.NextAnalysis = timestamp + self.AnalyzePeriod
+
+        if (
+            self.Watermark.is_late(timestamp)
+            or timestamp <= self.TimeWindow.TimeConfig.get_end()
+        ):
+            self.on_late_event(context, event)
+            return event
+
+        source = event.get(self.SourceAttr) if self.SourceAttr != "" else None
+        self.advance_event_time(source, timestamp)
+        if timestamp >= self.TimeWindow.TimeConfig.get_start():
+            heapq.heappush(
+                self.Pending, (timestamp, next(self.PendingSequence), context, event)
+            )
+            return event
+
+        self.evaluate(context, event)
+        return event
+
+    def advance_event_time(self, source, timestamp):
+        """
+        Updates the watermark with the event timestamp of the source and advances the window.
+        The window covers the newest event unless its oldest column would pass the watermark,
+        newer events are evaluated once the window covers them.
+        """
+        watermark = self.Watermark.update(source, timestamp)
+        resolution = self.TimeWindow.TimeConfig.get_resolution()
+        target = min(
+            self.Watermark.MaxTimestamp,
+            watermark + max(0, self.TimeWindow.Columns - 2) * resolution,
+        )
+
+        if target >= self.NextAnalysis:
+            self.analyze()
+            self.NextAnalysis = target + self.AnalyzePeriod
+
+        if self.TimeWindow.advance(target) > 0:
+            self._evaluate_pending()
+
+    def _evaluate_pending(self):
+        start = self.TimeWindow.TimeConfig.get_start()
+        while len(self.Pending) > 0 and self.Pending[0][0] < start:
+            _, _, context, event = heapq.heappop(self.Pending)
+            self.evaluate(context, event)
+
+    def on_late_event(self, context, event):
+        """
+        Handles an event older than the watermark, override to change it.
+        """
+        self.TimeWindow.Counters.add("events.late", 1)
+        if self.LateEventsSourceId == "":
+            return
+
+        if self.LateEventsSource is None:
+            self.LateEventsSource = self.PumpService.locate(self.LateEventsSourceId)
+            if self.LateEventsSource is None:
+                raise RuntimeError(
+                    "Cannot locate '{}' in '{}'".format(
+                        self.LateEventsSourceId, self.Id
+                    )
+                )
+
+        self.LateEventsSource.put(context, event, copy_event=True)
@@ -0,0 +1,80 @@
+import time
+import logging
+
+###
+
+L = logging.getLogger(__name__)
+
+###
+
+
+class Watermark(object):
+    """
+    Event-time watermark over one or more sources of events.
+
+    Every source tracks the newest event timestamp it has sent. The watermark is the oldest of these
+    timestamps minus `allowed_lateness`, so the slowest source holds it back.
+    An event older than the watermark is late, all its columns may be gone already.
+
+    A source that sent nothing for `idle_timeout` seconds (of the clock, 0 means never) doesn't hold
+    the watermark, unless all sources are idle.
+
+    .. code-block:: python
+
+            watermark = Watermark(allowed_lateness=30)
+            watermark.update("a", 1000)
+            watermark.update("b", 990)
+            watermark.get()  # 960
+            watermark.is_late(950)  # True
+
+    """
+
+    def __init__(self, allowed_lateness=0.0, idle_timeout=0.0):
+        self.AllowedLateness = allowed_lateness
+        self.IdleTimeout = idle_timeout
+        # source -> [newest event timestamp, time of the last event]
+        self.Sources = {}
+        self.MaxTimestamp = None
+
+    def update(self, source, timestamp):
+        """
+        Records the event timestamp of the source, returns the new watermark.
+        """
+        now = time.time()
+        entry = self.Sources.get(source)
+        if entry is None:
+            self.Sources[source] = [timestamp, now]
+        else:
+            if timestamp > entry[0]:
+                entry[0] = timestamp
+            entry[1] = now
+
+        if self.MaxTimestamp is None or timestamp > self.MaxTimestamp:
+            self.MaxTimestamp = timestamp
+
+        return self.get()
+
+    def get(self):
+        """
+        Returns the watermark, None before the first event.
+        """
+        if len(self.Sources) == 0:
+            return None
+
+        timestamps = None
+        if self.IdleTimeout > 0:
+            active_since = time.time() - self.IdleTimeout
+            timestamps = [
+                timestamp
+                for timestamp, seen in self.Sources.values()
+                if seen >= active_since
+            ]
+
+        if not timestamps:
+            timestamps = [timestamp for timestamp, _ in self.Sources.values()]
+
+        return min(timestamps) - self.AllowedLateness
+
+    def is_late(self, timestamp):
+        watermark = self.get()
+        return watermark is not None and timestamp < watermark
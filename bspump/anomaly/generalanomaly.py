@@ -1,3 +1,5 @@
+import math
+
 from bspump.asab import Config
 
 from ..abc.anomaly import Anomaly
@@ -23,19 +25,27 @@ class GeneralAnomaly(Anomaly):
         }
     )
 
-    def __init__(self):
-        super().__init__()
+    # Parsed from the configuration on the first use, shared by all anomalies of the class
+    CloseRules = None
 
-        self.CloseRules = {}
-        for key_value_str in str(Config["GeneralAnomaly"]["close_rules"]).split(";"):
-            key_value = key_value_str.split(":")
-            self.CloseRules[key_value[0]] = key_value[1]
+    __slots__ = ()
 
-    async def on_tick(self, current_time):
-        if self["status"] == "closed":
-            return
+    def _close_rule(self):
+        close_rules = type(self).CloseRules
+        if close_rules is None:
+            close_rules = {}
+            close_rules_str = str(Config["GeneralAnomaly"]["close_rules"])
+            for key_value_str in close_rules_str.split(";"):
+                key_value = key_value_str.split(":")
+                close_rules[key_value[0]] = key_value[1]
+            type(self).CloseRules = close_rules
 
-        close_rule = self.CloseRules.get(self["type"], self.CloseRules.get("default"))
+        return close_rules.get(self["type"], close_rules.get("default"))
+
+    def _last_symptom(self):
+        if "ts_last_symptom" in self:
+            # Aggregated by `add_symptom()`
+            return self["ts_last_symptom"], self.get("last_symptom_status", "open")
 
         # Obtain last symptom
         last_timestamp = 0
@@ -45,6 +55,14 @@ class GeneralAnomaly(Anomaly):
             if timestamp > last_timestamp:
                 last_timestamp = timestamp
                 last_status = symptom.get("status", "open")
+        return last_timestamp, last_status
+
+    async def on_tick(self, current_time):
+        if self["status"] == "closed":
+            return
+
+        close_rule = self._close_rule()
+        last_timestamp, last_status = self._last_symptom()
 
         if close_rule == "status" and last_status == "closed":
             self["status"] = "closed"
@@ -55,3 +73,15 @@ class GeneralAnomaly(Anomaly):
                 last_timestamp + close_rule_seconds
             ):
                 self["status"] = "closed"
+
+    def next_tick(self, current_time):
+        close_rule = self._close_rule()
+        if close_rule == "status":
+            # Only a new symptom can close the anomaly
+            return math.inf
+
+        last_timestamp, _ = self._last_symptom()
+        if last_timestamp == 0:
+            return math.inf
+
+        return last_timestamp + int(close_rule)
@@ -1,3 +1,5 @@
+import collections
+
 from ..abc.processor import Processor
 
 from .generalanomaly import GeneralAnomaly
@@ -28,8 +30,14 @@ class AnomalyManager(Processor):
     When the symptom contains status set to closed and the anomaly is specified to finish by that flag,
     the anomaly "ts_end" is copied from this symptom and the anomaly object moved from "open" to "closed"
     inside the anomaly storage.
+
+    Only the last `max_symptoms` symptoms are kept in the anomaly, see `Anomaly.add_symptom()`.
     """
 
+    ConfigDefaults = {
+        "max_symptoms": 100,  # Older symptoms are only counted in the aggregates
+    }
+
     def __init__(
         self,
         app,
@@ -43,6 +51,7 @@ class AnomalyManager(Processor):
 
         self.AnomalyStorage = anomaly_storage
         self.AnomalyClasses = anomaly_classes
+        self.MaxSymptoms = int(self.Config["max_symptoms"])
 
         metrics_service = app.get_service("asab.MetricsService")
         self.AnomalyManagerCounter = metrics_service.create_counter(
@@ -67,7 +76,7 @@ class AnomalyManager(Processor):
         anomaly["@timestamp"] = timestamp_started
         anomaly["type"] = anomaly_type
         anomaly["status"] = "open"
-        anomaly["symptoms"] = []
+        anomaly["symptoms"] = collections.deque(maxlen=self.MaxSymptoms)
 
         # Store all key dimensions in top level
         for dim_name, dim_value in key_dimensions.items():
@@ -112,6 +121,8 @@ class AnomalyManager(Processor):
             self.AnomalyStorage["open"][key] = anomaly
 
         # Append symptom to the anomaly
-        self.AnomalyStorage["open"][key]["symptoms"].append(symptom)
+        self.AnomalyStorage["open"][key].add_symptom(symptom, self.MaxSymptoms)
+        # The anomaly is evaluated on the next flush of the storage
+        self.AnomalyStorage["open"].touch(key)
 
         return event
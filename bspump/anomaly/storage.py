@@ -1,11 +1,16 @@
+import math
 import time
+import heapq
 import logging
+import itertools
 import collections
 
 import asyncio
 
 from bspump.asab import Configurable
 
+from ..elasticsearch.connection import ElasticSearchBulk
+from ..elasticsearch.data_feeder import data_feeder_index, data_feeder_update
 from .generalanomaly import GeneralAnomaly
 
 ###
@@ -15,17 +20,167 @@ L = logging.getLogger(__name__)
 ###
 
 
+class OpenAnomalies(dict):
+    """
+    Dictionary of open anomalies indexed by the time of their next `on_tick()` (see `Anomaly.next_tick()`),
+    so that a flush of the storage touches only the anomalies that are due.
+
+    An anomaly is due when its deadline passed, when it was inserted or `touch()`-ed (a new symptom was added),
+    or on every flush, when its `next_tick()` is None.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.Heap = []  # (deadline, sequence, key), outdated entries are skipped
+        self.Deadlines = {}
+        self.Due = set()
+        self.Polled = set()
+        self.Sequence = itertools.count()
+
+    def __setitem__(self, key, anomaly):
+        super().__setitem__(key, anomaly)
+        self.Due.add(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._unschedule(key)
+
+    def pop(self, key, *args):
+        self._unschedule(key)
+        return super().pop(key, *args)
+
+    def clear(self):
+        super().clear()
+        self.Heap = []
+        self.Deadlines.clear()
+        self.Due.clear()
+        self.Polled.clear()
+
+    def touch(self, key):
+        """
+        Marks the anomaly as changed, it is due on the next flush.
+        """
+        if key in self:
+            self.Due.add(key)
+
+    def schedule(self, key, deadline):
+        """
+        Sets the time of the next `on_tick()` of the anomaly, see `Anomaly.next_tick()`.
+        """
+        self._unschedule(key)
+        if deadline is None:
+            self.Polled.add(key)
+        elif not math.isinf(deadline):
+            self.Deadlines[key] = deadline
+            heapq.heappush(self.Heap, (deadline, next(self.Sequence), key))
+
+    def due(self, current_time):
+        """
+        Returns keys of anomalies that are due at `current_time` and removes them from the index,
+        they are expected to be `schedule()`-d again.
+        """
+        keys = self.Due | self.Polled
+        self.Due = set()
+        self.Polled = set()
+
+        while len(self.Heap) > 0 and self.Heap[0][0] <= current_time:
+            deadline, _, key = heapq.heappop(self.Heap)
+            if self.Deadlines.get(key) == deadline:
+                del self.Deadlines[key]
+                keys.add(key)
+
+        # Drop outdated entries once they prevail
+        if len(self.Heap) > 2 * len(self.Deadlines) + 64:
+            self.Heap = [
+                entry for entry in self.Heap if self.Deadlines.get(entry[2]) == entry[0]
+            ]
+            heapq.heapify(self.Heap)
+
+        return keys
+
+    def _unschedule(self, key):
+        self.Deadlines.pop(key, None)
+        self.Due.discard(key)
+        self.Polled.discard(key)
+
+
+class AnomalyFeeder(object):
+    """
+    Bulk items of one anomaly document, it lets the `AnomalyBulk` know the anomaly and the storage it belongs to.
+    """
+
+    __slots__ = ("Storage", "Key", "Anomaly", "Items")
+
+    def __init__(self, storage, key, anomaly, items):
+        self.Storage = storage
+        self.Key = key
+        self.Anomaly = anomaly
+        self.Items = items
+
+    def __iter__(self):
+        return iter(self.Items)
+
+
+class AnomalyBulk(ElasticSearchBulk):
+    """
+    Bulk of anomaly documents, its anomalies are marked persisted only once ElasticSearch accepted the bulk.
+    When any document of the bulk fails, all its anomalies are written again as a whole (see `AnomalyStorage.rewrite()`).
+    Other documents written to the same index through the same connection may share the bulk, they are uploaded as usual.
+    """
+
+    def __init__(self, connection, index, max_size):
+        super().__init__(connection, index, max_size)
+        self.Anomalies = []
+        self.Failed = False
+
+    def consume(self, data_feeder_generator):
+        anomaly = getattr(data_feeder_generator, "Anomaly", None)
+        if anomaly is not None:
+            self.Anomalies.append(
+                (data_feeder_generator.Storage, data_feeder_generator.Key, anomaly)
+            )
+        return super().consume(data_feeder_generator)
+
+    def partial_error_callback(self, response_items):
+        super().partial_error_callback(response_items)
+        self.Failed = True
+
+    async def upload(self, url, session, timeout):
+        success = await super().upload(url, session, timeout)
+        # A bulk that was not delivered is sent again
+        if success:
+            for storage, key, anomaly in self.Anomalies:
+                if self.Failed:
+                    storage.rewrite(key, anomaly)
+                else:
+                    anomaly.Persisted = True
+            self.Anomalies = []
+        return success
+
+
 class AnomalyStorage(Configurable, collections.OrderedDict):
     """
     AnomalyStorage serves to store anomaly objects (see AnomalyManager for details),
     separated to "open" (anomalies that are not closed by status attribute in a symptom) and "closed".
 
-    The closed anomalies are periodically flushed from the storage to an external system.
+    Open anomalies are indexed by the time of their next tick (see `OpenAnomalies`),
+    the periodic flush calls `on_tick()` only on anomalies that are due.
+    Anomalies changed by the flush are bulk-written to ElasticSearch through `es_connection`,
+    the whole anomaly is indexed until ElasticSearch accepts it (see `AnomalyBulk`),
+    later writes update only changed fields (see `Anomaly.to_document()`),
+    anomalies whose write failed are written again on the next flush,
+    closed anomalies are removed from the storage after `closed_anomaly_longevity` seconds, once they are written.
+
+    Open anomalies are loaded from ElasticSearch at startup, page by page using `search_after`.
+
+    `anomaly_storage_pipeline_source` is obsolete, the anomalies are written directly to `output_index`.
     """
 
     ConfigDefaults = {
         "closed_anomaly_longevity": 5,  # Anomalies come pretty often
         "index": "bs_anomaly*",
+        "output_index": "bs_anomaly",  # Index the anomalies are written to
+        "load_page_size": 1000,  # Anomalies fetched by one search request
     }
 
     def __init__(
@@ -33,25 +188,35 @@ class AnomalyStorage(Configurable, collections.OrderedDict):
         app,
         es_connection,
         anomaly_classes=list(),
-        anomaly_storage_pipeline_source="AnomalyStoragePipeline.*InternalSource",
+        anomaly_storage_pipeline_source=None,
         pipeline=None,
         id="AnomalyStorage",
         config=None,
     ):
         super().__init__(config_section_name=id, config=config)
 
-        self["open"] = {}
+        self["open"] = OpenAnomalies()
         self["closed"] = {}
+        # Keys of closed anomalies whose write failed
+        self.Rewrites = set()
 
         self.App = app
         self.Id = id
         self.Pipeline = pipeline
-        self.AnomalyStoragePipelineSource = anomaly_storage_pipeline_source
         self.AnomalyClasses = anomaly_classes
         self.ClosedAnomalyLongevity = int(self.Config["closed_anomaly_longevity"])
         self.Index = str(self.Config["index"])
+        self.OutputIndex = str(self.Config["output_index"])
+        self.LoadPageSize = int(self.Config["load_page_size"])
         self.Connection = es_connection
 
+        if anomaly_storage_pipeline_source is not None:
+            L.warning(
+                "The 'anomaly_storage_pipeline_source' is obsolete, anomalies are written to '{}' index directly.".format(
+                    self.OutputIndex
+                )
+            )
+
         # Subscribe to periodically flush old closed anomalies
         self.App.PubSub.subscribe("Application.tick/300!", self.flush)
 
@@ -73,7 +238,7 @@ class AnomalyStorage(Configurable, collections.OrderedDict):
 
     async def load(self):
         query = {
-            "size": 10000,
+            "size": self.LoadPageSize,
             "query": {
                 "bool": {
                     "must": [
@@ -103,117 +268,174 @@ class AnomalyStorage(Configurable, collections.OrderedDict):
                     ]
                 }
             },
+            # The point in time adds a unique tiebreaker to the sort
             "sort": [{"@timestamp": {"order": "asc"}}],
         }
 
-        url = self.Connection.get_url() + "{}/_search".format(self.Index)
+        loaded = 0
         async with self.Connection.get_session() as session:
-            async with session.post(
-                url, json=query, headers={"Content-Type": "application/json"}
-            ) as response:
-                if response.status != 200:
-                    data = await response.text()
-                    L.error(
-                        "Failed to fetch data from ElasticSearch: {} from {}\n{}".format(
-                            response.status, url, data
-                        )
-                    )
-                    return
-                msg = await response.json()
+            # The point in time keeps pages consistent while anomalies are being written
+            msg = await self._request(
+                session, "POST", "{}/_pit?keep_alive=1m".format(self.Index)
+            )
+            if msg is None:
+                return
+            pit_id = msg["id"]
+
+            try:
+                while True:
+                    query["pit"] = {"id": pit_id, "keep_alive": "1m"}
+                    msg = await self._request(session, "POST", "_search", query)
+                    if msg is None:
+                        return
+
+                    hits = msg["hits"]["hits"]
+                    for hit in hits:
+                        self._load_hit(hit)
+                    loaded += len(hits)
+
+                    if len(hits) < self.LoadPageSize:
+                        break
+
+                    pit_id = msg.get("pit_id", pit_id)
+                    query["search_after"] = hits[-1]["sort"]
 
-        hits = msg["hits"]["hits"]
-        if len(hits) == 0:
+            finally:
+                await self._request(session, "DELETE", "_pit", {"id": pit_id})
+
+        if loaded == 0:
             L.warning("No open anomalies present in ElasticSearch ...")
             return
 
+        L.info("Open anomalies loaded ...")
+
+    async def _request(self, session, method, path, body=None):
+        url = self.Connection.get_url() + path
+        async with session.request(
+            method, url, json=body, headers={"Content-Type": "application/json"}
+        ) as response:
+            if response.status != 200:
+                data = await response.text()
+                L.error(
+                    "Failed to fetch data from ElasticSearch: {} from {}\n{}".format(
+                        response.status, url, data
+                    )
+                )
+                return None
+            return await response.json()
+
+    def _load_hit(self, hit):
         # Save open/future anomalies to the in-memory dictionary
-        for hit in hits:
-            key = hit["_id"]
-            # Prevent backups
-            if not key.startswith("b_"):
-                event = hit["_source"]
-                # Modify timestamp
-                event["@timestamp"] = int(event["@timestamp"] / 1000)
-                # Select proper anomaly class
-                selected_anomaly_class = GeneralAnomaly
-                for anomaly_class in self.AnomalyClasses:
-                    if anomaly_class.TYPE == event["type"]:
-                        selected_anomaly_class = anomaly_class
-                        break
-                # Add all data
-                anomaly = selected_anomaly_class()
-                for a_key, a_value in event.items():
-                    anomaly[a_key] = a_value
-                # Save the anomaly
-                self["open"][key] = anomaly
+        key = hit["_id"]
+        # Prevent backups
+        if key.startswith("b_"):
+            return
 
-        L.info("Open anomalies loaded ...")
+        event = hit["_source"]
+        # Modify timestamp
+        event["@timestamp"] = int(event["@timestamp"] / 1000)
+        # Select proper anomaly class
+        selected_anomaly_class = GeneralAnomaly
+        for anomaly_class in self.AnomalyClasses:
+            if anomaly_class.TYPE == event["type"]:
+                selected_anomaly_class = anomaly_class
+                break
+        # Add all data
+        anomaly = selected_anomaly_class()
+        for a_key, a_value in event.items():
+            anomaly[a_key] = a_value
+        # The anomaly is stored already, only later changes are written
+        anomaly.Persisted = True
+        anomaly.Changed = set()
+        # Save the anomaly
+        self["open"][key] = anomaly
+
+    def rewrite(self, key, anomaly):
+        """
+        Writes the anomaly again, as a whole, on the next flush, its last write failed.
+        """
+        anomaly.Persisted = False
+        if self["open"].get(key) is anomaly:
+            self["open"].touch(key)
+        elif self["closed"].get(key) is anomaly:
+            self.Rewrites.add(key)
 
     async def _on_exit(self, message_type):
         await asyncio.wait(self.LoadTasks)
 
+    def _store(self, key, anomaly):
+        if anomaly.Persisted:
+            # Only fields changed since the last write
+            document = anomaly.to_document(changes_only=True)
+            if len(document) == 0:
+                return
+            data_feeder = data_feeder_update
+        else:
+            # Until the bulk is accepted (see `AnomalyBulk`), the whole anomaly is indexed
+            document = anomaly.to_document()
+            data_feeder = data_feeder_index
+
+        if "@timestamp" in document:
+            # Milliseconds, see `load()`
+            document["@timestamp"] = int(document["@timestamp"] * 1000)
+        self.Connection.consume(
+            self.OutputIndex,
+            AnomalyFeeder(self, key, anomaly, list(data_feeder(document, key))),
+            bulk_class=AnomalyBulk,
+        )
+
     async def flush(self, message_type):
         L.info("Start flushing of closed anomalies ...")
 
         current_time = int(time.time())
+        open_anomalies = self["open"]
 
         # Throttle the parental pipeline
         if self.Pipeline is not None:
             self.Pipeline.throttle(self.Id, True)
 
-        svc = self.App.get_service("bspump.PumpService")
-        anomaly_storage_pipeline_source = svc.locate(self.AnomalyStoragePipelineSource)
-
-        if anomaly_storage_pipeline_source is None:
-            L.warning("The anomaly storage pipeline is not yet ready, skipping ...")
-            return
-
-        keys_to_be_deleted = []
-
-        # Update anomalies & close them, if it is possible
-        for key, anomaly in self["open"].items():
-            await anomaly.on_tick(current_time)
-            if anomaly["status"] == "closed":
-                anomaly.close(current_time)
-                self["closed"][key] = anomaly
-                keys_to_be_deleted.append(key)
-
-        # Remove moved anomalies from the storage
-        for key in keys_to_be_deleted:
-            del self["open"][key]
-
-        keys_to_be_deleted = []
-
-        # FLUSH old closed anomalies to external database
-        await asyncio.sleep(0.01)
-        # Synchronous to make atomic cycle
-        for key, anomaly in self["closed"].items():
-            # Pass anomaly to the storage pipeline
-            context = {
-                "es_id": key,
-            }
-            await anomaly_storage_pipeline_source.put_async(context, anomaly)
-            # Delete the closed anomaly after some time
-            if current_time > anomaly["ts_end"] + self.ClosedAnomalyLongevity:
-                self.AnomalyStorageCounter.add("anomalies.closed.flushed", 1)
-                keys_to_be_deleted.append(key)
-
-        # Remove old closed anomalies from the storage
+        try:
+            # Update anomalies that are due & close them, if it is possible
+            for key in open_anomalies.due(current_time):
+                anomaly = open_anomalies.get(key)
+                if anomaly is None:
+                    continue
+
+                await anomaly.on_tick(current_time)
+                if anomaly["status"] == "closed":
+                    anomaly.close(current_time)
+                    del open_anomalies[key]
+                    self["closed"][key] = anomaly
+                else:
+                    open_anomalies.schedule(key, anomaly.next_tick(current_time))
+                    self.AnomalyStorageCounter.add("anomalies.open.flushed", 1)
+
+                # FLUSH changed anomalies for persistence to external system
+                self._store(key, anomaly)
+
+            # Closed anomalies whose write failed
+            rewrites = self.Rewrites
+            self.Rewrites = set()
+            for key in rewrites:
+                anomaly = self["closed"].get(key)
+                if anomaly is not None:
+                    self._store(key, anomaly)
+
+        finally:
+            if self.Pipeline is not None:
+                self.Pipeline.throttle(self.Id, False)
+
+        # Remove old closed anomalies from the storage, once they have been written
+        keys_to_be_deleted = [
+            key
+            for key, anomaly in self["closed"].items()
+            if anomaly.Persisted
+            and current_time > anomaly["ts_end"] + self.ClosedAnomalyLongevity
+        ]
         for key in keys_to_be_deleted:
             del self["closed"][key]
-
-        # FLUSH open anomalies for persistence to external system
-        await asyncio.sleep(0.01)
-        # Synchronous to make atomic cycle
-        for key, anomaly in self["open"].items():
-            context = {
-                "es_id": key,
-            }
-            await anomaly_storage_pipeline_source.put_async(context, anomaly)
-            self.AnomalyStorageCounter.add("anomalies.open.flushed", 1)
-
-        # Throttle the parental pipeline
-        if self.Pipeline is not None:
-            self.Pipeline.throttle(self.Id, False)
+        self.AnomalyStorageCounter.add(
+            "anomalies.closed.flushed", len(keys_to_be_deleted)
+        )
 
         L.info("End flushing of closed anomalies ...")
@@ -8,6 +8,7 @@ import bspump.asab.web
 import bspump.asab.api
 
 from .service import BSPumpService
+from .scheduler import DeadlineScheduler
 from .__version__ import __version__, __build__
 
 L = logging.getLogger(__name__)
@@ -37,6 +38,7 @@ class BSPumpApplication(Application):
         self.ASABApiService = bspump.asab.api.ApiService(self)
 
         self.PumpService = BSPumpService(self)
+        self.DeadlineScheduler = DeadlineScheduler(self)
         self.WebContainer = None
 
         from bspump.asab.alert import AlertService
@@ -2,6 +2,7 @@ import logging
 import bspump.asab as asab
 
 from .service import MetricsService
+from .sketch import DDSketch
 from .metrics import (
     Metric,
     Gauge,
@@ -10,6 +11,7 @@ from .metrics import (
     DutyCycle,
     AggregationCounter,
     Histogram,
+    QuantileSketch,
     CounterWithDynamicTags,
     AggregationCounterWithDynamicTags,
     HistogramWithDynamicTags,
@@ -30,6 +32,7 @@ class Module(asab.Module):
 
 __all__ = (
     "MetricsService",
+    "DDSketch",
     "Metric",
     "Gauge",
     "Counter",
@@ -37,6 +40,7 @@ __all__ = (
     "DutyCycle",
     "AggregationCounter",
     "Histogram",
+    "QuantileSketch",
     "CounterWithDynamicTags",
     "AggregationCounterWithDynamicTags",
     "HistogramWithDynamicTags",
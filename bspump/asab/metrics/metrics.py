@@ -1,7 +1,9 @@
 import abc
+import bisect
 import copy
 import time
 from .. import Config
+from .sketch import DDSketch
 
 
 class Metric(abc.ABC):
@@ -10,6 +12,9 @@ class Metric(abc.ABC):
         self.Storage = None
         self.StaticTags = dict()
 
+        # Cached copy of the storage "reset" flag, so that hot paths don't have to look it up
+        self.Reset = None
+
         # Expiration is relevant only to WithDynamicTagsMixIn metrics
         self.Expiration = float(Config.get("asab:metrics", "expiration"))
 
@@ -18,6 +23,7 @@ class Metric(abc.ABC):
         storage["type"] = self.__class__.__name__
 
         self.Storage = storage
+        self.Reset = storage.get("reset")
         self.add_field(self.StaticTags)
 
     def add_field(self, tags):
@@ -83,12 +89,10 @@ class Counter(Metric):
                 self._actuals[name] = init_value + value
             else:
                 self._actuals[name] = value
-        if not self.Storage.get("reset"):
-            self._field["measured_at"] = self.App.time()
 
     def sub(self, name: str, value, init_value: dict = None):
         """
-        The function subtracts a value from a variable and updates the 'measured_at' field.
+        The function subtracts a value from a variable.
 
         Args:
                 name (str): The name of the variable or field that you want to subtract the value from.
@@ -105,12 +109,11 @@ class Counter(Metric):
                 self._actuals[name] = init_value - value
             else:
                 self._actuals[name] = -value
-        if not self.Storage.get("reset"):
-            self._field["measured_at"] = self.App.time()
 
     def flush(self, now):
-        if self.Storage.get("reset") is True:
-            self._field["measured_at"] = now
+        # The timestamp is taken once per flush, not on every add() / sub()
+        self._field["measured_at"] = now
+        if self.Reset is True:
             for field in self.Storage["fieldset"]:
                 field["values"] = field["actuals"]
                 if self.Init is not None:
@@ -144,12 +147,10 @@ class EPSCounter(Counter):
         if delta <= 0.0:
             return
 
-        reset = self.Storage.get("reset")
-
         for field in self.Storage["fieldset"]:
             field["values"] = {k: int(v / delta) for k, v in self._actuals.items()}
 
-            if reset is True:
+            if self.Reset is True:
                 if self.Init is not None:
                     field["actuals"] = self.Init.copy()
                 else:
@@ -276,8 +277,6 @@ class AggregationCounter(Counter):
                 name: Name of the value being set.
                 value: Value that you want to set for the given name.
         """
-        if not self.Storage.get("reset"):
-            self._field["measured_at"] = self.App.time()
         try:
             self._actuals[name] = self.Aggregator(value, self._actuals[name])
         except KeyError:
@@ -312,6 +311,8 @@ class Histogram(Metric):
         if len(_buckets) < 2:
             raise ValueError("Must have at least two buckets")
 
+        # Sorted upper bounds, used to bisect into the first matching bucket
+        self.Bounds = _buckets
         self.InitBuckets = {b: dict() for b in _buckets}
         self.Count = 0
         self.Sum = 0.0
@@ -338,8 +339,8 @@ class Histogram(Metric):
         return field
 
     def flush(self, now):
-        if self.Storage.get("reset") is True:
-            self._field["measured_at"] = now
+        self._field["measured_at"] = now
+        if self.Reset is True:
             for field in self.Storage["fieldset"]:
                 field["values"] = field["actuals"]
                 field["actuals"] = copy.deepcopy(self.InitHistogram)
@@ -356,19 +357,80 @@ class Histogram(Metric):
                 value_name: String that represents the name of the value being set.
                 value: Value that needs to be set.
         """
-        if not self.Storage.get("reset"):
-            self._field["measured_at"] = self.App.time()
-        buckets = self._actuals["buckets"]
-        summary = self._actuals["sum"]
-        count = self._actuals["count"]
-        for upper_bound in buckets:
-            if value <= upper_bound:
-                if buckets[upper_bound].get(value_name) is None:
-                    buckets[upper_bound][value_name] = 1
-                else:
-                    buckets[upper_bound][value_name] += 1
-        self._actuals["sum"] = summary + value
-        self._actuals["count"] = count + 1
+        actuals = self._actuals
+        buckets = actuals["buckets"]
+        bounds = self.Bounds
+        # Buckets are cumulative, so every bucket from the first matching one up to +Inf is incremented
+        for i in range(bisect.bisect_left(bounds, value), len(bounds)):
+            bucket = buckets[bounds[i]]
+            bucket[value_name] = bucket.get(value_name, 0) + 1
+        actuals["sum"] += value
+        actuals["count"] += 1
+
+
+class QuantileSketch(Metric):
+    """
+    Tracks quantiles of the observed values using mergeable DDSketch sketches.
+    Values are reported as `<name>.p<quantile>` (e.g. `duration.p99`) and `<name>.count`.
+    """
+
+    def __init__(self, quantiles=(0.5, 0.9, 0.99), relative_accuracy=0.01):
+        super().__init__()
+        self.Quantiles = tuple(quantiles)
+        self.RelativeAccuracy = relative_accuracy
+        self.Sketches = dict()
+
+    def add_field(self, tags):
+        field = {
+            "tags": tags,
+            "values": dict(),
+            "measured_at": self.App.time(),
+        }
+        self.Storage["fieldset"].append(field)
+        self._field = field
+        return field
+
+    def add(self, name: str, value):
+        """
+        The function adds an observed value to the sketch of the given value name.
+
+        Args:
+                name (str): Name of the value, e.g. "latency".
+                value: Observed value, e.g. a duration in seconds.
+        """
+        try:
+            self.Sketches[name].add(value)
+        except KeyError:
+            sketch = DDSketch(relative_accuracy=self.RelativeAccuracy)
+            sketch.add(value)
+            self.Sketches[name] = sketch
+
+    def quantiles(self, name: str):
+        """
+        Returns a dictionary with current estimates of configured quantiles for the given value name.
+        """
+        sketch = self.Sketches.get(name)
+        if sketch is None:
+            return {}
+        return self._summarize(name, sketch)
+
+    def _summarize(self, name, sketch):
+        values = {
+            "{}.p{:g}".format(name, q * 100): sketch.quantile(q) for q in self.Quantiles
+        }
+        values["{}.count".format(name)] = sketch.Count
+        return values
+
+    def flush(self, now):
+        self._field["measured_at"] = now
+        values = dict()
+        for name, sketch in self.Sketches.items():
+            if sketch.Count > 0:
+                values.update(self._summarize(name, sketch))
+        self._field["values"] = values
+
+        if self.Reset is True:
+            self.Sketches = dict()
 
 
 ###
@@ -382,6 +444,7 @@ class MetricWithDynamicTags(Metric):
             }
         )
         self.Storage = storage
+        self.Reset = storage.get("reset")
         if self.Init is not None:
             self.add_field(self.StaticTags.copy())
 
@@ -434,9 +497,6 @@ class CounterWithDynamicTags(MetricWithDynamicTags):
         except KeyError:
             actuals[name] = value
 
-        if self.Storage.get("reset") is False:
-            field["measured_at"] = self.App.time()
-
         field["expires_at"] = self.App.time() + self.Expiration
 
     def sub(self, name, value, tags):
@@ -459,9 +519,6 @@ class CounterWithDynamicTags(MetricWithDynamicTags):
         except KeyError:
             actuals[name] = -value
 
-        if self.Storage.get("reset") is False:
-            field["measured_at"] = self.App.time()
-
         field["expires_at"] = self.App.time() + self.Expiration
 
     def flush(self, now):
@@ -470,17 +527,18 @@ class CounterWithDynamicTags(MetricWithDynamicTags):
             if field["expires_at"] < now:
                 self.Storage["fieldset"].remove(field)
 
-        if self.Storage.get("reset") is True:
+        if self.Reset is True:
             for field in self.Storage["fieldset"]:
                 field["values"] = field["actuals"]
                 if self.Init is not None:
                     field["actuals"] = self.Init.copy()
                 else:
                     field["actuals"] = dict()
-                field["measured_at"] = self.App.time()
+                field["measured_at"] = now
         else:
             for field in self.Storage["fieldset"]:
                 field["values"] = field["actuals"].copy()
+                field["measured_at"] = now
 
 
 class AggregationCounterWithDynamicTags(CounterWithDynamicTags):
@@ -505,9 +563,6 @@ class AggregationCounterWithDynamicTags(CounterWithDynamicTags):
         except KeyError:
             actuals[name] = value
 
-        if self.Storage.get("reset") is False:
-            field["measured_at"] = self.App.time()
-
         field["expires_at"] = self.App.time() + self.Expiration
 
     def add(self, name, value, tags):
@@ -539,6 +594,8 @@ class HistogramWithDynamicTags(MetricWithDynamicTags):
         if len(_buckets) < 2:
             raise ValueError("Must have at least two buckets")
 
+        # Sorted upper bounds, used to bisect into the first matching bucket
+        self.Bounds = _buckets
         self.InitBuckets = {b: dict() for b in _buckets}
         self.Count = 0
         self.Sum = 0.0
@@ -569,14 +626,15 @@ class HistogramWithDynamicTags(MetricWithDynamicTags):
             if field["expires_at"] < now:
                 self.Storage["fieldset"].remove(field)
 
-        if self.Storage.get("reset") is True:
+        if self.Reset is True:
             for field in self.Storage["fieldset"]:
                 field["values"] = field["actuals"]
                 field["actuals"] = copy.deepcopy(self.InitHistogram)
-                field["measured_at"] = self.App.time()
+                field["measured_at"] = now
         else:
             for field in self.Storage["fieldset"]:
                 field["values"] = copy.deepcopy(field["actuals"])
+                field["measured_at"] = now
 
     def set(self, value_name, value, tags: dict):
         """
@@ -588,19 +646,13 @@ class HistogramWithDynamicTags(MetricWithDynamicTags):
                 tags (dict): Dynamic tags appliying to this value.
         """
         field = self.locate_field(tags)
-        buckets = field.get("actuals").get("buckets")
-        summary = field.get("actuals").get("sum")
-        count = field.get("actuals").get("count")
-        for upper_bound in buckets:
-            if value <= upper_bound:
-                if buckets[upper_bound].get(value_name) is None:
-                    buckets[upper_bound][value_name] = 1
-                else:
-                    buckets[upper_bound][value_name] += 1
-        field.get("actuals")["sum"] = summary + value
-        field.get("actuals")["count"] = count + 1
-
-        if self.Storage.get("reset") is False:
-            field["measured_at"] = self.App.time()
+        actuals = field["actuals"]
+        buckets = actuals["buckets"]
+        bounds = self.Bounds
+        for i in range(bisect.bisect_left(bounds, value), len(bounds)):
+            bucket = buckets[bounds[i]]
+            bucket[value_name] = bucket.get(value_name, 0) + 1
+        actuals["sum"] += value
+        actuals["count"] += 1
 
         field["expires_at"] = self.App.time() + self.Expiration
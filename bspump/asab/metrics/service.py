@@ -13,6 +13,7 @@ from .metrics import (
     DutyCycle,
     AggregationCounter,
     Histogram,
+    QuantileSketch,
     CounterWithDynamicTags,
     AggregationCounterWithDynamicTags,
     HistogramWithDynamicTags,
@@ -409,3 +410,37 @@ class MetricsService(Service):
             m = Histogram(buckets=buckets, init_values=init_values)
         self._add_metric(m, metric_name, tags=tags, reset=reset, help=help, unit=unit)
         return m
+
+    def create_quantile_sketch(
+        self,
+        metric_name,
+        tags=None,
+        quantiles=(0.5, 0.9, 0.99),
+        relative_accuracy=0.01,
+        reset: bool = True,
+        help=None,
+        unit=None,
+    ):
+        """
+        The function creates a quantile sketch metric.
+
+        Args:
+                metric_name (str): The name of the metric you want to create.
+                tags (dict): Dictionary where the keys represent the tag names and the values represent the tag values. It allows you
+                        to categorize and filter metrics based on different dimensions or attributes.
+                quantiles (tuple): Quantiles (0.0 - 1.0) that are reported for every value name. Defaults to (0.5, 0.9, 0.99)
+                relative_accuracy (float): Relative accuracy of the reported quantiles. Defaults to 0.01
+                reset (bool): The "reset" parameter is a boolean value that determines whether the sketch should
+                        be reset every 60 seconds. Defaults to True
+                help (str): The "help" parameter is used to provide a description or explanation of the metric.
+                unit (str): The "unit" parameter is used to specify the unit of measurement for the metric.
+
+        Returns:
+                a quantile sketch object
+
+        Raises:
+                AssertionError: `tags` dictionary has to be of type 'str': 'str'.
+        """
+        m = QuantileSketch(quantiles=quantiles, relative_accuracy=relative_accuracy)
+        self._add_metric(m, metric_name, tags=tags, reset=reset, help=help, unit=unit)
+        return m
@@ -0,0 +1,90 @@
+import math
+
+
+class DDSketch(object):
+    """
+    Mergeable quantile sketch with a relative accuracy guarantee (DDSketch).
+
+    Positive values are counted in logarithmically sized bins, so a quantile is estimated
+    within `relative_accuracy` of the true value. The number of bins is bounded by the
+    logarithmic range of the observed values, not by the number of observations.
+    Two sketches with the same accuracy can be merged by adding up their bins.
+
+    https://arxiv.org/abs/1908.10693
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        if not 0.0 < relative_accuracy < 1.0:
+            raise ValueError("Relative accuracy must be between 0 and 1")
+
+        self.RelativeAccuracy = relative_accuracy
+        self.Gamma = (1.0 + relative_accuracy) / (1.0 - relative_accuracy)
+        self.LogGamma = math.log(self.Gamma)
+
+        # Values below this threshold (including zero and negative ones) are counted as zero
+        self.MinValue = min_value
+
+        self.Bins = dict()
+        self.ZeroCount = 0
+        self.Count = 0
+        self.Sum = 0.0
+        self.Min = float("inf")
+        self.Max = float("-inf")
+
+    def add(self, value):
+        if value > self.MinValue:
+            key = math.ceil(math.log(value) / self.LogGamma)
+            bins = self.Bins
+            bins[key] = bins.get(key, 0) + 1
+        else:
+            self.ZeroCount += 1
+
+        self.Count += 1
+        self.Sum += value
+        if value < self.Min:
+            self.Min = value
+        if value > self.Max:
+            self.Max = value
+
+    def merge(self, other):
+        """
+        Adds all observations of the `other` sketch into this one.
+        """
+        if other.Gamma != self.Gamma:
+            raise ValueError("Cannot merge sketches with a different relative accuracy")
+
+        bins = self.Bins
+        for key, count in other.Bins.items():
+            bins[key] = bins.get(key, 0) + count
+
+        self.ZeroCount += other.ZeroCount
+        self.Count += other.Count
+        self.Sum += other.Sum
+        self.Min = min(self.Min, other.Min)
+        self.Max = max(self.Max, other.Max)
+
+    def quantile(self, q):
+        """
+        Returns the estimated value at the quantile `q` (0.0 - 1.0) or None if the sketch is empty.
+        """
+        if self.Count == 0:
+            return None
+
+        if q <= 0.0:
+            return self.Min
+        if q >= 1.0:
+            return self.Max
+
+        rank = q * (self.Count - 1)
+        if rank < self.ZeroCount:
+            return 0.0
+
+        seen = self.ZeroCount
+        for key in sorted(self.Bins):
+            seen += self.Bins[key]
+            if seen > rank:
+                # The middle of the bin in the relative sense
+                value = 2.0 * math.pow(self.Gamma, key) / (self.Gamma + 1.0)
+                return min(max(value, self.Min), self.Max)
+
+        return self.Max
@@ -1,4 +1,5 @@
 from bspump.asab import Service, Config
+import os
 import concurrent.futures
 
 
@@ -26,6 +27,11 @@ class ProactorService(Service):
             thread_name_prefix="AsabProactorThread",
         )
 
+        # The number of threads in the pool, e.g. to split the work into as many parts
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        self.MaxWorkers = max_workers
+
         if Config.get("asab:proactor", "default_executor"):
             self.Loop.set_default_executor(self.Executor)
 
@@ -19,6 +19,13 @@ class PubSub(object):
         self.Subscribers = {}
         self.Loop = app.Loop
 
+        # Resolved dispatch lists per message type, the entry is a tuple (weakref, is_coroutine).
+        # It is rebuilt lazily after subscribe, unsubscribe or when a subscriber is garbage-collected.
+        self._dispatch = {}
+
+        # Pending coalesced messages: coalesce key -> (message_type, args, kwargs)
+        self._coalesced = {}
+
     def subscribe(self, message_type: str, callback: typing.Callable):
         """
         Set `callback` that will be called when `message_type` is received.
@@ -42,15 +49,17 @@ class PubSub(object):
         # If subscribe is a bound method, do special treatment
         # https://stackoverflow.com/questions/53225/how-do-you-check-whether-a-python-method-is-bound-or-not
         if hasattr(callback, "__self__"):
-            callback = weakref.WeakMethod(callback)
+            callback = weakref.WeakMethod(callback, self._on_reference_lost)
         else:
-            callback = weakref.ref(callback)
+            callback = weakref.ref(callback, self._on_reference_lost)
 
         if message_type not in self.Subscribers:
             self.Subscribers[message_type] = [callback]
         else:
             self.Subscribers[message_type].append(callback)
 
+        self._dispatch.pop(message_type, None)
+
     def subscribe_all(self, obj):
         """
         Find all methods decorated by `@asab.subscribe` on the object and subscribe for them.
@@ -134,32 +143,45 @@ class PubSub(object):
         if len(callback_list) == 0:
             del self.Subscribers[message_type]
 
-    def _callback_iter(self, message_type):
-        callback_list = self.Subscribers.get(message_type)
-        if callback_list is None:
-            return
-
-        remove_list = None
+        self._dispatch.pop(message_type, None)
 
-        for callback_ref in callback_list:
+    def _on_reference_lost(self, callback_ref):
+        # Called by the garbage collector when a subscriber ceased to exist
+        for message_type, callback_list in list(self.Subscribers.items()):
+            if callback_ref not in callback_list:
+                continue
+            callback_list.remove(callback_ref)
+            if len(callback_list) == 0:
+                del self.Subscribers[message_type]
+            self._dispatch.pop(message_type, None)
+
+    def _build_dispatch(self, message_type):
+        dispatch = []
+        for callback_ref in self.Subscribers.get(message_type, ()):
             callback = callback_ref()
+            if callback is None:
+                continue
+            dispatch.append((callback_ref, asyncio.iscoroutinefunction(callback)))
 
-            # Check if a weak reference is working
-            if callback is None:  # a reference is lost
-                if remove_list is None:
-                    remove_list = list()
-                remove_list.append(callback_ref)
+        dispatch = tuple(dispatch)
+        self._dispatch[message_type] = dispatch
+        return dispatch
+
+    def _callback_iter(self, message_type):
+        dispatch = self._dispatch.get(message_type)
+        if dispatch is None:
+            dispatch = self._build_dispatch(message_type)
+
+        for callback_ref, is_coroutine in dispatch:
+            callback = callback_ref()
+            if callback is None:  # a reference is lost, the GC callback cleans it up
                 continue
 
-            if asyncio.iscoroutinefunction(callback):
+            if is_coroutine:
                 callback = functools.partial(_deliver_async, self.Loop, callback)
 
             yield callback
 
-        if remove_list is not None:
-            for callback_ref in remove_list:
-                callback_list.remove(callback_ref)
-
     def publish(self, message_type: str, *args, **kwargs):
         """
         Publish the message and notify the subscribers of an `message type`.
@@ -169,6 +191,9 @@ class PubSub(object):
         Args:
                 message_type: The emitted message.
                 asynchronously (bool, optional): If `True`, `call_soon()` method will be used for the asynchronous delivery of the message. Defaults to `False`.
+                coalesce (hashable, optional): If set, the message is delivered asynchronously and only the last message
+                        published with the same `coalesce` key within one loop iteration is delivered.
+                        It is meant for state-change messages such as on/off pairs. Defaults to `None`.
 
         Examples:
 
@@ -190,17 +215,41 @@ class PubSub(object):
         """
 
         asynchronously = kwargs.pop("asynchronously", False)
+        coalesce = kwargs.pop("coalesce", None)
+
+        if coalesce is not None:
+            # Only the last message published under this key in the current loop iteration is delivered
+            pending = coalesce in self._coalesced
+            self._coalesced[coalesce] = (message_type, args, kwargs)
+            if not pending:
+                self.Loop.call_soon(self._deliver_coalesced, coalesce)
+            return
 
         if asynchronously:
             for callback in self._callback_iter(message_type):
                 self.Loop.call_soon(
                     functools.partial(callback, message_type, *args, **kwargs)
                 )
+            return
 
-        else:
-            for callback in self._callback_iter(message_type):
+        dispatch = self._dispatch.get(message_type)
+        if dispatch is None:
+            dispatch = self._build_dispatch(message_type)
+
+        for callback_ref, is_coroutine in dispatch:
+            callback = callback_ref()
+            if callback is None:  # a reference is lost, the GC callback cleans it up
+                continue
+
+            if is_coroutine:
+                _deliver_async(self.Loop, callback, message_type, *args, **kwargs)
+            else:
                 callback(message_type, *args, **kwargs)
 
+    def _deliver_coalesced(self, coalesce):
+        message_type, args, kwargs = self._coalesced.pop(coalesce)
+        self.publish(message_type, *args, **kwargs)
+
     def publish_threadsafe(self, message_type: str, *args, **kwargs):
         """
         Publish the message and notify the subscribers of an `message type` safely form a different that main thread.
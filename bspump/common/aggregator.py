@@ -227,7 +227,7 @@ class Aggregator(Generator):
 
     ConfigDefaults = {
         "completion_size": 10,
-        "completion_timeout": 0,  # 0 means no timeout,
+        "completion_timeout": 0,  # 0 means no timeout, fractions of a second are allowed
         "completion_interval": 0,  # 0 means no completion interval
     }
 
@@ -247,7 +247,7 @@ class Aggregator(Generator):
         """
         super().__init__(app, pipeline, id, config)
         self.CompletionSize = int(self.Config["completion_size"])
-        self.CompletionTimeout = int(self.Config["completion_timeout"])
+        self.CompletionTimeout = float(self.Config["completion_timeout"])
         self.CompletionInterval = int(self.Config["completion_interval"])
 
         if self.CompletionTimeout > 0 and self.CompletionInterval > 0:
@@ -258,23 +258,20 @@ class Aggregator(Generator):
         self.AggregationStrategy = aggregation_strategy
 
         self.CurrentSize = 0
-        self.LastFlushTime = self.App.time()
         self.LastPeriodicFlushTime = self.App.time()
 
-        app.PubSub.subscribe("Application.stop!", self._on_application_stop)
+        # The completion timeout is measured from the first aggregated event by a deadline
+        self.DeadlineScheduler = app.get_service("bspump.DeadlineScheduler")
+        self.Deadline = None
 
-        if self.CompletionTimeout > 0:
-            app.PubSub.subscribe("Application.tick!", self._check_timeout)
+        app.PubSub.subscribe("Application.stop!", self._on_application_stop)
 
         if self.CompletionInterval > 0:
             app.PubSub.subscribe("Application.tick!", self._check_periodic_flush)
 
-    def _check_timeout(self, _):
-        if (
-            self.CurrentSize > 0
-            and self.App.time() - self.LastFlushTime > self.CompletionTimeout
-        ):
-            self.flush()
+    def _on_deadline(self):
+        self.Deadline = None
+        self.flush()
 
     def _check_periodic_flush(self, _):
         if (
@@ -296,6 +293,11 @@ class Aggregator(Generator):
         |
 
         """
+        if self.Deadline is not None:
+            self.Deadline.cancel()
+            self.Deadline = None
+
+        self.CurrentSize = 0
         if self.AggregationStrategy.is_empty():
             return
 
@@ -318,8 +320,11 @@ class Aggregator(Generator):
         self.AggregationStrategy.append(context, event)
         self.CurrentSize += 1
         if self.CurrentSize >= self.CompletionSize:
-            self.CurrentSize = 0
             self.flush()
+        elif self.CompletionTimeout > 0 and self.Deadline is None:
+            self.Deadline = self.DeadlineScheduler.schedule(
+                self.CompletionTimeout, self._on_deadline
+            )
         return None
 
     async def generate(self, context, aggregated_event, depth):
@@ -335,5 +340,4 @@ class Aggregator(Generator):
         depth :
 
         """
-        self.LastFlushTime = self.App.time()
         await self.Pipeline.inject(context, aggregated_event, depth)
@@ -0,0 +1,75 @@
+import asyncio
+import logging
+
+from ..abc.generator import Generator
+from ..scheduler import Batcher
+
+###
+
+L = logging.getLogger(__name__)
+
+###
+
+
+class BatchGenerator(Generator):
+    """
+    Collects events into blocks (see `Batcher`) and processes every block by `process_block()`.
+
+    Blocks are processed and forwarded strictly one after another, in the order of their arrival,
+    so events leave the generator in the order in which they came.
+    A block that fails is dropped and its error is reported by the pipeline, the next block is processed as usual.
+
+    A block is completed when it reaches `batch_size` events or `batch_timeout` seconds after its first event.
+    """
+
+    ConfigDefaults = {
+        "batch_size": 1000,
+        "batch_timeout": 1,  # Fractions of a second are allowed
+    }
+
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id, config)
+        self.Batcher = Batcher(
+            app,
+            self._on_block,
+            int(self.Config["batch_size"]),
+            float(self.Config["batch_timeout"]),
+        )
+
+        # The last block in progress, the next block waits for it to keep the order of events
+        self.PendingBlock = None
+
+    def process(self, context, event):
+        self.Batcher.append((context, event))
+        return None
+
+    def flush(self):
+        """
+        Completes the current block and schedules its processing.
+        """
+        self.Batcher.flush()
+
+    def _on_block(self, block):
+        previous = self.PendingBlock
+        self.PendingBlock = asyncio.ensure_future(
+            self.generate(block, previous, self.PipelineDepth + 1)
+        )
+        self.Pipeline.ensure_future(self.PendingBlock)
+
+    async def generate(self, block, previous, depth):
+        if previous is not None:
+            # Only the completion matters, the error of the previous block is handled by the pipeline
+            await asyncio.wait([previous])
+
+        events = await self.process_block(block)
+
+        for (context, _), event in zip(block, events):
+            if event is not None:
+                self.Pipeline.inject(context, event, depth)
+
+    async def process_block(self, block):
+        """
+        Processes a list of `(context, event)` tuples, the previous block is already processed.
+        Returns a list of processed events in the same order, None drops the event.
+        """
+        raise NotImplementedError()
@@ -45,6 +45,7 @@ class DirectSource(Source):
             event = copy.deepcopy(event)
 
         # DirectSource is not using the common asynchronous process method
+        child_context = self.Pipeline.stamp_received(child_context)
         self.Pipeline.MetricsEPSCounter.add("eps.in", 1)
         self.Pipeline.MetricsCounter.add("event.in", 1)
         self.Pipeline.inject(context=child_context, event=event, depth=0)
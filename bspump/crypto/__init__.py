@@ -1,6 +1,8 @@
-from .aes import DecryptAESProcessor
-from .aes import EncryptAESProcessor
+from .aes import DecryptAESProcessor, DecryptAESBatchProcessor
+from .aes import EncryptAESProcessor, EncryptAESBatchProcessor
+from .batch import BatchProcessor
 from .hashing import HashingProcessor, CoHashingProcessor
+from .hashing import HashingBatchProcessor, CoHashingBatchProcessor
 
 """
 Test AES
@@ -14,4 +16,9 @@ __all__ = (
     "DecryptAESProcessor",
     "HashingProcessor",
     "CoHashingProcessor",
+    "BatchProcessor",
+    "EncryptAESBatchProcessor",
+    "DecryptAESBatchProcessor",
+    "HashingBatchProcessor",
+    "CoHashingBatchProcessor",
 )
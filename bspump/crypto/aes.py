@@ -5,6 +5,7 @@ from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 
 from ..abc.processor import Processor
+from .batch import BatchProcessor
 
 
 class CommonAESMixin(object):
@@ -45,3 +46,37 @@ class DecryptAESProcessor(Processor, CommonAESMixin):
         unpadder = self.padding.unpadder()
         data = decryptor.update(event) + decryptor.finalize()
         return unpadder.update(data) + unpadder.finalize()
+
+
+class EncryptAESBatchProcessor(BatchProcessor, CommonAESMixin):
+    """
+    Batch variant of the `EncryptAESProcessor`, blocks of events are encrypted in a thread pool.
+    The cipher (the expanded key) is shared by all events, CBC needs a fresh context for every event.
+    """
+
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id, config)
+        self.initalize_aes()
+
+    def process_event(self, context, event):
+        encryptor = self.cipher.encryptor()
+        padder = self.padding.padder()
+        data = padder.update(event) + padder.finalize()
+        return encryptor.update(data) + encryptor.finalize()
+
+
+class DecryptAESBatchProcessor(BatchProcessor, CommonAESMixin):
+    """
+    Batch variant of the `DecryptAESProcessor`, blocks of events are decrypted in a thread pool.
+    """
+
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id, config)
+        self.initalize_aes()
+
+    def process_event(self, context, event):
+        # A corrupted event (wrong length or padding) raises ValueError, it is dropped by `process_batch()`
+        decryptor = self.cipher.decryptor()
+        unpadder = self.padding.unpadder()
+        data = decryptor.update(event) + decryptor.finalize()
+        return unpadder.update(data) + unpadder.finalize()
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+
+from ..common.batch import BatchGenerator
+
+###
+
+L = logging.getLogger(__name__)
+
+###
+
+
+class BatchProcessor(BatchGenerator):
+    """
+    Collects events into blocks and processes every block by `process_batch()` in the thread pool
+    of the `asab.ProactorService`, so that CPU-bound work doesn't block the event loop.
+
+    A block is split into up to `workers` chunks that are processed in parallel
+    (the number of workers of the `asab.ProactorService` by default).
+    The next block is processed while the previous one is still being forwarded,
+    but events leave the processor exactly in the order in which they came.
+    An event that fails in `process_event()` is logged and dropped, the rest of the block is forwarded.
+
+    A block is completed when it reaches `batch_size` events or `batch_timeout` seconds after its first event.
+    """
+
+    ConfigDefaults = {
+        "batch_timeout": 0.1,  # Fractions of a second are allowed
+        "workers": 0,  # 0 means the number of workers of the asab.ProactorService
+        "min_chunk_size": 64,  # Smaller blocks are not split
+    }
+
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id, config)
+        self.MinChunkSize = max(1, int(self.Config["min_chunk_size"]))
+
+        self.ProactorService = app.get_service("asab.ProactorService")
+        self.Workers = int(self.Config["workers"])
+        if self.Workers <= 0:
+            self.Workers = self.ProactorService.MaxWorkers
+
+    async def generate(self, block, previous, depth):
+        # Chunks are processed while the previous block is still being forwarded
+        chunks = self._split(block)
+        results = await asyncio.gather(
+            *[
+                self.ProactorService.execute(self.process_batch, chunk)
+                for chunk in chunks
+            ]
+        )
+
+        if previous is not None:
+            # Only the completion matters, the error of the previous block is handled by the pipeline
+            await asyncio.wait([previous])
+
+        for chunk, result in zip(chunks, results):
+            for (context, _), event in zip(chunk, result):
+                if event is not None:
+                    self.Pipeline.inject(context, event, depth)
+
+    def _split(self, block):
+        count = min(self.Workers, len(block) // self.MinChunkSize)
+        if count <= 1:
+            return [block]
+
+        size = -(-len(block) // count)
+        return [block[i : i + size] for i in range(0, len(block), size)]
+
+    def process_batch(self, chunk):
+        """
+        Processes a list of `(context, event)` tuples in a worker thread.
+        Returns a list of processed events in the same order, None drops the event.
+        """
+        result = []
+        for context, event in chunk:
+            try:
+                result.append(self.process_event(context, event))
+            except Exception as e:
+                L.warning(
+                    "Failed to process an event, dropping it",
+                    struct_data={"processor": self.Id, "error": repr(e)},
+                )
+                result.append(None)
+        return result
+
+    def process_event(self, context, event):
+        """
+        Processes a single event in a worker thread, returns the processed event, None drops the event.
+        """
+        raise NotImplementedError()
@@ -4,6 +4,7 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
 
 from ..abc.processor import Processor
+from .batch import BatchProcessor
 
 #
 
@@ -12,15 +13,13 @@ L = logging.getLogger(__name__)
 #
 
 
-class HashingBaseProcessor(Processor):
+class CommonHashingMixin(object):
     ConfigDefaults = {
         "algorithm": "sha256",
         "digest_size": 64,
     }
 
-    def __init__(self, app, pipeline, id=None, config=None):
-        super().__init__(app, pipeline, id, config)
-
+    def initialize_hashing(self):
         self.Backend = default_backend()
 
         algorithm = self.Config["algorithm"].upper()
@@ -50,6 +49,12 @@ class HashingBaseProcessor(Processor):
             )
 
 
+class HashingBaseProcessor(Processor, CommonHashingMixin):
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id, config)
+        self.initialize_hashing()
+
+
 class HashingProcessor(HashingBaseProcessor):
     """
     Create hash of the event.
@@ -71,3 +76,34 @@ class CoHashingProcessor(HashingBaseProcessor):
         digest.update(event)
         context["hash"] = digest.finalize()
         return event
+
+
+class HashingBatchProcessor(BatchProcessor, CommonHashingMixin):
+    """
+    Batch variant of the `HashingProcessor`, blocks of events are hashed in a thread pool.
+    """
+
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id, config)
+        self.initialize_hashing()
+
+    def process_event(self, context, event):
+        digest = hashes.Hash(self.Algorithm, self.Backend)
+        digest.update(event)
+        return digest.finalize()
+
+
+class CoHashingBatchProcessor(BatchProcessor, CommonHashingMixin):
+    """
+    Batch variant of the `CoHashingProcessor`, blocks of events are hashed in a thread pool.
+    """
+
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id, config)
+        self.initialize_hashing()
+
+    def process_event(self, context, event):
+        digest = hashes.Hash(self.Algorithm, self.Backend)
+        digest.update(event)
+        context["hash"] = digest.finalize()
+        return event
@@ -38,6 +38,7 @@ class ElasticSearchBulk(object):
         """
         self.Index = index
         self.Aging = 0
+        self.Deadline = None
         self.Capacity = max_size
         self.Items = []
         self.InsertMetric = connection.InsertMetric
@@ -248,6 +249,10 @@ class ElasticSearchConnection(Connection):
     precise_error_handling : bool, default = False
                     If True all Errors will be logged, If false soft errors will be omitted in the Logs.
 
+    bulk_flush_delay : float, default = 0
+                    If set, a bulk is sent at latest this many seconds after its first item.
+                    Otherwise bulks are aged by `Application.tick!` and sent after two ticks.
+
 
 
     """
@@ -263,6 +268,7 @@ class ElasticSearchConnection(Connection):
         "timeout": 300,
         "fail_log_max_size": 20,
         "precise_error_handling": False,
+        "bulk_flush_delay": 0,  # 0 means that bulks are aged by the application tick
     }
 
     def __init__(self, app, id=None, config=None):
@@ -313,6 +319,9 @@ class ElasticSearchConnection(Connection):
         self._timeout = float(self.Config["timeout"])
         self._started = True
 
+        self._bulk_flush_delay = float(self.Config["bulk_flush_delay"])
+        self.DeadlineScheduler = app.get_service("bspump.DeadlineScheduler")
+
         self.Loop = app.Loop
 
         self.PubSub = app.PubSub
@@ -386,12 +395,22 @@ class ElasticSearchConnection(Connection):
         if bulk is None:
             bulk = bulk_class(self, index, self._bulk_out_max_size)
             self._bulks[index] = bulk
+            if self._bulk_flush_delay > 0:
+                bulk.Deadline = self.DeadlineScheduler.schedule(
+                    self._bulk_flush_delay, self._on_bulk_deadline, index, bulk
+                )
 
         if bulk.consume(data_feeder_generator):
             # Bulk is ready, schedule to be send
             del self._bulks[index]
             self.enqueue(bulk)
 
+    def _on_bulk_deadline(self, index, bulk):
+        bulk.Deadline = None
+        if self._bulks.get(index) is bulk:
+            del self._bulks[index]
+            self.enqueue(bulk)
+
     def _start(self, event_name):
         """
         Description:
@@ -497,6 +516,10 @@ class ElasticSearchConnection(Connection):
         bulk :
 
         """
+        if bulk.Deadline is not None:
+            bulk.Deadline.cancel()
+            bulk.Deadline = None
+
         self._output_queue.put_nowait(bulk)
 
         # Signalize need for throttling
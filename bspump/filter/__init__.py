@@ -1,9 +1,12 @@
 from .attributefilter import AttributeFilter
 from .contentfilter import ContentFilter
+from .querycompiler import CompiledQuery, compile_query
 from .timedriftfilter import TimeDriftFilter
 
 __all__ = [
     "AttributeFilter",
     "ContentFilter",
+    "CompiledQuery",
+    "compile_query",
     "TimeDriftFilter",
 ]
@@ -3,6 +3,7 @@ import logging
 import mongoquery
 
 from ..abc.processor import Processor
+from .querycompiler import CompiledQuery
 
 ###
 
@@ -27,6 +28,10 @@ class ContentFilter(Processor):
     it won’t look into recognising the format of
     the data (for instance, it doesn’t check Object ID’s format, only that they are strings).
     (from https://pypi.org/project/mongoquery/)
+
+    The query is compiled once, in the constructor, into Python closures (see `CompiledQuery`),
+    operators that are not compiled are evaluated by mongoquery.
+    Use `process_batch()` to filter a list of events at once.
     """
 
     def __init__(self, app, pipeline, query={}, id=None, config=None):
@@ -34,12 +39,14 @@ class ContentFilter(Processor):
 
         # Check if the query is correctly implemented
         try:
-            self.Query = mongoquery.Query(query)
-            self.Query.match({})
+            mongoquery.Query(query).match({})
         except mongoquery.QueryError:
             L.warning("Incorrect query")
             raise
 
+        self.Query = CompiledQuery(query)
+        self.Predicate = self.Query.Predicate
+
     def on_hit(self, context, event):
         """
         This function tranforms the event, if it
@@ -55,10 +62,27 @@ class ContentFilter(Processor):
         return event
 
     def process(self, context, event):
-        matched = self.Query.match(event)
+        matched = self.Predicate(event)
         if matched:
             new_event = self.on_hit(context, event)
         else:
             new_event = self.on_miss(context, event)
 
         return new_event
+
+    def process_batch(self, context, events):
+        """
+        Filters a list of events, the query is evaluated clause by clause over the whole list.
+        Returns a list of transformed events, events for which `on_hit` or `on_miss` returned None are dropped.
+        """
+        new_events = []
+        for event, matched in zip(events, self.Query.match_batch(events)):
+            if matched:
+                new_event = self.on_hit(context, event)
+            else:
+                new_event = self.on_miss(context, event)
+
+            if new_event is not None:
+                new_events.append(new_event)
+
+        return new_events
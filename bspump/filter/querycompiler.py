@@ -0,0 +1,435 @@
+import re
+import collections.abc
+from operator import gt, ge, lt, le
+
+import mongoquery
+
+###
+
+# Relative cost of a single evaluation, clauses of a conjunction are evaluated from the cheapest one,
+# so that the cheap and usually most selective comparisons short-circuit the expensive ones
+COST_CONSTANT = 1
+COST_COMPARISON = 2
+COST_MEMBERSHIP = 3
+COST_REGEX = 20
+COST_FALLBACK = 50
+
+_UNDEFINED = mongoquery._Undefined()
+
+###
+
+
+class CompiledQuery(object):
+    """
+    Description: Mongo-like query compiled into a tree of Python closures.
+
+    The query is analysed once, the evaluation of an event then runs only the closures,
+    without interpreting the query dictionary again.
+    Clauses of an implicit or explicit `$and` are evaluated from the cheapest one (literal equality
+    and `$exists` first, `$regex` last) and the evaluation stops at the first clause that fails.
+    Operators that are not compiled (`$elemMatch`, `$size`, `$type`, `$all`, `$mod`, dotted `$exists` ...)
+    are delegated to `mongoquery`, so the result is always the same as of `mongoquery.Query.match()`.
+
+    `match_batch()` evaluates a list of events clause by clause: each top-level clause is evaluated
+    over the column of events that passed all the previous clauses.
+    """
+
+    def __init__(self, query):
+        self.Definition = query
+        if isinstance(query, collections.abc.Mapping):
+            self.Clauses = _compile_clauses(query)
+        else:
+            self.Clauses = [_compile_condition(query)]
+
+        if len(self.Clauses) == 0:
+            self.Predicate = _match_all
+        elif len(self.Clauses) == 1:
+            self.Predicate = self.Clauses[0][1]
+        else:
+            self.Predicate = _conjunction(self.Clauses)
+
+    def match(self, event):
+        """
+        Description: Returns True if the event matches the query.
+        Call `Predicate` directly to save a method call in a hot loop.
+        """
+        return self.Predicate(event)
+
+    def match_batch(self, events):
+        """
+        Description: Evaluates the query over a list of events, returns a list of booleans.
+        """
+        result = [False] * len(events)
+        selected = list(range(len(events)))
+        for _, predicate in self.Clauses:
+            selected = [i for i in selected if predicate(events[i])]
+            if len(selected) == 0:
+                return result
+
+        for i in selected:
+            result[i] = True
+        return result
+
+
+def compile_query(query):
+    """
+    Description: Compiles the mongo-like `query` into a `CompiledQuery`.
+    """
+    return CompiledQuery(query)
+
+
+def _match_all(entry):
+    return True
+
+
+def _conjunction(clauses):
+    predicates = tuple(predicate for _, predicate in clauses)
+
+    if len(predicates) == 2:
+        first, second = predicates
+
+        def match(entry):
+            return first(entry) and second(entry)
+
+        return match
+
+    def match(entry):
+        for predicate in predicates:
+            if not predicate(entry):
+                return False
+        return True
+
+    return match
+
+
+def _cost(clauses):
+    return sum(cost for cost, _ in clauses)
+
+
+def _compile_condition(condition):
+    """
+    Compiles the `condition` applied to a value, returns (cost, predicate).
+    """
+    if isinstance(condition, collections.abc.Mapping):
+        clauses = _compile_clauses(condition)
+        if len(clauses) == 0:
+            return COST_CONSTANT, _match_all
+        if len(clauses) == 1:
+            return clauses[0]
+        return _cost(clauses), _conjunction(clauses)
+
+    def match(entry):
+        if condition == entry:
+            return True
+        if mongoquery.is_non_string_sequence(entry):
+            return condition in entry
+        return False
+
+    return COST_CONSTANT, match
+
+
+def _compile_clauses(condition):
+    clauses = [
+        _compile_clause(operator, sub_condition)
+        for operator, sub_condition in condition.items()
+    ]
+    return _reorder(clauses)
+
+
+def _reorder(clauses):
+    """
+    Sorts the clauses by their cost, the order of the query is kept for clauses of the same cost.
+    A clause that is moved in front of a clause which precedes it in the query may be evaluated on a value
+    that mongoquery never passes to it (e.g. `$exists` on a float that fails `$regex`),
+    a `TypeError` of such clause is therefore a mismatch.
+    """
+    order = sorted(range(len(clauses)), key=lambda i: clauses[i][0])
+    result = []
+    for position, index in enumerate(order):
+        cost, predicate = clauses[index]
+        if any(later < index for later in order[position + 1 :]):
+            predicate = _mismatch_on_error(predicate)
+        result.append((cost, predicate))
+    return result
+
+
+def _mismatch_on_error(predicate):
+    def match(entry):
+        try:
+            return predicate(entry)
+        except TypeError:
+            return False
+
+    return match
+
+
+def _fallback(operator, condition):
+    query = mongoquery.Query({operator: condition})
+    return COST_FALLBACK, query.match
+
+
+def _compile_clause(operator, condition):
+    if isinstance(condition, collections.abc.Mapping) and "$exists" in condition:
+        if not isinstance(operator, str) or "." in operator:
+            return _fallback(operator, condition)
+        return _compile_exists(operator, condition)
+
+    if not isinstance(operator, str):
+        cost, predicate = _compile_condition(condition)
+
+        def match(entry):
+            if operator not in entry:
+                return False
+            return predicate(entry[operator])
+
+        return cost + COST_CONSTANT, match
+
+    if operator.startswith("$"):
+        compiler = _OPERATORS.get(operator)
+        if compiler is None:
+            return _fallback(operator, condition)
+        return compiler(operator, condition)
+
+    cost, predicate = _compile_condition(condition)
+    extract = _compile_extract(operator)
+
+    def match(entry):
+        return predicate(extract(entry))
+
+    return cost, match
+
+
+def _compile_exists(operator, condition):
+    exists = condition["$exists"]
+    rest = {key: value for key, value in condition.items() if key != "$exists"}
+    if len(rest) == 0:
+
+        def match(entry):
+            return exists == (operator in entry)
+
+        return COST_CONSTANT, match
+
+    cost, predicate = _compile_clause(operator, rest)
+
+    def match(entry):
+        if exists != (operator in entry):
+            return False
+        return predicate(entry)
+
+    return cost + COST_CONSTANT, match
+
+
+def _compile_extract(field):
+    path = field.split(".")
+
+    if len(path) == 1:
+        # Fast path for a top-level field of a dictionary
+        def extract(entry):
+            if type(entry) is dict:
+                return entry.get(field, _UNDEFINED)
+            return _extract(entry, path)
+
+        return extract
+
+    def extract(entry):
+        return _extract(entry, path)
+
+    return extract
+
+
+def _extract(entry, path):
+    # Follows `mongoquery.Query._extract()`
+    try:
+        return _extract_path(entry, path)
+    except IndexError:
+        return _UNDEFINED
+
+
+def _extract_path(entry, path):
+    if not path:
+        return entry
+    if entry is None:
+        return entry
+    if mongoquery.is_non_string_sequence(entry):
+        try:
+            index = int(path[0])
+        except ValueError:
+            return [_extract_path(item, path) for item in entry]
+        return _extract_path(entry[index], path[1:])
+    if isinstance(entry, collections.abc.Mapping) and path[0] in entry:
+        return _extract_path(entry[path[0]], path[1:])
+    return _UNDEFINED
+
+
+# Operators
+
+
+def _compile_eq(operator, condition):
+    def match(entry):
+        try:
+            return entry == condition
+        except TypeError:
+            return False
+
+    return COST_CONSTANT, match
+
+
+def _compile_ne(operator, condition):
+    def match(entry):
+        return entry != condition
+
+    return COST_CONSTANT, match
+
+
+def _compile_ordering(compare):
+    def compiler(operator, condition):
+        def match(entry):
+            try:
+                return compare(entry, condition)
+            except TypeError:
+                return False
+
+        return COST_COMPARISON, match
+
+    return compiler
+
+
+def _compile_in(operator, condition, negate=False):
+    if not mongoquery.is_non_string_sequence(condition):
+        # The error is raised by mongoquery on the evaluation
+        return _fallback(operator, condition)
+
+    values = tuple(condition)
+    try:
+        lookup = frozenset(values)
+    except TypeError:
+        lookup = None
+
+    def contains(entry):
+        if mongoquery.is_non_string_sequence(entry):
+            for value in values:
+                if value in entry:
+                    return True
+            return False
+
+        if lookup is not None:
+            try:
+                return entry in lookup
+            except TypeError:
+                # Unhashable entry
+                pass
+
+        for value in values:
+            if value == entry:
+                return True
+        return False
+
+    if not negate:
+        return COST_MEMBERSHIP, contains
+
+    def match(entry):
+        return not contains(entry)
+
+    return COST_MEMBERSHIP, match
+
+
+def _compile_nin(operator, condition):
+    return _compile_in(operator, condition, negate=True)
+
+
+def _compile_logical(operator, condition):
+    if not isinstance(condition, collections.abc.Sequence):
+        # The error is raised by mongoquery on the evaluation
+        return _fallback(operator, condition)
+
+    clauses = [_compile_condition(sub_condition) for sub_condition in condition]
+    predicates = tuple(predicate for _, predicate in clauses)
+    cost = _cost(clauses)
+
+    if operator == "$and":
+        clauses = _reorder(clauses)
+        if len(clauses) == 0:
+            return COST_CONSTANT, _match_all
+        return cost, _conjunction(clauses)
+
+    if operator == "$or":
+
+        def match(entry):
+            for predicate in predicates:
+                if predicate(entry):
+                    return True
+            return False
+
+        return cost, match
+
+    # $nor
+    def match(entry):
+        for predicate in predicates:
+            if predicate(entry):
+                return False
+        return True
+
+    return cost, match
+
+
+def _compile_not(operator, condition):
+    cost, predicate = _compile_condition(condition)
+
+    def match(entry):
+        return not predicate(entry)
+
+    return cost, match
+
+
+def _compile_regex(operator, condition):
+    if isinstance(condition, mongoquery.regex_type):
+        regex = condition
+    elif isinstance(condition, str):
+        parsed = re.match(r"\A/(.+)/([imsx]{,4})\Z", condition, flags=re.DOTALL)
+        flags = 0
+        if parsed:
+            for option in parsed.group(2):
+                flags |= getattr(re, option.upper())
+            expression = parsed.group(1)
+        else:
+            expression = condition
+
+        try:
+            regex = re.compile(expression, flags=flags)
+        except re.error:
+            # The error is raised by mongoquery on the evaluation
+            return _fallback(operator, condition)
+    else:
+        return _fallback(operator, condition)
+
+    search = regex.search
+
+    def match(entry):
+        if not isinstance(entry, str):
+            return False
+        return search(entry) is not None
+
+    return COST_REGEX, match
+
+
+def _compile_noop(operator, condition):
+    return 0, _match_all
+
+
+_OPERATORS = {
+    "$eq": _compile_eq,
+    "$ne": _compile_ne,
+    "$gt": _compile_ordering(gt),
+    "$gte": _compile_ordering(ge),
+    "$lt": _compile_ordering(lt),
+    "$lte": _compile_ordering(le),
+    "$in": _compile_in,
+    "$nin": _compile_nin,
+    "$and": _compile_logical,
+    "$or": _compile_logical,
+    "$nor": _compile_logical,
+    "$not": _compile_not,
+    "$regex": _compile_regex,
+    "$exists": _compile_noop,
+    "$comment": _compile_noop,
+}
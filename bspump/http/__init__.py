@@ -1,6 +1,8 @@
 from .client.source import HTTPClientLineSource
 from .client.source import HTTPClientSource
 from .client.source import HTTPClientTextSource
+from .client.multisource import HTTPMultiClientSource
+from .client.multisource import HTTPMultiClientLineSource
 from .client.wssink import HTTPClientWebSocketSink
 from .web.sink import WebServiceSink
 from .web.source import WebServiceSource
@@ -11,6 +13,8 @@ __all__ = (
     "HTTPClientSource",
     "HTTPClientTextSource",
     "HTTPClientLineSource",
+    "HTTPMultiClientSource",
+    "HTTPMultiClientLineSource",
     "HTTPClientWebSocketSink",
     "WebServiceSource",
     "WebServiceSink",
@@ -0,0 +1,271 @@
+import re
+import logging
+import asyncio
+
+import aiohttp
+
+from ...abc.source import TriggerSource
+from .abcsource import InvalidResponseStatusCodeError
+
+#
+
+L = logging.getLogger(__name__)
+
+#
+
+
+class HTTPMultiClientSource(TriggerSource):
+    """
+    Fetches a list of URLs on every trigger, `concurrency` of them at once over a shared keep-alive connection pool.
+
+    Unchanged resources are skipped: the `ETag` and `Last-Modified` of every response are remembered
+    and sent back as `If-None-Match` and `If-Modified-Since` in the next cycle, `304 Not Modified` produces no event.
+    With a pagination, the first page is requested conditionally and when it is unchanged, no other page is fetched.
+
+    Pagination:
+
+    - `link` follows the `Link: <...>; rel="next"` response header,
+    - `cursor` reads the JSON response, takes the next cursor from `cursor_path` (dot separated)
+            and sends it in the `cursor_param` query parameter of the next request. Every page is an event (a parsed JSON).
+
+    Without a cursor pagination, bodies up to `stream_threshold` bytes are processed as a single event,
+    larger bodies (or bodies of an unknown length) are processed incrementally in chunks of `chunk_size` bytes.
+    Override `read()` to process responses differently.
+
+    The context of the event contains `http.url`, `http.status` and `http.page`.
+
+    .. code:: python
+
+            source = bspump.http.HTTPMultiClientSource(app, pipeline, urls=[
+                    "https://api.example.com/users",
+                    "https://api.example.com/groups",
+            ]).on(bspump.trigger.PeriodicTrigger(app, 60))
+
+    """
+
+    ConfigDefaults = {
+        "method": "GET",
+        "urls": "",  # Whitespace separated list of URLs, used when the `urls` argument is not provided
+        "response_code": "200",  # Specify an expected response status code, more values are accepted ("200, 300 301")
+        "concurrency": 8,  # Maximum number of requests in flight
+        "limit_per_host": 0,  # Maximum number of connections per host, 0 means no limit
+        "conditional": True,  # Use If-None-Match / If-Modified-Since
+        "pagination": "",  # '' (none), 'link' or 'cursor'
+        "cursor_param": "cursor",
+        "cursor_path": "next_cursor",
+        "max_pages": 100,  # Maximum number of pages fetched for one URL in one cycle
+        "stream_threshold": 1024 * 1024,
+        "chunk_size": 64 * 1024,
+        "max_failed_retries": 3,  # Consecutive failures of a URL that stop the pipeline
+    }
+
+    def __init__(self, app, pipeline, urls=None, id=None, config=None, headers={}):
+        super().__init__(app, pipeline, id=id, config=config)
+        self.Loop = app.Loop
+
+        self.Method = self.Config["method"]
+        if urls is None:
+            urls = self.Config["urls"].split()
+        self.URLs = list(urls)
+
+        self.Headers = headers.copy()
+        self.SSL = None
+
+        self.Concurrency = int(self.Config["concurrency"])
+        self.LimitPerHost = int(self.Config["limit_per_host"])
+        self.Conditional = self.Config.getboolean("conditional")
+        self.Pagination = self.Config["pagination"]
+        if self.Pagination not in ("", "link", "cursor"):
+            raise ValueError("Unknown pagination '{}'".format(self.Pagination))
+        self.CursorParam = self.Config["cursor_param"]
+        self.CursorPath = self.Config["cursor_path"].split(".")
+        self.MaxPages = int(self.Config["max_pages"])
+        self.StreamThreshold = int(self.Config["stream_threshold"])
+        self.ChunkSize = int(self.Config["chunk_size"])
+        self.MaxFailedResponses = int(self.Config["max_failed_retries"])
+
+        try:
+            self.ResponseCodes = frozenset(
+                map(int, re.findall(r"\d+", self.Config.get("response_code")))
+            )
+        except Exception:
+            L.error("Failed to parse 'response_code' configuration value")
+            raise
+
+        # Validators of the last response from a URL, (ETag, Last-Modified)
+        self.Validators = {}
+        self.FailedResponses = {}
+
+        metrics_service = app.get_service("asab.MetricsService")
+        self.Counter = metrics_service.create_counter(
+            "bspump.http.client",
+            tags={"pipeline": pipeline.Id, "source": self.Id},
+            init_values={"request": 0, "not_modified": 0, "page": 0, "error": 0},
+        )
+
+    async def main(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.Concurrency, limit_per_host=self.LimitPerHost
+        )
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await super().main(session)
+
+    async def cycle(self, session):
+        semaphore = asyncio.Semaphore(self.Concurrency)
+
+        async def fetch(url):
+            async with semaphore:
+                await self.fetch(session, url)
+
+        results = await asyncio.gather(
+            *[fetch(url) for url in self.URLs], return_exceptions=True
+        )
+
+        for url, result in zip(self.URLs, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+
+            if not isinstance(result, Exception):
+                self.FailedResponses.pop(url, None)
+                continue
+
+            if not isinstance(result, (aiohttp.ClientError, asyncio.TimeoutError)):
+                raise result
+
+            self.Counter.add("error", 1)
+            failed = self.FailedResponses.get(url, 0) + 1
+            self.FailedResponses[url] = failed
+            if failed < self.MaxFailedResponses:
+                L.warning(
+                    "{}, will retry ({}/{}) in the next cycle".format(
+                        result, failed, self.MaxFailedResponses
+                    )
+                )
+                self.Pipeline.MetricsEPSCounter.add("warning", 1)
+                self.Pipeline.MetricsCounter.add("warning", 1)
+            else:
+                L.error("{}, {} failed response(s)".format(result, failed))
+                raise aiohttp.ClientError("{}, url='{}'".format(result, url))
+
+    async def fetch(self, session, url):
+        """
+        Fetches all pages of the `url`.
+        """
+        page = 0
+        params = None
+        fetched_url = url
+        new_validators = None
+        while url is not None and page < self.MaxPages:
+            headers = dict(self.Headers)
+            validators = self.Validators.get(url) if page == 0 else None
+            if self.Conditional and validators is not None:
+                etag, last_modified = validators
+                if etag is not None:
+                    headers["If-None-Match"] = etag
+                if last_modified is not None:
+                    headers["If-Modified-Since"] = last_modified
+
+            self.Counter.add("request", 1)
+            async with session.request(
+                self.Method,
+                url,
+                params=params,
+                headers=headers if len(headers) > 0 else None,
+                ssl=self.SSL,
+            ) as response:
+                if response.status == 304 and validators is not None:
+                    self.Counter.add("not_modified", 1)
+                    return
+
+                if response.status not in self.ResponseCodes:
+                    await response.read()
+                    raise InvalidResponseStatusCodeError(
+                        "The response status code {} from '{}' is invalid".format(
+                            response.status, url
+                        )
+                    )
+
+                if page == 0 and self.Conditional:
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if etag is not None or last_modified is not None:
+                        new_validators = (etag, last_modified)
+
+                context = {
+                    "http.url": url,
+                    "http.status": response.status,
+                    "http.page": page,
+                }
+                self.Counter.add("page", 1)
+                page += 1
+
+                if self.Pagination == "cursor":
+                    body = await response.json(content_type=None)
+                    await self.process(body, context=context)
+                    cursor = self._get_cursor(body)
+                    if cursor is None:
+                        break
+                    params = {self.CursorParam: cursor}
+                    # The URL stays, the cursor is in the query
+                    continue
+
+                await self.read(response, context)
+
+                if self.Pagination == "link":
+                    link = response.links.get("next")
+                    if link is None:
+                        break
+                    url = str(response.url.join(link["url"]))
+                    continue
+
+                break
+
+        # Remember the validators only once the whole body is processed,
+        # a failure in the middle has the resource fetched again in the next cycle
+        if new_validators is not None:
+            self.Validators[fetched_url] = new_validators
+
+    def _get_cursor(self, body):
+        cursor = body
+        for key in self.CursorPath:
+            if not isinstance(cursor, dict):
+                return None
+            cursor = cursor.get(key)
+        if cursor in (None, ""):
+            return None
+        return cursor
+
+    async def read(self, response, context):
+        """
+        Processes the response body, override this method to implement your own reading.
+        Small bodies are processed as one event, large bodies in chunks.
+        """
+        length = response.content_length
+        if length is not None and length <= self.StreamThreshold:
+            await self.process(await response.read(), context=context)
+            return
+
+        async for chunk in response.content.iter_chunked(self.ChunkSize):
+            await self.process(chunk, context=context.copy())
+
+
+class HTTPMultiClientLineSource(HTTPMultiClientSource):
+    """
+    Like `HTTPMultiClientSource`, but every line of a response is an event.
+    The body is read incrementally, so a response of any size is never held in memory at once.
+    """
+
+    ConfigDefaults = {
+        "encoding": "utf-8",
+    }
+
+    def __init__(self, app, pipeline, urls=None, id=None, config=None, headers={}):
+        super().__init__(
+            app, pipeline, urls=urls, id=id, config=config, headers=headers
+        )
+        self.Encoding = self.Config["encoding"]
+
+    async def read(self, response, context):
+        async for line in response.content:
+            line = line.rstrip(b"\r\n")
+            await self.process(line.decode(self.Encoding), context=context.copy())
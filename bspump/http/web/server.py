@@ -1,5 +1,4 @@
 import logging
-import asyncio
 import json
 import os
 import pathlib
@@ -105,8 +104,25 @@ class WebServerConnection(Connection):
 class WebRouteSource(Source):
     """
     WebSource is a source that listens on a specified port and serves HTTP requests.
+
+    Every request is an event, a dictionary with the `request`, the `response_future`
+    that is to be resolved by a sink and the `status`.
+    With `parse_body` configured, the request body is read and parsed before the event enters
+    the pipeline and it is available as `body` in the event.
+
+    At most `max_in_flight` requests are processed at once. Further requests, as well as requests
+    that arrive while the pipeline is throttled, are refused with 503 and `Retry-After`.
+    The pipeline is throttled by the source while the limit is reached.
     """
 
+    ConfigDefaults = {
+        "max_in_flight": 1000,  # 0 means unlimited
+        "retry_after": 1,  # Seconds, sent with the 503 response
+        "parse_body": "",  # '' (no parsing), 'bytes', 'text', 'json' or 'post'
+    }
+
+    LatencyBuckets = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0]
+
     def __init__(
         self,
         app,
@@ -145,24 +161,106 @@ class WebRouteSource(Source):
         self.aiohttp_app = self.Connection.aiohttp_app
         self.aiohttp_app.router.add_route(method, route, self.handle_request)
 
+        self.MaxInFlight = int(self.Config["max_in_flight"])
+        self.RetryAfter = str(self.Config["retry_after"])
+        self.InFlight = 0
+        self.Throttled = False
+
+        self.Loop = app.Loop
+        self.ParseBody = self.Config["parse_body"]
+        if self.ParseBody not in ("", "bytes", "text", "json", "post"):
+            raise ValueError("Unknown parse_body '{}'".format(self.ParseBody))
+
+        metrics_service = app.get_service("asab.MetricsService")
+        tags = {"pipeline": pipeline.Id, "method": method, "route": route}
+        self.RequestCounter = metrics_service.create_counter(
+            "bspump.web.route",
+            tags=tags,
+            init_values={"requests": 0, "rejected": 0, "error": 0},
+        )
+        self.LatencyHistogram = metrics_service.create_histogram(
+            "bspump.web.route.latency",
+            buckets=self.LatencyBuckets,
+            tags=tags,
+            help="Time from the receipt of a request to the resolution of its response.",
+            unit="seconds",
+        )
+
     async def main(self):
         pass
 
     async def handle_request(self, request):
-        try:
-            response_future = asyncio.Future()
-            await self.process(
-                {
-                    "request": request,
-                    "response_future": response_future,
-                    "status": 200,
-                }
+        return await self.process_request(request)
+
+    async def process_request(self, request, **fields):
+        """
+        Sends the request through the pipeline and returns the response provided by a sink.
+        `fields` are added to the event.
+        """
+        if (self.MaxInFlight > 0 and self.InFlight >= self.MaxInFlight) or (
+            not self.Pipeline.is_ready()
+        ):
+            self.RequestCounter.add("rejected", 1)
+            return aiohttp.web.Response(
+                status=503, headers={"Retry-After": self.RetryAfter}
             )
-            return await response_future
+
+        self.RequestCounter.add("requests", 1)
+        t0 = self.Loop.time()
+        self.InFlight += 1
+        try:
+            event = {
+                "request": request,
+                "response_future": self.Loop.create_future(),
+                "status": 200,
+            }
+            event.update(fields)
+
+            if self.ParseBody != "":
+                try:
+                    event["body"] = await self.parse_body(request)
+                except (ValueError, UnicodeDecodeError) as e:
+                    return aiohttp.web.Response(
+                        status=400, text="Invalid request body: {}".format(e)
+                    )
+
+            await self.process(event)
+
+            # Throttle only once the event is in, the source waits for a ready pipeline in process()
+            if (
+                self.MaxInFlight > 0
+                and self.InFlight >= self.MaxInFlight
+                and not self.Throttled
+            ):
+                self.Throttled = True
+                self.Pipeline.throttle(self, enable=True)
+
+            return await event["response_future"]
+
         except Exception:
+            self.RequestCounter.add("error", 1)
             L.exception("Exception in WebSource")
             return aiohttp.web.Response(status=500)
 
+        finally:
+            self.InFlight -= 1
+            if self.Throttled and self.InFlight < self.MaxInFlight:
+                self.Throttled = False
+                self.Pipeline.throttle(self, enable=False)
+            self.LatencyHistogram.set("latency", self.Loop.time() - t0)
+
+    async def parse_body(self, request):
+        """
+        Reads and parses the request body according to the `parse_body` configuration.
+        """
+        if self.ParseBody == "json":
+            return await request.json()
+        if self.ParseBody == "text":
+            return await request.text()
+        if self.ParseBody == "post":
+            return dict(await request.post())
+        return await request.read()
+
 
 async def gate_response(request, test_secret, response_fn):
     secret = request.query.get("secret")
@@ -190,15 +288,7 @@ class ProtectedWebRouteSource(WebRouteSource):
         try:
 
             async def response_fn():
-                response_future = asyncio.Future()
-                await self.process(
-                    {
-                        "request": request,
-                        "response_future": response_future,
-                        "status": 200,
-                    }
-                )
-                return await response_future
+                return await self.process_request(request)
 
             return await gate_response(
                 request, lambda secret: self.test_secret(secret), response_fn
@@ -301,16 +391,7 @@ class WebFormSource(WebRouteSource):
                     return aiohttp.web.json_response(
                         {"error": f"{field.name} is incorrectly formatted"}, status=400
                     )
-        response_future = asyncio.Future()
-        await self.process(
-            {
-                "request": request,
-                "response_future": response_future,
-                "status": 200,
-                "form": data,
-            }
-        )
-        return await response_future
+        return await self.process_request(request, form=data)
 
     async def handle_post(self, request: Request):
         try:
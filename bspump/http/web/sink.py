@@ -1,5 +1,6 @@
+import asyncio
+import collections
 import logging
-import queue
 
 import aiohttp.web
 import itertools
@@ -14,36 +15,114 @@ L = logging.getLogger(__name__)
 
 
 class WebServiceStreamResponse(aiohttp.web.StreamResponse):
+    """
+    Streaming response of the `WebServiceSink`.
+
+    Events are written to the client by a writer task of the response as soon as they arrive.
+    Events that arrived during a write are coalesced into a single write.
+    When the client reads slower than the pipeline produces and the buffered data exceed
+    the high water mark of the sink, the pipeline is throttled until the buffer drains below the low water mark.
+    """
+
     Counter = itertools.count(1, 1)
 
     def __init__(self, sink):
         super().__init__()
         self.Id = "{}.{}#{}".format(sink.Pipeline.Id, sink.Id, next(self.Counter))
         self.Sink = sink
-        self.Queue = queue.Queue()
+        self.Pipeline = sink.Pipeline
+
+        self.Buffer = collections.deque()
+        self.BufferedBytes = 0
+        self.Throttled = False
+        self.Closing = False
+
+        self.DataReady = asyncio.Event()
+        self.Drained = asyncio.Event()
+        self.Drained.set()
+        self.WriterTask = None
 
     # Context Manager
 
     async def __aenter__(self):
         self.Sink.Responses[self.Id] = self
+        self.Sink.StreamsGauge.set("streams.open", len(self.Sink.Responses))
+        self.WriterTask = asyncio.ensure_future(self._writer())
 
     async def __aexit__(self, exc_type, exc, tb):
         # Remove myself from a sink
-        del self.Sink.Responses[self.Id]
+        sink = self.Sink
+        del sink.Responses[self.Id]
+        sink.StreamsGauge.set("streams.open", len(sink.Responses))
+
+        # Let the writer send the rest of the buffer
+        self.Closing = True
+        self.DataReady.set()
+        await self.WriterTask
         self.Sink = None
 
-        await self.flush_events()
+        if self.Throttled:
+            self.Throttled = False
+            self.Pipeline.throttle(self, enable=False)
+
         await self.write_eof()
 
     # Queue management
 
     def put_event(self, event):
-        self.Queue.put_nowait(event)
+        if self.WriterTask is not None and self.WriterTask.done():
+            # The client is gone
+            return
+
+        self.Buffer.append(event)
+        self.BufferedBytes += len(event)
+        self.DataReady.set()
+        self.Drained.clear()
+
+        if not self.Throttled and self.BufferedBytes > self.Sink.HighWater:
+            self.Throttled = True
+            self.Pipeline.throttle(self, enable=True)
 
     async def flush_events(self):
-        while not self.Queue.empty():
-            event = self.Queue.get_nowait()
-            await self.write(event)
+        """
+        Waits till all buffered events are written.
+        """
+        await self.Drained.wait()
+
+    async def _writer(self):
+        sink = self.Sink
+        try:
+            while True:
+                await self.DataReady.wait()
+                self.DataReady.clear()
+
+                while len(self.Buffer) > 0:
+                    if len(self.Buffer) == 1:
+                        data = self.Buffer.popleft()
+                    else:
+                        data = b"".join(self.Buffer)
+                        self.Buffer.clear()
+                    self.BufferedBytes = 0
+
+                    await self.write(data)
+                    sink.EPSCounter.add("bytes", len(data))
+
+                    if self.Throttled and self.BufferedBytes <= sink.LowWater:
+                        self.Throttled = False
+                        self.Pipeline.throttle(self, enable=False)
+
+                self.Drained.set()
+                if self.Closing:
+                    return
+
+        except ConnectionError as e:
+            L.warning("Client of '{}' disconnected: {}".format(self.Id, e))
+            self.Buffer.clear()
+            self.BufferedBytes = 0
+            self.Drained.set()
+            if self.Throttled:
+                self.Throttled = False
+                self.Pipeline.throttle(self, enable=False)
 
 
 class WebServiceSink(Sink):
@@ -64,10 +143,32 @@ class WebServiceSink(Sink):
     CONTEXT_RESPONSE_ID = "webservicesink.response_id"
     CONTEXT_TYPE = "application/octet-stream"
 
+    ConfigDefaults = {
+        # Bytes buffered for a single response, when exceeded, the pipeline is throttled
+        "high_water": 1024 * 1024,
+        # The throttling ends when the response buffer is drained below this value
+        "low_water": 256 * 1024,
+    }
+
     def __init__(self, app, pipeline, id=None, config=None):
         super().__init__(app, pipeline, id, config)
         self.Responses = {}
-        app.PubSub.subscribe("Application.tick!", self.on_tick)
+
+        self.HighWater = int(self.Config["high_water"])
+        self.LowWater = int(self.Config["low_water"])
+
+        metrics_service = app.get_service("asab.MetricsService")
+        self.StreamsGauge = metrics_service.create_gauge(
+            "bspump.webservicesink",
+            tags={"pipeline": pipeline.Id, "sink": self.Id},
+            init_values={"streams.open": 0},
+        )
+        self.EPSCounter = metrics_service.create_eps_counter(
+            "bspump.webservicesink.eps",
+            tags={"pipeline": pipeline.Id, "sink": self.Id},
+            init_values={"bytes": 0},
+            help="Bytes per second written to all responses of the sink.",
+        )
 
     def process(self, context, event):
         response_id = context.get(self.CONTEXT_RESPONSE_ID)
@@ -75,8 +176,8 @@ class WebServiceSink(Sink):
             L.warning("Missing CONTEXT_RESPONSE_ID entry in the context")
             return
 
-        response = self.Responses[response_id]
-        if response_id is None:
+        response = self.Responses.get(response_id)
+        if response is None:
             L.warning("Cannot locate web response '{}'".format(response_id))
             return
 
@@ -87,7 +188,3 @@ class WebServiceSink(Sink):
         response.content_type = self.CONTEXT_TYPE
         await response.prepare(request)
         return response
-
-    async def on_tick(self, event_name):
-        for response in self.Responses.values():
-            await response.flush_events()
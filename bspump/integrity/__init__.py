@@ -1,5 +1,11 @@
 from .integrityenricher import IntegrityEnricher
+from .blockenricher import IntegrityBlockEnricher
+from .chain import merkle_root, verify_event, verify_block
 
 __all__ = [
     "IntegrityEnricher",
+    "IntegrityBlockEnricher",
+    "merkle_root",
+    "verify_event",
+    "verify_block",
 ]
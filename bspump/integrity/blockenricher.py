@@ -0,0 +1,82 @@
+import logging
+
+from ..common.batch import BatchGenerator
+from .chain import hash_event, merkle_root
+
+###
+
+L = logging.getLogger(__name__)
+
+###
+
+
+class IntegrityBlockEnricher(BatchGenerator):
+    """
+    IntegrityBlockEnricher enriches events by a hash chain like the `IntegrityEnricher`,
+    but events are collected into blocks and every block is serialized and hashed in a worker thread
+    of the `asab.ProactorService`, so that the event loop is not blocked by the hashing.
+
+    Blocks are hashed and forwarded strictly in the order of their arrival, the chain continues
+    from the last event of a block to the first event of the next one.
+
+    Every event of a block is also enriched by `block_key`, the root of a Merkle tree of all hashes of the block.
+    The block key is added after the hashing, it is not part of the event hash.
+    Blocks can be verified independently (and in parallel) by `bspump.integrity.verify_block()`.
+
+    A block is completed when it reaches `batch_size` events or `batch_timeout` seconds after its first event.
+    """
+
+    ConfigDefaults = {
+        "algorithm": "SHA256",
+        "hash_key": "_id",
+        "prev_hash_key": "_prev_id",
+        "block_key": "_block",
+        "salt_length": 3,
+    }
+
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id, config)
+        self.Algorithm = self.Config["algorithm"]
+        self.HashKey = self.Config["hash_key"]
+        self.PrevHashKey = self.Config["prev_hash_key"]
+        self.BlockKey = self.Config["block_key"]
+        self.SaltLength = int(self.Config["salt_length"])
+
+        self.PreviousHash = None
+
+        self.ProactorService = app.get_service("asab.ProactorService")
+
+    def process(self, context, event):
+        # Check that the event is a dictionary
+        assert isinstance(event, dict)
+        return super().process(context, event)
+
+    async def process_block(self, block):
+        events = [event for _, event in block]
+        self.PreviousHash = await self.ProactorService.execute(
+            self.enrich_block, events, self.PreviousHash
+        )
+        return events
+
+    def enrich_block(self, events, previous_hash):
+        """
+        Hashes the block of events, it is called in a worker thread.
+        Returns the hash of the last event.
+        """
+        digests = []
+        for event in events:
+            previous_hash = hash_event(
+                event,
+                self.Algorithm,
+                self.HashKey,
+                self.PrevHashKey,
+                previous_hash,
+                self.SaltLength,
+            )
+            digests.append(previous_hash)
+
+        root = merkle_root(digests, self.Algorithm)
+        for event in events:
+            event[self.BlockKey] = root
+
+        return previous_hash
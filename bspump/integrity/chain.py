@@ -0,0 +1,124 @@
+import secrets
+import hashlib
+
+import orjson
+
+###
+
+
+def hash_event(event, algorithm, hash_key, prev_hash_key, previous_hash, salt_length):
+    """
+    Salts the event, links it to the `previous_hash`, hashes it and stores the hex digest into `hash_key`.
+    Returns the hex digest, which is the `previous_hash` of the next event of the chain.
+    """
+    # Check if hash / previous hash already present in event and if so, delete it from event
+    event.pop(hash_key, None)
+
+    # Salt event - to ensure that events are not going to be the same after hash
+    event["_s"] = secrets.token_urlsafe(salt_length)
+
+    # Set previous hash
+    if previous_hash is not None:
+        event[prev_hash_key] = previous_hash
+    else:
+        event.pop(prev_hash_key, None)
+
+    h = hashlib.new(algorithm)
+    h.update(orjson.dumps(event, option=orjson.OPT_SORT_KEYS))
+    digest = h.hexdigest()
+
+    event[hash_key] = digest
+    return digest
+
+
+def merkle_root(digests, algorithm):
+    """
+    Computes the root of a Merkle tree over hex `digests` of events, returns it as a hex string.
+
+    Leaves and inner nodes are hashed with a different prefix (0x00 and 0x01, as in RFC 6962),
+    an odd node of a level is promoted to the next level unchanged.
+    """
+    level = []
+    for digest in digests:
+        h = hashlib.new(algorithm)
+        h.update(b"\x00")
+        h.update(bytes.fromhex(digest))
+        level.append(h.digest())
+
+    if len(level) == 0:
+        return hashlib.new(algorithm).hexdigest()
+
+    while len(level) > 1:
+        parents = []
+        for i in range(0, len(level) - 1, 2):
+            h = hashlib.new(algorithm)
+            h.update(b"\x01")
+            h.update(level[i])
+            h.update(level[i + 1])
+            parents.append(h.digest())
+        if len(level) % 2 == 1:
+            parents.append(level[-1])
+        level = parents
+
+    return level[0].hex()
+
+
+def verify_event(event, algorithm, hash_key, exclude=()):
+    """
+    Returns True if the hash stored in `hash_key` of the event matches its content.
+    Keys in `exclude` (e.g. a block digest added after hashing) are not part of the hash.
+    """
+    digest = event.get(hash_key)
+    if digest is None:
+        return False
+
+    content = {
+        key: value
+        for key, value in event.items()
+        if key != hash_key and key not in exclude
+    }
+    h = hashlib.new(algorithm)
+    h.update(orjson.dumps(content, option=orjson.OPT_SORT_KEYS))
+    return h.hexdigest() == digest
+
+
+def verify_block(
+    events,
+    algorithm="SHA256",
+    hash_key="_id",
+    prev_hash_key="_prev_id",
+    block_key="_block",
+    previous_hash=None,
+):
+    """
+    Verifies a block of events produced by the `IntegrityBlockEnricher`:
+    the hash of every event, the links of the chain inside of the block and the Merkle root of the block.
+    When `previous_hash` is given, the first event must be linked to it.
+
+    Blocks don't depend on each other except for the `previous_hash`, so they can be verified in parallel,
+    e.g. by the `asab.ProactorService`.
+    """
+    if len(events) == 0:
+        return True
+
+    root = events[0].get(block_key)
+    if root is None:
+        return False
+
+    expected_previous = previous_hash
+    for event in events:
+        if event.get(block_key) != root:
+            return False
+
+        if (
+            expected_previous is not None
+            and event.get(prev_hash_key) != expected_previous
+        ):
+            return False
+
+        if not verify_event(event, algorithm, hash_key, exclude=(block_key,)):
+            return False
+
+        expected_previous = event[hash_key]
+
+    return merkle_root([event[hash_key] for event in events], algorithm) == root
@@ -1,12 +1,9 @@
 import logging
 
-import secrets
-import hashlib
 import base64
 
-import orjson
-
 from ..abc.processor import Processor
+from .chain import hash_event
 
 ###
 
@@ -45,28 +42,15 @@ class IntegrityEnricher(Processor):
         # Check that the event is a dictionary
         assert isinstance(event, dict)
 
-        # Check if hash / previous hash already present in event and if so, delete it from event
-        event.pop(self.HashKey, None)
-
-        # Salt event - to ensure that events are not going to be the same after hash
-        event["_s"] = secrets.token_urlsafe(self.SaltLength)
-
-        # Set previous hash
-        if self.PreviousHash is not None:
-            event[self.PrevHashKey] = self.PreviousHash
-        else:
-            event.pop(self.PrevHashKey, None)
-
-        # Hash event using key, value, key, value ... sequence
-        h = hashlib.new(self.Algorithm)
-        h.update(orjson.dumps(event, option=orjson.OPT_SORT_KEYS))
-        hash_base64 = h.hexdigest()
-
-        # Store the hash as base64 string
-        event[self.HashKey] = hash_base64
-
         # Actual hash will become previous hash in the next iteration
-        self.PreviousHash = hash_base64
+        self.PreviousHash = hash_event(
+            event,
+            self.Algorithm,
+            self.HashKey,
+            self.PrevHashKey,
+            self.PreviousHash,
+            self.SaltLength,
+        )
 
         return event
 
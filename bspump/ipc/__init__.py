@@ -5,6 +5,12 @@ from .datagram import DatagramSource, DatagramSink
 from .stream_client_sink import StreamClientSink
 from .stream_server_source import StreamServerSource
 
+from .protocol import (
+    LineSourceProtocol,
+    LengthPrefixedSourceProtocol,
+    OctetCountingSourceProtocol,
+)
+
 # Backward compatibility
 StreamSource = StreamServerSource
 StreamSink = StreamClientSink
@@ -16,4 +22,7 @@ __all__ = (
     "StreamClientSink",
     "StreamSink",
     "StreamSource",
+    "LineSourceProtocol",
+    "LengthPrefixedSourceProtocol",
+    "OctetCountingSourceProtocol",
 )
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+import os
 import socket
 
 from ..abc.source import Source
@@ -15,14 +16,26 @@ L = logging.getLogger(__name__)
 
 class DatagramSource(Source):
     """
-    Description:
+    Description: Receives datagrams (UDP or unix datagram socket), every datagram is an event.
+
+    After a wakeup, all datagrams that are waiting in the socket are drained by non-blocking `recvfrom()` calls
+    (up to `receive_batch` of them) and processed, so that a burst doesn't overflow the kernel receive buffer.
+
+    With `sockets` > 1, several sockets are bound to the same address with `SO_REUSEPORT`
+    and the kernel spreads datagrams among them. The same applies to several BSPump processes
+    that listen at the same address, which is the way to spread the load across CPU cores.
+
+    The receive queue length and the number of datagrams dropped by the kernel are read
+    from `/proc/net/udp` (Linux) into the `bspump.datagram` gauge.
 
     """
 
     ConfigDefaults = {
         "address": "127.0.0.1 8888",  # IPv4, IPv6 or unix socket path
         "max_packet_size": 64 * 1024,
-        "receiver_buffer_size": 0,
+        "receiver_buffer_size": 0,  # SO_RCVBUF, 0 means the system default
+        "receive_batch": 1000,  # Maximum number of datagrams received in one wakeup
+        "sockets": 1,  # Number of SO_REUSEPORT sockets bound to the address
     }
 
     def __init__(self, app, pipeline, id=None, config=None):
@@ -39,58 +52,94 @@ class DatagramSource(Source):
 
         # Receive Buffer Size
         self.ReceiveBufferSize = int(self.Config["receiver_buffer_size"])
+        self.ReceiveBatch = int(self.Config["receive_batch"])
 
         addrline = self.Address.strip()
-        if addrline.count(":") == 1:
-            host, port = self.Address.rsplit(":", maxsplit=1)
+        if " " in addrline or addrline.count(":") == 1:
+            if " " in addrline:
+                host, port = addrline.rsplit(" ", maxsplit=1)
+            else:
+                host, port = addrline.rsplit(":", maxsplit=1)
             (family, socktype, proto, canonname, sockaddr) = socket.getaddrinfo(
-                host, port
+                host, port, type=socket.SOCK_DGRAM
             )[0]
 
-            self.Socket = socket.socket(family, socket.SOCK_DGRAM)
-            self.Socket.setblocking(False)
-            self.Socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.Socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
-            if self.ReceiveBufferSize > 0:
-                self.Socket.setsockopt(
-                    socket.SOL_SOCKET, socket.SO_RCVBUF, self.ReceiveBufferSize
-                )
-
-            self.Socket.bind(sockaddr)
+            self.Socket = self._create_socket(family, sockaddr)
+            # An ephemeral port (0) is resolved by the first bind
+            sockaddr = self.Socket.getsockname()
+            self.Sockets = [self.Socket] + [
+                self._create_socket(family, sockaddr)
+                for _ in range(int(self.Config["sockets"]) - 1)
+            ]
 
         else:
-            self.Socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
-            self.Socket.setblocking(False)
-            self.Socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.Socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
-            if self.ReceiveBufferSize > 0:
-                self.Socket.setsockopt(
-                    socket.SOL_SOCKET, socket.SO_RCVBUF, self.ReceiveBufferSize
-                )
-
-            self.Socket.bind(self.Address)
+            # Only one socket can be bound to a unix socket path
+            self.Socket = self._create_socket(socket.AF_UNIX, self.Address)
+            self.Sockets = [self.Socket]
 
         self.MaxPacketSize = int(self.Config["max_packet_size"])
 
+        metrics_service = app.get_service("asab.MetricsService")
+        self.KernelGauge = metrics_service.create_gauge(
+            "bspump.datagram",
+            tags={"pipeline": pipeline.Id, "source": self.Id},
+            init_values={
+                "kernel.rx_queue": 0,
+                "kernel.drops": 0,
+            },
+        )
+        if self.Socket.family in (socket.AF_INET, socket.AF_INET6):
+            app.PubSub.subscribe("Application.tick/10!", self._on_tick)
+
+    def _create_socket(self, family, address):
+        sock = socket.socket(family, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        if self.ReceiveBufferSize > 0:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.ReceiveBufferSize)
+            # Linux doubles the requested value, but caps it by net.core.rmem_max
+            actual = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+            if actual < self.ReceiveBufferSize:
+                L.warning(
+                    "Receive buffer size of '{}' limited by the system to {} bytes, consider increasing net.core.rmem_max".format(
+                        self.Id, actual
+                    )
+                )
+
+        sock.bind(address)
+        return sock
+
     async def main(self):
-        task = asyncio.ensure_future(self._receive())
+        tasks = [asyncio.ensure_future(self._receive(sock)) for sock in self.Sockets]
 
         await self.stopped()
 
-        task.cancel()
-        await task
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks)
+
+        for sock in self.Sockets:
+            sock.close()
 
-        self.Socket.close()
+    async def _receive(self, sock):
+        recvfrom = sock.recvfrom
+        max_packet_size = self.MaxPacketSize
 
-    async def _receive(self):
         while True:
             try:
                 await self.Pipeline.ready()
-                event, peer = await self.Loop.sock_recvfrom(
-                    self.Socket, self.MaxPacketSize
-                )
-                await self.Pipeline.ready()
-                await self.process(event, context={"datagram": peer})
+
+                # Wait for the first datagram, then drain all that are already waiting
+                batch = [await self.Loop.sock_recvfrom(sock, max_packet_size)]
+                while len(batch) < self.ReceiveBatch:
+                    try:
+                        batch.append(recvfrom(max_packet_size))
+                    except (BlockingIOError, InterruptedError):
+                        break
+
+                for event, peer in batch:
+                    await self.process(event, context={"datagram": peer})
 
             except asyncio.CancelledError:
                 break
@@ -99,6 +148,50 @@ class DatagramSource(Source):
                 L.exception("Error in datagram source.")
                 raise
 
+    def _on_tick(self, event_name):
+        rx_queue, drops = read_udp_socket_stats(self.Sockets)
+        if rx_queue is None:
+            return
+        self.KernelGauge.set("kernel.rx_queue", rx_queue)
+        self.KernelGauge.set("kernel.drops", drops)
+
+
+def read_udp_socket_stats(sockets):
+    """
+    Returns a tuple of the total receive queue size (in bytes) and the total number of dropped datagrams
+    of `sockets`, as reported by the kernel in `/proc/net/udp` and `/proc/net/udp6`.
+    Returns (None, None) if the statistics are not available.
+    """
+    inodes = set()
+    for sock in sockets:
+        try:
+            inodes.add(str(os.fstat(sock.fileno()).st_ino))
+        except OSError:
+            pass
+
+    rx_queue = 0
+    drops = 0
+    found = False
+    for fname in ("/proc/net/udp", "/proc/net/udp6"):
+        try:
+            with open(fname, "r") as f:
+                next(f)  # Header
+                for line in f:
+                    # sl local_address rem_address st tx_queue:rx_queue tr:tm->when retrnsmt uid timeout inode ref pointer drops
+                    fields = line.split()
+                    if len(fields) < 13 or fields[9] not in inodes:
+                        continue
+                    rx_queue += int(fields[4].split(":")[1], 16)
+                    drops += int(fields[12])
+                    found = True
+        except (OSError, StopIteration):
+            continue
+
+    if not found:
+        return None, None
+
+    return rx_queue, drops
+
 
 class DatagramSink(Sink):
     """
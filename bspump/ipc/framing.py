@@ -0,0 +1,209 @@
+import struct
+
+#
+
+
+class FrameBuffer(object):
+    """
+    Description: Receive buffer of a single connection, it is reused for the whole life of the connection.
+
+    Data are received directly into the free tail of the buffer (see `free()`), frames are then sliced out
+    from the `Start` of the buffer as memoryviews, so that no bytes are copied when searching for a frame.
+    The unconsumed remainder (an incomplete frame) is moved to the beginning of the buffer only when
+    the free tail becomes short; the buffer grows only when a single frame doesn't fit in.
+    """
+
+    def __init__(self, size=64 * 1024):
+        self.Buffer = bytearray(size)
+        self.View = memoryview(self.Buffer)
+
+        # Consumed data are before `Start`, received data are between `Start` and `End`
+        self.Start = 0
+        self.End = 0
+
+        # Position from which a framing resumes the search for a frame boundary
+        self.Mark = 0
+
+    def __len__(self):
+        return self.End - self.Start
+
+    def free(self):
+        """
+        Description: Returns a memoryview of the free part of the buffer, to be passed to `recv_into()`.
+        Received bytes must be confirmed by `commit()`.
+        """
+        if self.Start == self.End:
+            # Everything has been consumed, rewind for free
+            self.Start = self.End = self.Mark = 0
+
+        elif len(self.Buffer) - self.End < len(self.Buffer) // 4:
+            pending = self.End - self.Start
+            if self.Start > 0:
+                # Compact, only the incomplete frame is copied
+                self.View[:pending] = bytes(self.View[self.Start : self.End])
+                self.Mark = max(0, self.Mark - self.Start)
+                self.Start = 0
+                self.End = pending
+
+            if len(self.Buffer) - self.End < len(self.Buffer) // 4:
+                # The incomplete frame fills most of the buffer, grow it
+                buffer = bytearray(len(self.Buffer) * 2)
+                buffer[:pending] = self.View[:pending]
+                self.Buffer = buffer
+                self.View = memoryview(buffer)
+
+        return self.View[self.End :]
+
+    def commit(self, size):
+        """
+        Description: Confirms that `size` bytes have been received into the view returned by `free()`.
+        """
+        self.End += size
+
+
+class LineFraming(object):
+    """
+    Description: Frames are terminated by `eol` (non-transparent framing).
+    The search for `eol` is resumed where the previous one ended, so a long line that is received
+    in many chunks is scanned only once.
+    """
+
+    def __init__(self, eol=b"\n", max_length=64 * 1024):
+        self.EOL = eol
+        self.MaxLength = max_length
+
+    def frames(self, buffer):
+        """
+        Description: Yields memoryviews of complete frames in the `buffer`, frames are removed from the buffer.
+        The memoryview is valid only until the next `buffer.free()` call.
+        """
+        find = buffer.Buffer.find
+        eol = self.EOL
+
+        while True:
+            pos = find(eol, max(buffer.Start, buffer.Mark), buffer.End)
+            if pos == -1:
+                if buffer.End - buffer.Start > self.MaxLength:
+                    raise RuntimeError(
+                        "Line exceeds the maximum length of {} bytes".format(
+                            self.MaxLength
+                        )
+                    )
+                # EOL may be split between this and the next chunk
+                buffer.Mark = max(buffer.Start, buffer.End - len(eol) + 1)
+                return
+
+            frame = buffer.View[buffer.Start : pos]
+            buffer.Start = buffer.Mark = pos + len(eol)
+            yield frame
+
+
+class LengthPrefixedFraming(object):
+    """
+    Description: Every frame is prefixed by its length, encoded as a binary integer.
+    The `prefix_format` is a `struct` format, the default is a 4-byte unsigned big-endian integer.
+    """
+
+    def __init__(self, prefix_format=">I", max_length=64 * 1024):
+        self.Prefix = struct.Struct(prefix_format)
+        self.MaxLength = max_length
+
+    def frames(self, buffer):
+        """
+        Description: Yields memoryviews of complete frames in the `buffer`, frames are removed from the buffer.
+        The memoryview is valid only until the next `buffer.free()` call.
+        """
+        prefix_size = self.Prefix.size
+        unpack_from = self.Prefix.unpack_from
+
+        while buffer.End - buffer.Start >= prefix_size:
+            (length,) = unpack_from(buffer.Buffer, buffer.Start)
+            if length > self.MaxLength:
+                raise RuntimeError(
+                    "Frame length {} exceeds the maximum length of {} bytes".format(
+                        length, self.MaxLength
+                    )
+                )
+
+            start = buffer.Start + prefix_size
+            end = start + length
+            if end > buffer.End:
+                return
+
+            frame = buffer.View[start:end]
+            buffer.Start = end
+            yield frame
+
+
+class OctetCountingFraming(object):
+    """
+    Description: Octet-counting framing of syslog over TCP, as specified in RFC 6587, section 3.4.1:
+    `MSG-LEN SP SYSLOG-MSG`, where MSG-LEN is the length of the message as ASCII decimal number.
+
+    Senders that use the traditional non-transparent framing (RFC 6587, section 3.4.2) can share the same port:
+    if a frame doesn't start with a digit, it is read up to `fallback_eol`.
+    Set `fallback_eol` to None to accept octet-counted frames only.
+    """
+
+    MaxDigits = 10
+
+    def __init__(self, max_length=64 * 1024, fallback_eol=b"\n"):
+        self.MaxLength = max_length
+        self.FallbackEOL = fallback_eol
+
+    def frames(self, buffer):
+        """
+        Description: Yields memoryviews of complete frames in the `buffer`, frames are removed from the buffer.
+        The memoryview is valid only until the next `buffer.free()` call.
+        """
+        data = buffer.Buffer
+        find = data.find
+
+        while buffer.End > buffer.Start:
+            if not 0x30 <= data[buffer.Start] <= 0x39:
+                if self.FallbackEOL is None:
+                    raise RuntimeError(
+                        "Octet-counted frame doesn't start with a length"
+                    )
+
+                pos = find(self.FallbackEOL, max(buffer.Start, buffer.Mark), buffer.End)
+                if pos == -1:
+                    if buffer.End - buffer.Start > self.MaxLength:
+                        raise RuntimeError(
+                            "Line exceeds the maximum length of {} bytes".format(
+                                self.MaxLength
+                            )
+                        )
+                    buffer.Mark = max(
+                        buffer.Start, buffer.End - len(self.FallbackEOL) + 1
+                    )
+                    return
+
+                frame = buffer.View[buffer.Start : pos]
+                buffer.Start = buffer.Mark = pos + len(self.FallbackEOL)
+                yield frame
+                continue
+
+            sp = find(
+                b" ", buffer.Start, min(buffer.End, buffer.Start + self.MaxDigits + 1)
+            )
+            if sp == -1:
+                if buffer.End - buffer.Start > self.MaxDigits:
+                    raise RuntimeError("Invalid length of an octet-counted frame")
+                return
+
+            length = int(data[buffer.Start : sp])
+            if length > self.MaxLength:
+                raise RuntimeError(
+                    "Frame length {} exceeds the maximum length of {} bytes".format(
+                        length, self.MaxLength
+                    )
+                )
+
+            end = sp + 1 + length
+            if end > buffer.End:
+                return
+
+            frame = buffer.View[sp + 1 : end]
+            buffer.Start = buffer.Mark = end
+            yield frame
@@ -1,5 +1,12 @@
 import codecs
 
+from .framing import (
+    FrameBuffer,
+    LineFraming,
+    LengthPrefixedFraming,
+    OctetCountingFraming,
+)
+
 
 class SourceProtocolABC(object):
     """
@@ -26,9 +33,14 @@ class SourceProtocolABC(object):
         raise NotImplementedError()
 
 
-class LineSourceProtocol(SourceProtocolABC):
+class FramedSourceProtocol(SourceProtocolABC):
     """
-    Description: Basically readline() for reading lines from a socket.
+    Description: Reads frames from a socket using a framing (see `bspump.ipc.framing`).
+
+    Data are received into a per-connection `FrameBuffer` and all complete frames are decoded
+    and processed after each `recv_into()`, without copying the buffer.
+    A frame longer than `max_frame_length` closes the connection.
+    Subclasses implement `build_framing()`.
     """
 
     def __init__(self, app, pipeline, config):
@@ -39,19 +51,25 @@ class LineSourceProtocol(SourceProtocolABC):
         """
         super().__init__(app, pipeline, config)
 
-        # TODO: All following values could be read from configuration
-        self.EOL = b"\n"
-        self.SaneBufferSize = 64 * 1024  # The maximum buffer size considered as sane
+        self.MaxFrameLength = int(config.get("max_frame_length", 64 * 1024))
+        self.BufferSize = int(config.get("buffer_size", 64 * 1024))
+        self.Framing = self.build_framing(config)
 
-        # Line decoder
+        # Frame decoder
         decode_codec = config["decode"]
-        if decode_codec == "bytes":
+        if decode_codec in ("bytes", ""):
             self.Codec = None
             self.LineDecoder = self._line_bytes_decoder
         else:
             self.Codec = codecs.lookup(decode_codec)
             self.LineDecoder = self._line_codec_decoder
 
+    def build_framing(self, config):
+        """
+        Description: Override this method to return a framing object with a `frames(buffer)` generator.
+        """
+        raise NotImplementedError()
+
     async def handle(self, source, stream, context):
         """
         Description:
@@ -59,14 +77,12 @@ class LineSourceProtocol(SourceProtocolABC):
 
         """
         pipeline = source.Pipeline
-
-        input_buffer = bytearray(b" " * 8)
-        input_buffer_mv = memoryview(input_buffer)
-        input_buffer_pos = 0
-        last_eol_pos = 0
+        buffer = FrameBuffer(self.BufferSize)
+        frames = self.Framing.frames
+        decoder = self.LineDecoder
 
         while True:
-            recv_bytes = await stream.recv_into(input_buffer_mv[input_buffer_pos:])
+            recv_bytes = await stream.recv_into(buffer.free())
             if recv_bytes <= 0:
                 # Client closed the connection
                 if recv_bytes < 0:
@@ -75,41 +91,55 @@ class LineSourceProtocol(SourceProtocolABC):
                     )
                 return
 
-            input_buffer_pos += recv_bytes
-            if len(input_buffer) == input_buffer_pos:
-                if len(input_buffer) > self.SaneBufferSize:
-                    raise RuntimeError("Insane buffer size requested")
-                # Grow the input_buffer if the size touches the top
-                new_input_buffer = bytearray(b" " * (len(input_buffer) * 2))
-                input_buffer_mv = memoryview(new_input_buffer)
-                input_buffer_mv[
-                    : len(input_buffer)
-                ] = input_buffer  # Copy the content of the old buffer
-                input_buffer = new_input_buffer
-
-            while last_eol_pos < input_buffer_pos:
-                # Seek for end of line symbol in the buffer
-                eol_pos = input_buffer[:input_buffer_pos].find(self.EOL, last_eol_pos)
-                if eol_pos == -1:
-                    break
-
-                line = self.LineDecoder(line_bytes=input_buffer[last_eol_pos:eol_pos])
-                last_eol_pos = eol_pos + 1
+            buffer.commit(recv_bytes)
 
+            for frame in frames(buffer):
+                line = decoder(frame)
                 await pipeline.ready()
                 await source.process(line, context=context.copy())
 
-            # TODO: HIGH PRIORITY This definitively doesn't cover all possible cases
-
-            # If the '\n' is at the end of the buffer, reset the buffer position
-            if last_eol_pos == input_buffer_pos:
-                input_buffer_pos = 0
-                last_eol_pos = 0
-                continue
-
     def _line_codec_decoder(self, line_bytes):
         line, _ = self.Codec.decode(line_bytes)
         return line
 
     def _line_bytes_decoder(self, line_bytes):
-        return line_bytes
+        # The frame is a view into the receive buffer, that is going to be reused
+        return bytes(line_bytes)
+
+
+class LineSourceProtocol(FramedSourceProtocol):
+    """
+    Description: Basically readline() for reading lines from a socket.
+    Lines are terminated by `eol` (LF by default, escape sequences such as `\\r\\n` are allowed in the configuration).
+    """
+
+    def build_framing(self, config):
+        eol = config.get("eol", "\n")
+        if isinstance(eol, str):
+            eol = codecs.escape_decode(eol.encode("utf-8"))[0]
+        return LineFraming(eol=eol, max_length=self.MaxFrameLength)
+
+
+class LengthPrefixedSourceProtocol(FramedSourceProtocol):
+    """
+    Description: Reads frames prefixed by their length, encoded as a binary integer.
+    The `length_prefix` is a `struct` format of the prefix, 4-byte unsigned big-endian integer (`>I`) by default.
+    """
+
+    def build_framing(self, config):
+        return LengthPrefixedFraming(
+            prefix_format=config.get("length_prefix", ">I"),
+            max_length=self.MaxFrameLength,
+        )
+
+
+class OctetCountingSourceProtocol(FramedSourceProtocol):
+    """
+    Description: Reads syslog messages framed according to RFC 6587 (syslog over TCP).
+
+    Octet-counted messages (`MSG-LEN SP SYSLOG-MSG`) are read as well as the traditional LF-terminated ones,
+    so senders using either framing can share the same port.
+    """
+
+    def build_framing(self, config):
+        return OctetCountingFraming(max_length=self.MaxFrameLength)
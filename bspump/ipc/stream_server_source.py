@@ -28,6 +28,10 @@ class StreamServerSource(Source):
         # An encoding a line is going to be decoded from
         # - Pass '' (empty string) to prevent decoding
         "decode": "utf-8",
+        # Framing of the inbound stream, see the protocol class
+        "eol": "\n",  # End of line of LineSourceProtocol
+        "max_frame_length": 64 * 1024,  # Longer frames (lines) close the connection
+        "buffer_size": 64 * 1024,  # Initial size of the receive buffer of a connection
     }
 
     def __init__(
@@ -1,11 +1,14 @@
-from .index import Index, BitMapIndex, TreeRangeIndex, SliceIndex
+from .bitset import BitSet
+from .index import Index, IncrementalIndex, BitMapIndex, TreeRangeIndex, SliceIndex
 from .ipgeolookup import IPGeoLookup
 from .matrixlookup import MatrixLookup
 
 __all__ = (
     "IPGeoLookup",
     "MatrixLookup",
+    "BitSet",
     "Index",
+    "IncrementalIndex",
     "BitMapIndex",
     "TreeRangeIndex",
     "SliceIndex",
@@ -0,0 +1,152 @@
+import numpy as np
+
+###
+
+WORD_BITS = 64
+
+###
+
+
+class BitSet(object):
+    """
+    Set of non-negative integers (row indexes of a matrix) packed into 64-bit words.
+
+    Only words between the first and the last non-empty one are stored (`Offset` is the number
+    of the first stored word), so a set of rows that are close to each other stays small
+    even in a large matrix.
+
+    Intersections and unions are computed word by word, see `&` and `|` operators.
+    """
+
+    __slots__ = ("Offset", "Words")
+
+    def __init__(self, indexes=None):
+        self.Offset = 0
+        self.Words = np.zeros(0, dtype=np.uint64)
+        if indexes is not None:
+            self.add(indexes)
+
+    @classmethod
+    def from_words(cls, offset, words):
+        bitset = cls()
+        bitset.Offset = int(offset)
+        bitset.Words = np.asarray(words, dtype=np.uint64)
+        bitset._trim()
+        return bitset
+
+    def copy(self):
+        bitset = BitSet()
+        bitset.Offset = self.Offset
+        bitset.Words = self.Words.copy()
+        return bitset
+
+    def add(self, indexes):
+        """
+        Adds an integer or an array of integers to the set.
+        """
+        indexes = np.asarray(indexes, dtype=np.int64).ravel()
+        if len(indexes) == 0:
+            return
+
+        words = indexes >> 6
+        self._cover(int(words.min()), int(words.max()))
+        np.bitwise_or.at(self.Words, words - self.Offset, _bits(indexes))
+
+    def discard(self, indexes):
+        """
+        Removes an integer or an array of integers from the set, missing ones are ignored.
+        """
+        indexes = np.asarray(indexes, dtype=np.int64).ravel()
+        words = (indexes >> 6) - self.Offset
+        inside = (words >= 0) & (words < len(self.Words))
+        if not np.any(inside):
+            return
+
+        np.bitwise_and.at(self.Words, words[inside], ~_bits(indexes[inside]))
+        self._trim()
+
+    def indexes(self):
+        """
+        Returns a sorted array of integers in the set.
+        """
+        bits = np.unpackbits(self.Words.astype("<u8").view(np.uint8), bitorder="little")
+        return np.flatnonzero(bits) + self.Offset * WORD_BITS
+
+    def __contains__(self, index):
+        word = (index >> 6) - self.Offset
+        if word < 0 or word >= len(self.Words):
+            return False
+        return bool(self.Words[word] & _bits(index))
+
+    def __len__(self):
+        return int(
+            np.unpackbits(self.Words.astype("<u8").view(np.uint8)).sum(dtype=np.int64)
+        )
+
+    def __bool__(self):
+        return len(self.Words) > 0
+
+    def __iter__(self):
+        return iter(self.indexes().tolist())
+
+    def __and__(self, other):
+        lo = max(self.Offset, other.Offset)
+        hi = min(self.Offset + len(self.Words), other.Offset + len(other.Words))
+        if lo >= hi:
+            return BitSet()
+
+        return BitSet.from_words(
+            lo,
+            self.Words[lo - self.Offset : hi - self.Offset]
+            & other.Words[lo - other.Offset : hi - other.Offset],
+        )
+
+    def __or__(self, other):
+        if not other:
+            return self.copy()
+
+        bitset = self.copy()
+        bitset._cover(other.Offset, other.Offset + len(other.Words) - 1)
+        start = other.Offset - bitset.Offset
+        bitset.Words[start : start + len(other.Words)] |= other.Words
+        return bitset
+
+    def __eq__(self, other):
+        if not isinstance(other, BitSet):
+            return NotImplemented
+        return self.Offset == other.Offset and np.array_equal(self.Words, other.Words)
+
+    def __repr__(self):
+        return "BitSet({})".format(self.indexes().tolist())
+
+    def _cover(self, lo, hi):
+        """
+        Extends stored words to cover words from `lo` to `hi` (inclusive).
+        """
+        if len(self.Words) == 0:
+            self.Offset = lo
+            self.Words = np.zeros(hi - lo + 1, dtype=np.uint64)
+            return
+
+        end = self.Offset + len(self.Words)
+        if lo >= self.Offset and hi < end:
+            return
+
+        offset = min(lo, self.Offset)
+        words = np.zeros(max(hi + 1, end) - offset, dtype=np.uint64)
+        words[self.Offset - offset : end - offset] = self.Words
+        self.Offset = offset
+        self.Words = words
+
+    def _trim(self):
+        nonzero = np.flatnonzero(self.Words)
+        if len(nonzero) == 0:
+            self.Offset = 0
+            self.Words = np.zeros(0, dtype=np.uint64)
+        elif nonzero[0] > 0 or nonzero[-1] < len(self.Words) - 1:
+            self.Offset += int(nonzero[0])
+            self.Words = self.Words[nonzero[0] : nonzero[-1] + 1].copy()
+
+
+def _bits(indexes):
+    return np.left_shift(np.uint64(1), np.asarray(indexes & 63, dtype=np.uint64))
@@ -1,7 +1,11 @@
+import base64
+import io
 import logging
 
 import numpy as np
 
+from .bitset import BitSet
+
 ###
 
 L = logging.getLogger(__name__)
@@ -26,200 +30,342 @@ class Index(object):
     def search(self, *args) -> set:
         raise NotImplementedError()
 
-
-class BitMapIndex(Index):
-    def __init__(self, column, matrix, id=None):
+    def search_bitset(self, *args) -> BitSet:
         """
-        Make sure, that column values are discreet.
-        Also the creation procedure is relatively slow.
+        Returns matrix indexes as a `BitSet`, override if the index is backed by bitsets.
         """
+        return BitSet(list(self.search(*args)))
+
+
+class IncrementalIndex(Index):
+    """
+    Base of indexes that are maintained incrementally.
+
+    The index remembers values of its `Columns` for every indexed row.
+    `update()` compares them with the matrix and changes only rows that were added, closed or modified since,
+    it is meant for full resyncs (e.g. after the matrix is flushed).
+    Rows can be also added by `add_rows()` and removed by `close_rows()`, right when the matrix changes,
+    `MatrixLookup` does so on row changes published by the matrix.
+
+    Subclasses implement `_add()` and `_remove()`, both receive an array of rows
+    and a tuple of arrays of their column values.
+    """
+
+    def __init__(self, columns, matrix, id=None):
         super().__init__(id=id)
-        self.Column = column
-        self.BitMap = {}
+        self.Columns = columns
+        # Rows in the index and their values of `Columns`
+        self.Indexed = np.zeros(0, dtype=bool)
+        self.RowValues = tuple(
+            np.zeros(0, dtype=matrix.Array.dtype[column]) for column in columns
+        )
 
-        open_rows = list(matrix.I2NMap.keys())
-        self.UniqueValues = list(np.unique(matrix.Array[self.Column][open_rows]))
+    def update(self, matrix):
+        size = matrix.Array.shape[0]
+        self._truncate(size)
+
+        indexed = np.zeros(size, dtype=bool)
+        indexed[_open_rows(matrix)] = True
+        self._change(
+            np.arange(size),
+            indexed,
+            tuple(matrix.Array[column] for column in self.Columns),
+        )
 
-        for u in self.UniqueValues:
-            x = np.where(matrix.Array[self.Column] == u)
-            self.BitMap[int(u)] = set(x[0].tolist())
+    def add_row(self, row_index, matrix):
+        """
+        Indexes the row (again, when it has been modified).
+        """
+        self.add_rows(np.array([row_index]), matrix)
 
-    def search(self, value):
+    def add_rows(self, row_indexes, matrix):
         """
-        Returns set of matrix indexes.
+        Indexes distinct rows (again, when they have been modified).
         """
+        rows = np.asarray(row_indexes, dtype=np.int64)
+        self._change(
+            rows,
+            np.ones(len(rows), dtype=bool),
+            tuple(matrix.Array[column][rows] for column in self.Columns),
+        )
 
-        return set(self.BitMap.get(str(value), []))
+    def close_row(self, row_index):
+        self.close_rows(np.array([row_index]))
 
-    def update(self, matrix):
-        open_rows = list(matrix.I2NMap.keys())
-        unique_values = set(np.unique(matrix.Array[self.Column][open_rows]))
-        set_difference_left = (
-            set(self.UniqueValues) - unique_values
-        )  # there are some deleted vals
-        set_difference_right = unique_values - set(
-            self.UniqueValues
-        )  # there are some added vals
-
-        if len(set_difference_left) != 0:
-            for set_member in set_difference_left:
-                self.BitMap.pop(set_member)
-
-        if len(set_difference_right) != 0:
-            for set_member in set_difference_right:
-                x = np.where(matrix.Array[self.Column] == set_member)
-                self.BitMap[str(set_member)] = set(x[0].tolist())
-
-        self.UniqueValues = list(unique_values)
+    def close_rows(self, row_indexes):
+        """
+        Removes distinct rows from the index, rows that are not indexed are skipped.
+        """
+        rows = np.asarray(row_indexes, dtype=np.int64)
+        rows = rows[rows < len(self.Indexed)]
+        rows = rows[self.Indexed[rows]]
+        if len(rows) == 0:
+            return
+
+        self._change(
+            rows,
+            np.zeros(len(rows), dtype=bool),
+            tuple(values[rows] for values in self.RowValues),
+        )
+
+    def _truncate(self, size):
+        """
+        Removes rows that are beyond the end of the matrix (e.g. after its flush).
+        """
+        if len(self.Indexed) <= size:
+            return
+
+        rows = np.flatnonzero(self.Indexed[size:]) + size
+        self._remove(rows, tuple(values[rows] for values in self.RowValues))
+        self.Indexed = self.Indexed[:size].copy()
+        self.RowValues = tuple(values[:size].copy() for values in self.RowValues)
+
+    def _change(self, rows, indexed, values):
+        size = int(rows.max()) + 1 if len(rows) > 0 else 0
+        if size > len(self.Indexed):
+            self.Indexed = _fit(self.Indexed, size)
+            self.RowValues = tuple(_fit(old, size) for old in self.RowValues)
+
+        was_indexed = self.Indexed[rows]
+        old_values = tuple(old[rows] for old in self.RowValues)
+        modified = np.zeros(len(rows), dtype=bool)
+        for old, new in zip(old_values, values):
+            modified |= old != new
+
+        stale = was_indexed & (~indexed | modified)
+        if np.any(stale):
+            self._remove(rows[stale], tuple(old[stale] for old in old_values))
+
+        fresh = indexed & (~was_indexed | modified)
+        if np.any(fresh):
+            self._add(rows[fresh], tuple(new[fresh] for new in values))
+
+        self.Indexed[rows] = indexed
+        for old, new in zip(self.RowValues, values):
+            old[rows] = new
+
+    def _add(self, rows, values):
+        raise NotImplementedError()
+
+    def _remove(self, rows, values):
+        raise NotImplementedError()
 
     def serialize(self):
-        serialized_bitmap = {}
-        for key in self.BitMap:
-            serialized_bitmap[key] = list(self.BitMap[key])
+        serialized = super().serialize()
+        serialized.update(
+            {
+                "indexed": _dump_array(self.Indexed),
+                "row_values": [_dump_array(values) for values in self.RowValues],
+            }
+        )
+        return serialized
+
+    def deserialize(self, data):
+        self.Indexed = _load_array(data["indexed"])
+        self.RowValues = tuple(_load_array(values) for values in data["row_values"])
+
+
+class BitMapIndex(IncrementalIndex):
+    """
+    Index of a column with discrete values.
+
+    Distinct values are kept in a sorted array `Keys`, every key has a `BitSet` of matrix indexes
+    of rows with that value in `BitMaps`.
+    """
+
+    def __init__(self, column, matrix, id=None):
+        super().__init__((column,), matrix, id=id)
+        self.Column = column
+        self.Keys = np.zeros(0, dtype=matrix.Array.dtype[column])
+        self.BitMaps = []
+        self.update(matrix)
 
+    def search(self, value):
+        """
+        Returns set of matrix indexes.
+        """
+        return set(self.search_bitset(value).indexes().tolist())
+
+    def search_bitset(self, value):
+        position = np.searchsorted(self.Keys, value)
+        if position < len(self.Keys) and self.Keys[position] == value:
+            return self.BitMaps[position]
+        return BitSet()
+
+    def _add(self, rows, values):
+        keys, groups = _group(values[0], rows)
+        positions = np.searchsorted(self.Keys, keys)
+        new = np.ones(len(keys), dtype=bool)
+        for i, (position, group) in enumerate(zip(positions, groups)):
+            if position < len(self.Keys) and self.Keys[position] == keys[i]:
+                self.BitMaps[position].add(group)
+                new[i] = False
+
+        if not np.any(new):
+            return
+
+        # Insert from the end, so that positions of preceding keys are not shifted
+        for i in reversed(np.flatnonzero(new)):
+            self.BitMaps.insert(int(positions[i]), BitSet(groups[i]))
+        self.Keys = np.insert(self.Keys, positions[new], keys[new])
+
+    def _remove(self, rows, values):
+        keys, groups = _group(values[0], rows)
+        positions = np.searchsorted(self.Keys, keys)
+        empty = []
+        for position, group in zip(positions, groups):
+            bitmap = self.BitMaps[position]
+            bitmap.discard(group)
+            if not bitmap:
+                empty.append(position)
+
+        for position in reversed(empty):
+            del self.BitMaps[position]
+        self.Keys = np.delete(self.Keys, empty)
+
+    def serialize(self):
         serialized = super().serialize()
         serialized.update(
             {
-                "bitmap": serialized_bitmap,
                 "column": self.Column,
+                "keys": _dump_array(self.Keys),
+                "bitmaps": _dump_bitsets(self.BitMaps),
             }
         )
-
         return serialized
 
     def deserialize(self, data):
-        self.BitMap = {}
+        super().deserialize(data)
         self.Column = data["column"]
+        self.Columns = (self.Column,)
+        self.Keys = _load_array(data["keys"])
+        self.BitMaps = _load_bitsets(data["bitmaps"])
 
-        for key in data["bitmap"]:
-            self.BitMap[key] = set(data["bitmap"][key])
 
-        self.UniqueValues = list(self.BitMap.keys())
+class TreeRangeIndex(IncrementalIndex):
+    """
+    Index of ranges from `column_start` (inclusive) to `column_end` (exclusive), ranges can overlap.
 
+    All starts and ends of ranges form sorted `Boundaries`, neighbouring boundaries delimit segments.
+    Every segment has a `BitSet` of matrix indexes of rows whose ranges cover it in `Segments`,
+    so a search is a binary search of the segment.
+    A boundary that is no longer used by any row (see `Counts`) is removed and its segment is merged.
+    """
 
-class TreeRangeIndex(Index):
     def __init__(self, column_start, column_end, matrix, id=None):
-        super().__init__(id=id)
+        super().__init__((column_start, column_end), matrix, id=id)
         self.ColumnStart = column_start
         self.ColumnEnd = column_end
-        ranges = set()
-
-        open_rows = list(matrix.I2NMap.keys())
-        unique_start = np.unique(matrix.Array[column_start][open_rows])
-        ranges |= set(unique_start)
-        unique_end = np.unique(matrix.Array[column_end][open_rows])
-        ranges |= set(unique_end)
 
-        assert len(unique_start) == len(unique_end)  # ranges overlapping
-
-        self.Ranges = sorted(list(ranges))
+        self.Boundaries = np.zeros(
+            0,
+            dtype=np.result_type(
+                matrix.Array.dtype[column_start], matrix.Array.dtype[column_end]
+            ),
+        )
+        # Number of starts and ends of ranges at every boundary
+        self.Counts = np.zeros(0, dtype=np.int64)
+        # Segment i spans from Boundaries[i] to Boundaries[i + 1]
+        self.Segments = []
 
         self.MinValue = None
         self.MaxValue = None
-        self.Tree = None
+        self.update(matrix)
+
+    def search(self, value):
+        return set(self.search_bitset(value).indexes().tolist())
 
-        if len(self.Ranges) != 0:
-            self.MinValue = int(self.Ranges[0])
-            self.MaxValue = int(self.Ranges[-1])
+    def search_bitset(self, value):
+        position = np.searchsorted(self.Boundaries, value, side="right") - 1
+        if 0 <= position < len(self.Segments):
+            return self.Segments[position]
+        return BitSet()
 
-            self.Tree = self.sorted_array_to_bst(matrix, self.Ranges, [], [])
+    def _add(self, rows, values):
+        starts, ends = values
+        boundaries = np.union1d(self.Boundaries, np.concatenate([starts, ends]))
+        if len(boundaries) > len(self.Boundaries):
+            self._split(boundaries)
 
-    def search(self, value):
-        if self.Tree is None:
-            return set()
+        np.add.at(self.Counts, np.searchsorted(self.Boundaries, starts), 1)
+        np.add.at(self.Counts, np.searchsorted(self.Boundaries, ends), 1)
 
-        if (value < self.MinValue) or (value >= self.MaxValue):
-            return set()
+        segments, groups = _group(*self._covered(rows, starts, ends))
+        for segment, group in zip(segments, groups):
+            self.Segments[segment].add(group)
 
-        subtree = self.Tree
-        while True:
-            node = subtree["node"]
-            if node is None:
-                return set(subtree["indexes"])
+        self._update_limits()
 
-            if value < node:
-                subtree = subtree["left"]
-            else:
-                subtree = subtree["right"]
-
-        return set()
-
-    def sorted_array_to_bst(self, matrix, arr, path, mask):
-        if not arr:
-            mask_ = mask + [False]
-            if np.any(mask):
-                path_ = path + [float("inf")]
-                true_values = np.array(path_)[np.array(mask_)]
-                lower = max(true_values)
-                false_values = np.array(path_)[~np.array(mask_)]
-                upper = min(false_values)
-                r = tuple([lower, upper])
+    def _split(self, boundaries):
+        """
+        Inserts new boundaries, a segment that is split keeps its rows in both parts.
+        """
+        parents = np.searchsorted(self.Boundaries, boundaries[:-1], side="right") - 1
+        segments = []
+        previous = None
+        for parent in parents.tolist():
+            if parent < 0 or parent >= len(self.Segments):
+                segments.append(BitSet())
+            elif parent == previous:
+                segments.append(self.Segments[parent].copy())
             else:
-                path_ = path + [-float("inf")]
-                r = tuple([path_[-1], path_[-2]])
+                segments.append(self.Segments[parent])
+            previous = parent
 
-            condition = (matrix.Array[self.ColumnEnd] <= r[1]) & (
-                matrix.Array[self.ColumnStart] >= r[0]
-            )
-            indexes = np.where(condition)
-            result = {
-                "node": None,
-                "indexes": indexes[0].tolist(),
-                "left": None,
-                "right": None,
-            }
+        counts = np.zeros(len(boundaries), dtype=np.int64)
+        counts[np.searchsorted(boundaries, self.Boundaries)] = self.Counts
 
-            return result
+        self.Boundaries = boundaries
+        self.Counts = counts
+        self.Segments = segments
 
-        mid = int(len(arr) / 2)
-        root = dict(node=int(arr[mid]), indexes=[])
-        root["left"] = self.sorted_array_to_bst(
-            matrix, arr[:mid], path + [arr[mid]], mask + [False]
-        )
-        root["right"] = self.sorted_array_to_bst(
-            matrix, arr[mid + 1 :], path + [arr[mid]], mask + [True]
-        )
-        return root
+    def _remove(self, rows, values):
+        starts, ends = values
+        segments, groups = _group(*self._covered(rows, starts, ends))
+        for segment, group in zip(segments, groups):
+            self.Segments[segment].discard(group)
 
-    def update(self, matrix):
-        ranges = set()
-        open_rows = list(matrix.I2NMap.keys())
-        unique_start = np.unique(matrix.Array[self.ColumnStart][open_rows])
-        ranges |= set(unique_start)
-        unique_end = np.unique(matrix.Array[self.ColumnEnd][open_rows])
-        ranges |= set(unique_end)
-
-        # TODO: optimize this monster
-        # if open_rows == self.OpenRows:
-        # 	# partial update
-        # 	# a) deleted values
-        # 	# b) added values
-        # 	# c) updated values, bug
-        # else:
-        # 	# full update
-
-        assert len(unique_start) == len(unique_end)  # ranges overlapping
-        self.Ranges = sorted(list(ranges))
+        np.subtract.at(self.Counts, np.searchsorted(self.Boundaries, starts), 1)
+        np.subtract.at(self.Counts, np.searchsorted(self.Boundaries, ends), 1)
 
-        self.MinValue = None
-        self.MaxValue = None
-        self.Tree = None
+        unused = np.flatnonzero(self.Counts == 0)
+        if len(unused) == 0:
+            return
+
+        # No range starts or ends at an unused boundary, so segments on both sides of it are equal
+        # (or the segment is empty at the edges) and one of them can be dropped
+        for position in reversed(unused.tolist()):
+            if len(self.Segments) > 0:
+                del self.Segments[min(position, len(self.Segments) - 1)]
+        self.Boundaries = np.delete(self.Boundaries, unused)
+        self.Counts = np.delete(self.Counts, unused)
+        self._update_limits()
 
-        if len(self.Ranges) != 0:
-            self.MinValue = self.Ranges[0]
-            self.MaxValue = self.Ranges[-1]
-            self.Tree = self.sorted_array_to_bst(matrix, self.Ranges, [], [])
+    def _covered(self, rows, starts, ends):
+        """
+        Returns pairs of segments and rows whose ranges cover them.
+        """
+        first = np.searchsorted(self.Boundaries, starts)
+        lengths = np.maximum(np.searchsorted(self.Boundaries, ends) - first, 0)
+        total = int(lengths.sum())
+        offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return np.repeat(first, lengths) + offsets, np.repeat(rows, lengths)
+
+    def _update_limits(self):
+        if len(self.Boundaries) == 0:
+            self.MinValue = None
+            self.MaxValue = None
+        else:
+            self.MinValue = self.Boundaries[0].item()
+            self.MaxValue = self.Boundaries[-1].item()
 
     def serialize(self):
         serialized = super().serialize()
-        ranges = []
-        for r in self.Ranges:
-            ranges.append(int(r))
-
         serialized.update(
             {
-                "tree": self.Tree,
-                "ranges": ranges,
+                "boundaries": _dump_array(self.Boundaries),
+                "counts": _dump_array(self.Counts),
+                "segments": _dump_bitsets(self.Segments),
                 "column_start": self.ColumnStart,
                 "column_end": self.ColumnEnd,
             }
@@ -227,13 +373,14 @@ class TreeRangeIndex(Index):
         return serialized
 
     def deserialize(self, data):
-        self.Ranges = data["ranges"]
-        if len(self.Ranges) != 0:
-            self.MinValue = self.Ranges[0]
-            self.MaxValue = self.Ranges[-1]
-        self.Tree = data["tree"]
+        super().deserialize(data)
         self.ColumnStart = data["column_start"]
         self.ColumnEnd = data["column_end"]
+        self.Columns = (self.ColumnStart, self.ColumnEnd)
+        self.Boundaries = _load_array(data["boundaries"])
+        self.Counts = _load_array(data["counts"])
+        self.Segments = _load_bitsets(data["segments"])
+        self._update_limits()
 
 
 class SliceIndex(Index):
@@ -262,7 +409,7 @@ class SliceIndex(Index):
             return
 
         self.SliceMap = {}
-        open_rows = list(matrix.I2NMap.keys())
+        open_rows = _open_rows(matrix)
         self.MinValue = float(np.min(matrix.Array[self.ColumnStart][open_rows]))
         self.MaxValue = float(np.max(matrix.Array[self.ColumnEnd][open_rows]))
 
@@ -310,3 +457,61 @@ class SliceIndex(Index):
         self.Tree = data["tree"]
         self.ColumnStart = data["column_start"]
         self.ColumnEnd = data["column_end"]
+
+
+def _open_rows(matrix):
+    return np.fromiter(matrix.Index.I2NMap.keys(), dtype=np.int64)
+
+
+def _fit(array, size):
+    fitted = np.zeros(size, dtype=array.dtype)
+    fitted[: len(array)] = array
+    return fitted
+
+
+def _group(keys, rows):
+    """
+    Groups `rows` by `keys`, returns sorted distinct keys and a list of arrays of rows.
+    """
+    keys, inverse = np.unique(keys, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    groups = np.split(rows[order], np.cumsum(np.bincount(inverse))[:-1])
+    return keys, groups
+
+
+def _dump_array(array):
+    """
+    Serializes a NumPy array in the binary `.npy` format, encoded by base64 to fit into JSON.
+    """
+    f = io.BytesIO()
+    np.save(f, array, allow_pickle=False)
+    return base64.b64encode(f.getvalue()).decode("ascii")
+
+
+def _load_array(data):
+    return np.load(io.BytesIO(base64.b64decode(data)), allow_pickle=False)
+
+
+def _dump_bitsets(bitsets):
+    """
+    Serializes a list of bitsets as three arrays: offsets, word counts and all words concatenated.
+    """
+    words = [bitset.Words for bitset in bitsets]
+    return {
+        "offsets": _dump_array(
+            np.array([bitset.Offset for bitset in bitsets], dtype=np.int64)
+        ),
+        "lengths": _dump_array(np.array([len(w) for w in words], dtype=np.int64)),
+        "words": _dump_array(
+            np.concatenate(words) if len(words) > 0 else np.zeros(0, dtype=np.uint64)
+        ),
+    }
+
+
+def _load_bitsets(data):
+    offsets = _load_array(data["offsets"])
+    lengths = _load_array(data["lengths"])
+    words = np.split(_load_array(data["words"]), np.cumsum(lengths)[:-1])
+    if len(offsets) == 0:
+        return []
+    return [BitSet.from_words(offset, w) for offset, w in zip(offsets, words)]
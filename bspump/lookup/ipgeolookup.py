@@ -1,7 +1,11 @@
-import logging
+import os
 import csv
+import json
+import logging
 import ipaddress
 
+import numpy as np
+
 from bspump.abc.lookup import DictionaryLookup
 
 ###
@@ -10,6 +14,13 @@ L = logging.getLogger(__name__)
 
 ###
 
+IPV4_MAPPED_OFFSET = 281470681743360  # ::ffff:0.0.0.0
+
+# IPv6 addresses are stored as pairs of 64-bit integers, structured arrays are compared field by field
+IPV6_DTYPE = np.dtype([("hi", "<u8"), ("lo", "<u8")])
+
+LOCATION_COLUMNS = ("country", "region", "city")
+
 
 class IPGeoLookup(DictionaryLookup):
     """
@@ -21,101 +32,249 @@ class IPGeoLookup(DictionaryLookup):
     Free versions: IP2LOCATION-LITE-DB5.IPV6.CSV and IP2LOCATION-LITE-DB5.IPV4.CSV
     For better precision visit https://lite.ip2location.com to buy a commercial version of database.
 
-    Usage: specify in configuration the path to the database in csv format."""
+    Usage: specify in configuration the path to the database in csv format.
+
+    Ranges of the database are held in sorted NumPy arrays (`uint32` for IPv4 databases,
+    pairs of `uint64` for IPv6 ones) and searched by `np.searchsorted`.
+    Location attributes are stored column-wise, strings are dictionary-encoded.
+    `lookup_locations()` looks up many addresses at once.
+
+    When `index` is set to a directory, the parsed database is stored there as `.npy` files
+    and next time it is memory-mapped instead of parsing the CSV again.
+    The index is rebuilt when the size or the modification time of the CSV file changes.
+    """
 
     ConfigDefaults = {
         "path": "",
         "ipv4mapped": "no",  # IPv4-mapped IPv6 address (enables to use IPv6 lookups for IPv4 addresses)
+        "index": "",  # Directory of the prebuilt index, empty means no index
     }
 
     def __init__(self, app, id=None, config=None):
         super().__init__(app, id=id, config=config)
-        self.TreeRoot = None
-        self.Locations = {}
         if self.Config["ipv4mapped"].lower() == "yes":
             self.IP4Mapped = True
         else:
             self.IP4Mapped = False
 
+        # Range boundaries, sorted by the start
+        self.Starts = None
+        self.Ends = None
+
+        # Location attributes, one item per range
+        self.Latitudes = None
+        self.Longitudes = None
+        # Column name -> (codes, values), code -1 means no value
+        self.Columns = {}
+
     async def load(self):
         fname = self.Config["path"]
         if fname == "":
             return
 
-        with open(fname, "r") as f:
-            array = []
+        index = self.Config["index"]
+        if index != "" and self._load_index(index, fname):
+            L.debug("IPGeoLookup {} was loaded from '{}'".format(self.Id, index))
+            return True
 
+        self._parse(fname)
+        if index != "":
+            self._save_index(index, fname)
+
+        L.debug("IPGeoLookup {} was successfully created".format(self.Id))
+        return True
+
+    def _parse(self, fname):
+        starts = []
+        ends = []
+        latitudes = []
+        longitudes = []
+        encoders = {column: {} for column in LOCATION_COLUMNS}
+        codes = {column: [] for column in LOCATION_COLUMNS}
+
+        with open(fname, "r") as f:
             for line in csv.reader(f, delimiter=","):
-                ip_int_address_start = int(line[0])
-                ip_int_address_end = int(line[1])
-                array.append(ip_int_address_start)
-                array.append(ip_int_address_end)
+                starts.append(int(line[0]))
+                ends.append(int(line[1]))
+
                 lat = float(line[6])
                 lon = float(line[7])
-
                 if (lat == 0.0) or (lon == 0.0):
-                    d = {"lat": None, "lon": None}
-                else:
-                    d = {"lat": lat, "lon": lon}
-
-                if line[2] != "-":
-                    d["country"] = line[2]
-                if line[4] != "-":
-                    d["region"] = line[4]
-                if line[5] != "-":
-                    d["city"] = line[5]
-
-                self.Locations[ip_int_address_start] = d
-                self.Locations[ip_int_address_end] = d
-
-        self.TreeRoot = self.sorted_array_to_bst(array)
-        del array
-        L.debug("IPGeoLookup {} was successfully created".format(self.Id))
+                    lat = lon = np.nan
+                latitudes.append(lat)
+                longitudes.append(lon)
+
+                for column, value in zip(LOCATION_COLUMNS, (line[2], line[4], line[5])):
+                    if value == "-":
+                        codes[column].append(-1)
+                    else:
+                        encoder = encoders[column]
+                        code = encoder.get(value)
+                        if code is None:
+                            code = encoder[value] = len(encoder)
+                        codes[column].append(code)
+
+        wide = len(ends) > 0 and max(ends) >= 2**32
+        starts = self._to_array(starts, wide)
+        ends = self._to_array(ends, wide)
+        order = np.argsort(starts, kind="stable")
+
+        self.Starts = starts[order]
+        self.Ends = ends[order]
+        self.Latitudes = np.array(latitudes, dtype=np.float64)[order]
+        self.Longitudes = np.array(longitudes, dtype=np.float64)[order]
+        self.Columns = {
+            column: (
+                np.array(codes[column], dtype=np.int32)[order],
+                np.array(list(encoders[column]), dtype=str),
+            )
+            for column in LOCATION_COLUMNS
+        }
+
+    def _to_array(self, values, wide):
+        if not wide:
+            return np.array(values, dtype=np.uint32)
+
+        array = np.empty(len(values), dtype=IPV6_DTYPE)
+        array["hi"] = [value >> 64 for value in values]
+        array["lo"] = [value & 0xFFFFFFFFFFFFFFFF for value in values]
+        return array
+
+    def _index_arrays(self):
+        arrays = {
+            "starts": self.Starts,
+            "ends": self.Ends,
+            "lat": self.Latitudes,
+            "lon": self.Longitudes,
+        }
+        for column, (codes, values) in self.Columns.items():
+            arrays["{}_codes".format(column)] = codes
+            arrays["{}_values".format(column)] = values
+        return arrays
+
+    def _source_stamp(self, fname):
+        stat = os.stat(fname)
+        return {
+            "path": os.path.abspath(fname),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+
+    def _save_index(self, index, fname):
+        os.makedirs(index, exist_ok=True)
+        for name, array in self._index_arrays().items():
+            np.save(os.path.join(index, "{}.npy".format(name)), array)
+
+        # The stamp is written last, an interrupted build is not used
+        with open(os.path.join(index, "source.json"), "w") as f:
+            json.dump(self._source_stamp(fname), f)
+
+    def _load_index(self, index, fname):
+        try:
+            with open(os.path.join(index, "source.json")) as f:
+                stamp = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+
+        if stamp != self._source_stamp(fname):
+            L.info("Index '{}' of IPGeoLookup {} is outdated".format(index, self.Id))
+            return False
+
+        def load(name):
+            return np.load(os.path.join(index, "{}.npy".format(name)), mmap_mode="r")
+
+        self.Starts = load("starts")
+        self.Ends = load("ends")
+        self.Latitudes = load("lat")
+        self.Longitudes = load("lon")
+        self.Columns = {
+            column: (
+                load("{}_codes".format(column)),
+                load("{}_values".format(column)),
+            )
+            for column in LOCATION_COLUMNS
+        }
         return True
 
-    def set(self, tree):
-        self.TreeRoot = tree
-
     # REST
 
     def rest_get(self):
         rest = super().rest_get()
-        rest["TreeRoot"] = self.TreeRoot
-        rest["Locations"] = self.Locations
+        rest["Ranges"] = 0 if self.Starts is None else len(self.Starts)
         rest["IP4Mapped"] = self.IP4Mapped
         return rest
 
-    def sorted_array_to_bst(self, arr):
-        if not arr:
+    def _keys(self, values):
+        """
+        Converts integer addresses into an array comparable with `self.Starts`.
+        """
+        if self.Starts.dtype == IPV6_DTYPE:
+            keys = np.empty(len(values), dtype=IPV6_DTYPE)
+            keys["hi"] = [value >> 64 for value in values]
+            keys["lo"] = [value & 0xFFFFFFFFFFFFFFFF for value in values]
+            return keys
+
+        keys = np.array(
+            [value if value < 2**32 else 2**32 - 1 for value in values],
+            dtype=np.uint32,
+        )
+        return keys
+
+    def search_batch(self, values):
+        """
+        Returns an array of indexes of ranges that contain the integer addresses in `values`, -1 if not found.
+        """
+        if self.Starts is None or len(self.Starts) == 0:
+            return np.full(len(values), -1, dtype=np.int64)
+
+        keys = self._keys(values)
+        indexes = np.searchsorted(self.Starts, keys, side="right") - 1
+        found = indexes >= 0
+        found[found] = _less_equal(keys[found], self.Ends[indexes[found]])
+        if self.Starts.dtype != IPV6_DTYPE:
+            # Addresses outside of the 32-bit space were clamped
+            found &= np.array([value < 2**32 for value in values], dtype=bool)
+        return np.where(found, indexes, -1)
+
+    def search(self, value):
+        """
+        Returns the index of the range that contains the integer address `value`, -1 if not found.
+        """
+        return int(self.search_batch([value])[0])
+
+    def location(self, index):
+        """
+        Returns the location of the range `index` as a dictionary.
+        """
+        if index < 0:
             return None
 
-        mid = int(len(arr) / 2)
-        root = Node(arr[mid])
-        root.left = self.sorted_array_to_bst(arr[:mid])
-        root.right = self.sorted_array_to_bst(arr[mid + 1 :])
-        return root
+        lat = float(self.Latitudes[index])
+        if np.isnan(lat):
+            d = {"lat": None, "lon": None}
+        else:
+            d = {"lat": lat, "lon": float(self.Longitudes[index])}
+
+        for column, (codes, values) in self.Columns.items():
+            code = codes[index]
+            if code >= 0:
+                d[column] = str(values[code])
 
-    def search(self, value):
-        root = self.TreeRoot
-        while True:
-            if root.data == value:
-                return root.data
-
-            if root.data > value:
-                left = root.left
-                if left is None:
-                    return root.data
-                else:
-                    root = left
-            if root.data < value:
-                right = root.right
-                if right is None:
-                    return root.data
-                else:
-                    root = right
+        return d
+
+    def _address_to_int(self, address):
+        if "." in address:
+            address_int = int(ipaddress.IPv4Address(address))
+            if self.IP4Mapped:
+                address_int += IPV4_MAPPED_OFFSET
+            return address_int
+        elif ":" in address:
+            return int(ipaddress.IPv6Address(address))
+        else:
+            raise ValueError("Invalid IPv4/IPv6 format")
 
     def lookup_location_ipv4(self, address):
-        if self.TreeRoot is None:
+        if self.Starts is None:
             # L.warning("Cannot enrich the location")
             return None
 
@@ -124,20 +283,17 @@ class IPGeoLookup(DictionaryLookup):
         if self.IP4Mapped:
             # https://blog.ip2location.com/knowledge-base/ipv4-mapped-ipv6-address/
             # 191.239.213.197 -> ::ffff:191.239.213.197
-            address_int += 281470681743360
+            address_int += IPV4_MAPPED_OFFSET
 
-        value = self.search(address_int)
-        return self.Locations.get(value)
+        return self.location(self.search(address_int))
 
     def lookup_location_ipv6(self, address):
-        if self.TreeRoot is None:
+        if self.Starts is None:
             # L.warning("Cannot enrich the location")
             return None
 
         address_int = int(ipaddress.IPv6Address(address))
-
-        value = self.search(address_int)
-        return self.Locations.get(value)
+        return self.location(self.search(address_int))
 
     def lookup_location(self, address):
         if "." in address:
@@ -147,9 +303,21 @@ class IPGeoLookup(DictionaryLookup):
         else:
             raise ValueError("Invalid IPv4/IPv6 format")
 
+    def lookup_locations(self, addresses):
+        """
+        Looks up a list of IPv4/IPv6 addresses at once, returns a list of locations (None if not found).
+        """
+        if self.Starts is None:
+            return [None] * len(addresses)
+
+        indexes = self.search_batch(
+            [self._address_to_int(address) for address in addresses]
+        )
+        return [self.location(index) for index in indexes]
+
 
-class Node:
-    def __init__(self, d):
-        self.data = d
-        self.left = None
-        self.right = None
+def _less_equal(a, b):
+    if a.dtype != IPV6_DTYPE:
+        return a <= b
+    # Ordering comparisons are not available for structured arrays
+    return (a["hi"] < b["hi"]) | ((a["hi"] == b["hi"]) & (a["lo"] <= b["lo"]))
@@ -5,7 +5,9 @@ import numpy as np
 
 import bspump.asab as asab
 from ..abc.lookup import Lookup
+from ..matrix.namedmatrix import NamedMatrix, PersistentNamedMatrix
 from ..matrix.sessionmatrix import SessionMatrix
+from .index import IncrementalIndex
 
 ###
 
@@ -47,6 +49,12 @@ class MatrixLookup(Lookup):
         self.MatrixPubSub = None
         self.Timer = None
 
+        # Row changes published by the matrix, they are applied to indexes once per loop iteration
+        self.ChangedRows = set()
+        self.ClosedRows = set()
+        self.Reindexed = False
+        self.ApplyScheduled = False
+
         self.Target = None
 
         if self.is_master():
@@ -55,6 +63,15 @@ class MatrixLookup(Lookup):
                 self.Timer = asab.Timer(app, self._on_clock_tick, autorestart=True)
                 self.Timer.start(self.UpdatePeriod)
 
+            elif isinstance(self.Matrix, (NamedMatrix, PersistentNamedMatrix)):
+                # Indexes are updated incrementally, only by changed rows
+                self.MatrixPubSub = self.Matrix.PubSub
+                self.MatrixPubSub.subscribe(
+                    "Matrix rows changed!", self._on_rows_changed
+                )
+                self.MatrixPubSub.subscribe("Matrix rows closed!", self._on_rows_closed)
+                self.MatrixPubSub.subscribe("Matrix reindexed!", self._on_reindexed)
+
             else:
                 self.MatrixPubSub = self.Matrix.PubSub
                 self.MatrixPubSub.subscribe("Matrix changed!", self._on_matrix_changed)
@@ -62,6 +79,61 @@ class MatrixLookup(Lookup):
     async def _on_matrix_changed(self, message):
         self.update_indexes()
 
+    def _on_rows_changed(self, message_type, row_indexes):
+        self.ChangedRows.update(int(row_index) for row_index in row_indexes)
+        self._schedule_apply()
+
+    def _on_rows_closed(self, message_type, row_indexes):
+        self.ClosedRows.update(int(row_index) for row_index in row_indexes)
+        self._schedule_apply()
+
+    def _on_reindexed(self, message_type):
+        # Pending row indexes are no longer valid, all rows are resynced
+        self.ChangedRows.clear()
+        self.ClosedRows.clear()
+        self.Reindexed = True
+        self._schedule_apply()
+
+    def _schedule_apply(self):
+        if self.ApplyScheduled:
+            return
+        self.ApplyScheduled = True
+        self.App.Loop.call_soon(self.apply_changes)
+
+    def apply_changes(self):
+        """
+        Applies row changes published by the matrix since the last call to indexes,
+        incremental indexes are updated only by the changed rows.
+        """
+        self.ApplyScheduled = False
+
+        if self.Reindexed:
+            self.Reindexed = False
+            self.ChangedRows.clear()
+            self.ClosedRows.clear()
+            self.update_indexes()
+            return
+
+        if len(self.ChangedRows) == 0 and len(self.ClosedRows) == 0:
+            return
+
+        closed_rows = np.fromiter(self.ClosedRows, dtype=np.int64)
+        open_rows = self.Matrix.Index.I2NMap
+        changed_rows = np.fromiter(
+            (row_index for row_index in self.ChangedRows if row_index in open_rows),
+            dtype=np.int64,
+        )
+        self.ChangedRows.clear()
+        self.ClosedRows.clear()
+
+        for index in self.Indexes.values():
+            if isinstance(index, IncrementalIndex):
+                # A reused row is closed first and indexed again with its new values
+                index.close_rows(closed_rows)
+                index.add_rows(changed_rows, self.Matrix)
+            else:
+                index.update(self.Matrix)
+
     async def _on_clock_tick(self):
         self.update_indexes()
 
@@ -79,6 +151,29 @@ class MatrixLookup(Lookup):
 
         return np.asscalar(self.Matrix.Array[x[0][0]][target_column])
 
+    def search_indexes(self, conditions):
+        """
+        Returns a sorted array of matrix indexes of rows that match all `conditions`,
+        a dictionary of index ids and searched values, e.g. `{"country": "CZ", "ip_range": 3232235777}`.
+
+        Results of indexes are intersected as bitsets, starting with the smallest one.
+        """
+        bitsets = [
+            self.Indexes[index_id].search_bitset(value)
+            for index_id, value in conditions.items()
+        ]
+        if len(bitsets) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        bitsets.sort(key=lambda bitset: len(bitset.Words))
+        result = bitsets[0]
+        for bitset in bitsets[1:]:
+            if not result:
+                break
+            result = result & bitset
+
+        return result.indexes()
+
     def serialize(self):
         serialized = {}
         serialized["Matrix"] = self.Matrix.serialize()
@@ -6,8 +6,10 @@ from .source import MatrixSource
 from .matrix import Matrix, PersistentMatrix
 from .namedmatrix import NamedMatrix, PersistentNamedMatrix  # noqa: F401
 from .timewindowmatrix import TimeWindowMatrix, PersistentTimeWindowMatrix  # noqa: F401
+from .sparsetimewindowmatrix import SparseTimeWindowMatrix
 from .sessionmatrix import SessionMatrix, PersistentSessionMatrix
 from .geomatrix import GeoMatrix, PersistentGeoMatrix
+from .snapshot import MatrixSnapshot
 
 
 __all__ = [
@@ -17,10 +19,13 @@ __all__ = [
     "Matrix",
     "PersistentMatrix",
     "NamedMatrix",
-    "PersistentNamedMatrix" "TimeWindowMatrix",
+    "PersistentNamedMatrix",
+    "TimeWindowMatrix",
     "PersistentTimeWindowMatrix",
+    "SparseTimeWindowMatrix",
     "SessionMatrix",
     "PersistentSessionMatrix",
     "GeoMatrix",
     "PersistentGeoMatrix",
+    "MatrixSnapshot",
 ]
@@ -44,6 +44,19 @@ class GeoMatrix(Matrix):
     def zeros(self):
         self.Array = np.zeros([self.MapHeight, self.MapWidth], dtype=self.DType)
 
+    def snapshot(self):
+        return {"array": self.Array.copy()}
+
+    def restore(self, arrays):
+        array = arrays["array"]
+        if array.dtype != self.Array.dtype or array.shape != self.Array.shape:
+            raise ValueError(
+                "Snapshot of {} {} doesn't match the matrix {}".format(
+                    array.dtype, array.shape, self.Array.shape
+                )
+            )
+        self.Array = array
+
     def is_in_boundaries(self, lat, lon):
         """
         Check, if coordinates are within the bbox coordinates.
@@ -109,6 +122,56 @@ class GeoMatrix(Matrix):
         )
         return int(row), int(column)
 
+    def is_in_boundaries_array(self, lats, lons):
+        """
+        Vectorized `is_in_boundaries()`, returns a boolean mask for arrays of latitudes and longitudes.
+        """
+        return _in_boundaries(self.Bbox, np.asarray(lats), np.asarray(lons))
+
+    def project_equirectangular_array(self, lats, lons):
+        """
+        Vectorized `project_equirectangular()`, returns arrays of row and column indexes.
+        Coordinates must be within the bbox, see `is_in_boundaries_array()`.
+        """
+        return _project(
+            self.Bbox,
+            self.MapHeight,
+            self.MapWidth,
+            np.asarray(lats, dtype=np.float64),
+            np.asarray(lons, dtype=np.float64),
+        )
+
+    def add_points(self, lats, lons, values=1, field=None):
+        """
+        Adds `values` (a number or an array) into cells of the positions given by arrays of latitudes and longitudes.
+        Points falling into the same cell are all counted, positions outside of the bbox are skipped.
+        `field` selects the field of a structured dtype.
+        Returns the mask of positions which were added.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        mask = _in_boundaries(self.Bbox, lats, lons)
+        rows, columns = _project(
+            self.Bbox, self.MapHeight, self.MapWidth, lats[mask], lons[mask]
+        )
+        if np.ndim(values) > 0:
+            values = np.asarray(values)[mask]
+
+        array = self.Array if field is None else self.Array[field]
+        np.add.at(array, (rows, columns), values)
+        return mask
+
+    def get_gps_distance_matrix(self, lats1, lons1, lats2, lons2):
+        """
+        Distances in km between every point of the first and every point of the second set of gps-coordinates.
+        Returns an array of the shape (number of the first points, number of the second points).
+        """
+        lats1 = np.asarray(lats1, dtype=np.float64)[:, np.newaxis]
+        lons1 = np.asarray(lons1, dtype=np.float64)[:, np.newaxis]
+        lats2 = np.asarray(lats2, dtype=np.float64)[np.newaxis, :]
+        lons2 = np.asarray(lons2, dtype=np.float64)[np.newaxis, :]
+        return self.get_gps_distance(lats1, lons1, lats2, lons2)
+
     def inverse_equirectangular(self, row, column):
         """
         Converts row and column into latitude and longitude.
@@ -241,6 +304,56 @@ class PersistentGeoMatrix(PersistentMatrix):
         )
         return int(row), int(column)
 
+    def is_in_boundaries_array(self, lats, lons):
+        """
+        Vectorized `is_in_boundaries()`, returns a boolean mask for arrays of latitudes and longitudes.
+        """
+        return _in_boundaries(self.Bbox, np.asarray(lats), np.asarray(lons))
+
+    def project_equirectangular_array(self, lats, lons):
+        """
+        Vectorized `project_equirectangular()`, returns arrays of row and column indexes.
+        Coordinates must be within the bbox, see `is_in_boundaries_array()`.
+        """
+        return _project(
+            self.Bbox,
+            self.MapHeight,
+            self.MapWidth,
+            np.asarray(lats, dtype=np.float64),
+            np.asarray(lons, dtype=np.float64),
+        )
+
+    def add_points(self, lats, lons, values=1, field=None):
+        """
+        Adds `values` (a number or an array) into cells of the positions given by arrays of latitudes and longitudes.
+        Points falling into the same cell are all counted, positions outside of the bbox are skipped.
+        `field` selects the field of a structured dtype.
+        Returns the mask of positions which were added.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        mask = _in_boundaries(self.Bbox, lats, lons)
+        rows, columns = _project(
+            self.Bbox, self.MapHeight, self.MapWidth, lats[mask], lons[mask]
+        )
+        if np.ndim(values) > 0:
+            values = np.asarray(values)[mask]
+
+        array = self.Array if field is None else self.Array[field]
+        np.add.at(array, (rows, columns), values)
+        return mask
+
+    def get_gps_distance_matrix(self, lats1, lons1, lats2, lons2):
+        """
+        Distances in km between every point of the first and every point of the second set of gps-coordinates.
+        Returns an array of the shape (number of the first points, number of the second points).
+        """
+        lats1 = np.asarray(lats1, dtype=np.float64)[:, np.newaxis]
+        lons1 = np.asarray(lons1, dtype=np.float64)[:, np.newaxis]
+        lats2 = np.asarray(lats2, dtype=np.float64)[np.newaxis, :]
+        lons2 = np.asarray(lons2, dtype=np.float64)[np.newaxis, :]
+        return self.get_gps_distance(lats1, lons1, lats2, lons2)
+
     def inverse_equirectangular(self, row, column):
         """
         Converts row and column into latitude and longitude.
@@ -258,3 +371,23 @@ class PersistentGeoMatrix(PersistentMatrix):
         )
 
         return lat, lon
+
+
+def _in_boundaries(bbox, lats, lons):
+    return (
+        (lats < bbox["max_lat"])
+        & (lats > bbox["min_lat"])
+        & (lons < bbox["max_lon"])
+        & (lons > bbox["min_lon"])
+    )
+
+
+def _project(bbox, map_height, map_width, lats, lons):
+    columns = (lons - bbox["min_lon"]) * (
+        (map_width - 1) / (bbox["max_lon"] - bbox["min_lon"])
+    )
+    rows = ((lats * (-1)) + bbox["max_lat"]) * (
+        (map_height - 1) / (bbox["max_lat"] - bbox["min_lat"])
+    )
+    # Truncation, the same as int() of `project_equirectangular()`
+    return rows.astype(np.int64), columns.astype(np.int64)
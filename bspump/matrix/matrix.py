@@ -109,6 +109,38 @@ class Matrix(abc.ABC, Configurable):
         self.Gauge.set("rows.active", self.Array.shape[0])
         return closed_indexes, saved_indexes
 
+    def snapshot(self):
+        """
+        Returns a copy of the state of the matrix as a dictionary of NumPy arrays, see `MatrixSnapshot`.
+        It is called from the event loop, so the copy is consistent.
+        """
+        return {
+            "array": self.Array.copy(),
+            "closed_rows": np.fromiter(self.ClosedRows.get_rows(), dtype=np.int64),
+        }
+
+    def restore(self, arrays):
+        """
+        Restores the state of the matrix from a `snapshot()`.
+        Raises `ValueError` when the snapshot doesn't match the data type or the shape of the matrix.
+        """
+        array = arrays["array"]
+        if array.dtype != self.Array.dtype or array.shape[1:] != self.Array.shape[1:]:
+            raise ValueError(
+                "Snapshot of {} {} doesn't match the matrix {}".format(
+                    array.dtype, array.shape, self.Array.shape
+                )
+            )
+
+        self.Array = array
+        self.ClosedRows.flush(self.Array.shape[0])
+        for row_index in arrays["closed_rows"].tolist():
+            self.ClosedRows.add(row_index)
+
+        crc = len(self.ClosedRows)
+        self.Gauge.set("rows.active", self.Array.shape[0] - crc)
+        self.Gauge.set("rows.closed", crc)
+
     def close_rows(self, row_names, clear=True):
         pass
 
@@ -140,8 +172,8 @@ class Matrix(abc.ABC, Configurable):
         Override this method to gain control on how a new closed rows are added to the matrix
         """
         current_rows = self.Array.shape[0]
-        self.Array = np.pad(
-            self.Array.copy(), ((0, rows), (0, 0)), "constant", constant_values=np.nan
+        self.Array = np.concatenate(
+            [self.Array, np.zeros(self.build_shape(rows), dtype=self.DType)]
         )
         self.ClosedRows.extend(current_rows, self.Array.shape[0])
 
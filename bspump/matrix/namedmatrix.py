@@ -14,6 +14,15 @@ L = logging.getLogger(__name__)
 
 
 class NamedMatrix(Matrix):
+    """
+    Matrix with named rows.
+
+    Changes of rows are published in the `PubSub` of the matrix (besides "Matrix changed!"):
+    "Matrix rows changed!" with a list of indexes of added or stored rows,
+    "Matrix rows closed!" with a list of indexes of closed rows
+    and "Matrix reindexed!" when row indexes have changed (e.g. by `flush()`).
+    """
+
     def __init__(self, app, dtype="float_", id=None, config=None):
         super().__init__(app, dtype=dtype, id=id, config=config)
         self.PubSub = PubSub(app)
@@ -51,12 +60,34 @@ class NamedMatrix(Matrix):
         super()._grow_rows(rows)
         self.Index.extend(self.Array.shape[0])
 
+    def snapshot(self):
+        arrays = super().snapshot()
+        arrays["row_indexes"] = np.fromiter(
+            self.Index.I2NMap.keys(), dtype=np.int64, count=len(self.Index)
+        )
+        arrays["row_names"] = np.array(list(self.Index.I2NMap.values()), dtype=str)
+        return arrays
+
+    def restore(self, arrays):
+        """
+        Restores the matrix from a `snapshot()`, row names are restored as strings.
+        """
+        super().restore(arrays)
+        self.Index = Index()
+        for row_index, row_name in zip(
+            arrays["row_indexes"].tolist(), arrays["row_names"].tolist()
+        ):
+            self.Index.add_row(row_name, row_index)
+        self.PubSub.publish("Matrix reindexed!")
+        self.PubSub.publish("Matrix changed!")
+
     def flush(self):
         """
         The matrix will be recreated without rows from `ClosedRows`.
         """
         closed_indexes, saved_indexes = super().flush()
         self.Index.flush(closed_indexes)
+        self.PubSub.publish("Matrix reindexed!")
         return closed_indexes, saved_indexes
 
     def add_row(self, row_name: str):
@@ -64,9 +95,30 @@ class NamedMatrix(Matrix):
 
         row_index = super().add_row()
         self.Index.add_row(row_name, row_index)
+        self.PubSub.publish("Matrix rows changed!", [row_index])
         self.PubSub.publish("Matrix changed!")
         return row_index
 
+    def add_rows(self, row_names):
+        """
+        Adds rows of all `row_names` at once, returns an array of their row indexes.
+        The matrix grows at most once and "Matrix changed!" is published once.
+        """
+        missing = len(row_names) - len(self.ClosedRows)
+        if missing > 0:
+            self._grow_rows(max(missing, 5, int(0.10 * self.Array.shape[0])))
+
+        row_indexes = np.empty(len(row_names), dtype=np.int64)
+        for i, row_name in enumerate(row_names):
+            assert row_name is not None
+            row_indexes[i] = super().add_row()
+            self.Index.add_row(row_name, int(row_indexes[i]))
+
+        if len(row_names) > 0:
+            self.PubSub.publish("Matrix rows changed!", row_indexes)
+            self.PubSub.publish("Matrix changed!")
+        return row_indexes
+
     def close_row(self, row_name, clear=True):
         row_index = self.Index.get_row_index(row_name)
         if row_index in self.ClosedRows:
@@ -76,6 +128,7 @@ class NamedMatrix(Matrix):
             return False
 
         self.Index.pop_index(row_index)
+        self.PubSub.publish("Matrix rows closed!", [row_index])
         self.PubSub.publish("Matrix changed!")
 
         if clear:
@@ -121,6 +174,7 @@ class PersistentNamedMatrix(PersistentMatrix):
         """
         closed_indexes, saved_indexes = super().flush()
         self.Index.flush(closed_indexes)
+        self.PubSub.publish("Matrix reindexed!")
         return closed_indexes, saved_indexes
 
     def add_row(self, row_name: str):
@@ -128,9 +182,30 @@ class PersistentNamedMatrix(PersistentMatrix):
 
         row_index = super().add_row()
         self.Index.add_row(row_name, row_index)
+        self.PubSub.publish("Matrix rows changed!", [row_index])
         self.PubSub.publish("Matrix changed!")
         return row_index
 
+    def add_rows(self, row_names):
+        """
+        Adds rows of all `row_names` at once, returns an array of their row indexes.
+        The matrix grows at most once and "Matrix changed!" is published once.
+        """
+        missing = len(row_names) - len(self.ClosedRows)
+        if missing > 0:
+            self._grow_rows(max(missing, 5, int(0.10 * self.Array.shape[0])))
+
+        row_indexes = np.empty(len(row_names), dtype=np.int64)
+        for i, row_name in enumerate(row_names):
+            assert row_name is not None
+            row_indexes[i] = super().add_row()
+            self.Index.add_row(row_name, int(row_indexes[i]))
+
+        if len(row_names) > 0:
+            self.PubSub.publish("Matrix rows changed!", row_indexes)
+            self.PubSub.publish("Matrix changed!")
+        return row_indexes
+
     def close_row(self, row_name, clear=True):
         row_index = self.Index.get_row_index(row_name)
         if row_index in self.ClosedRows:
@@ -140,6 +215,7 @@ class PersistentNamedMatrix(PersistentMatrix):
             return False
 
         self.Index.pop_index(row_index)
+        self.PubSub.publish("Matrix rows closed!", [row_index])
         self.PubSub.publish("Matrix changed!")
 
         if clear:
@@ -1,5 +1,7 @@
 import logging
 
+import numpy as np
+
 from .namedmatrix import NamedMatrix, PersistentNamedMatrix
 
 ###
@@ -32,6 +34,7 @@ class SessionMatrix(NamedMatrix):
         if row_index is None:
             return False
         self.Array[row_index] = event
+        self.PubSub.publish("Matrix rows changed!", [row_index])
 
     def store_event(self, row_index: int, event, keys=None):
         if keys is None:
@@ -45,6 +48,7 @@ class SessionMatrix(NamedMatrix):
         for key in keys:
             if key in names:
                 self.Array[row_index][key] = event[key]
+        self.PubSub.publish("Matrix rows changed!", [row_index])
 
     def decode_row(self, row_index: int, keys=None):
         if keys is None:
@@ -59,6 +63,31 @@ class SessionMatrix(NamedMatrix):
 
         return event
 
+    def store_events(self, events, keys=None):
+        """
+        Stores a batch of events, rows are identified by the `primary_name` field of events.
+        Missing rows are created. Events without the `primary_name` are skipped.
+
+        Every column is assigned for the whole batch at once.
+        When the batch contains more events of one row, the last of them wins.
+
+        Returns an array of row indexes of events (-1 for skipped events).
+        """
+        return _store_events(self, events, keys)
+
+    def decode_rows(self, row_indexes, keys=None):
+        """
+        Decodes many rows at once into a dictionary of columns (NumPy arrays), one item per row.
+        The `primary_name` column contains row names.
+        """
+        return _decode_rows(self, row_indexes, keys)
+
+    def decode_rows_arrow(self, row_indexes, keys=None):
+        """
+        Decodes many rows at once into a `pyarrow.RecordBatch`, `pyarrow` package must be installed.
+        """
+        return _to_arrow(self.decode_rows(row_indexes, keys))
+
 
 class PersistentSessionMatrix(PersistentNamedMatrix):
     ConfigDefaults = {"primary_name": "id"}
@@ -78,6 +107,7 @@ class PersistentSessionMatrix(PersistentNamedMatrix):
         if row_index is None:
             return False
         self.Array[row_index] = event
+        self.PubSub.publish("Matrix rows changed!", [row_index])
 
     def store_event(self, row_index: int, event, keys=None):
         if keys is None:
@@ -91,6 +121,7 @@ class PersistentSessionMatrix(PersistentNamedMatrix):
         for key in keys:
             if key in names:
                 self.Array[row_index][key] = event[key]
+        self.PubSub.publish("Matrix rows changed!", [row_index])
 
     def decode_row(self, row_index: int, keys=None):
         if keys is None:
@@ -104,3 +135,96 @@ class PersistentSessionMatrix(PersistentNamedMatrix):
         event[self.PrimaryName] = self.get_row_name(row_index)
 
         return event
+
+    def store_events(self, events, keys=None):
+        """
+        Stores a batch of events, rows are identified by the `primary_name` field of events.
+        Missing rows are created. Events without the `primary_name` are skipped.
+
+        Every column is assigned for the whole batch at once.
+        When the batch contains more events of one row, the last of them wins.
+
+        Returns an array of row indexes of events (-1 for skipped events).
+        """
+        return _store_events(self, events, keys)
+
+    def decode_rows(self, row_indexes, keys=None):
+        """
+        Decodes many rows at once into a dictionary of columns (NumPy arrays), one item per row.
+        The `primary_name` column contains row names.
+        """
+        return _decode_rows(self, row_indexes, keys)
+
+    def decode_rows_arrow(self, row_indexes, keys=None):
+        """
+        Decodes many rows at once into a `pyarrow.RecordBatch`, `pyarrow` package must be installed.
+        """
+        return _to_arrow(self.decode_rows(row_indexes, keys))
+
+
+def _store_events(matrix, events, keys):
+    names = matrix.Array.dtype.names
+    if names is None:
+        raise TypeError("The matrix does not have correct column-like dtype")
+
+    row_indexes = np.empty(len(events), dtype=np.int64)
+    # Names of rows to be created and positions of their events
+    created = {}
+    for i, event in enumerate(events):
+        row_name = event.get(matrix.PrimaryName)
+        row_index = None if row_name is None else matrix.get_row_index(row_name)
+        if row_index is None:
+            row_index = -1
+            if row_name is not None:
+                created.setdefault(row_name, []).append(i)
+        row_indexes[i] = row_index
+
+    if len(created) > 0:
+        for row_index, positions in zip(
+            matrix.add_rows(list(created)), created.values()
+        ):
+            row_indexes[positions] = row_index
+
+    stored = (row_indexes >= 0).tolist()
+    if keys is None:
+        keys = names
+
+    for key in keys:
+        if key not in names:
+            continue
+
+        selected = [i for i, event in enumerate(events) if stored[i] and key in event]
+        if len(selected) == 0:
+            continue
+
+        matrix.Array[key][row_indexes[selected]] = [events[i][key] for i in selected]
+
+    matrix.PubSub.publish("Matrix rows changed!", row_indexes[row_indexes >= 0])
+    return row_indexes
+
+
+def _decode_rows(matrix, row_indexes, keys):
+    if keys is None:
+        keys = matrix.Array.dtype.names
+
+    if keys is None:
+        raise TypeError("The matrix does not have correct column-like dtype")
+
+    row_indexes = np.asarray(row_indexes, dtype=np.int64)
+    rows = matrix.Array[row_indexes]
+    columns = {key: rows[key] for key in keys}
+    columns[matrix.PrimaryName] = np.array(
+        [matrix.get_row_name(int(row_index)) for row_index in row_indexes], dtype=object
+    )
+    return columns
+
+
+def _to_arrow(columns):
+    import pyarrow
+
+    return pyarrow.RecordBatch.from_pydict(
+        {
+            key: column if column.ndim == 1 else column.tolist()
+            for key, column in columns.items()
+        }
+    )
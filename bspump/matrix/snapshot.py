@@ -0,0 +1,163 @@
+import os
+import logging
+import tempfile
+import threading
+
+import numpy as np
+
+import bspump.asab as asab
+from bspump.asab import Configurable
+
+from .matrix import PersistentMatrix
+
+###
+
+L = logging.getLogger(__name__)
+
+###
+
+
+class MatrixSnapshot(Configurable):
+    """
+    Periodically saves the state of an in-memory matrix (`NamedMatrix`, `SessionMatrix`, `TimeWindowMatrix`,
+    `SparseTimeWindowMatrix`, `GeoMatrix`, ...) into a file and restores it at startup,
+    so that a restart doesn't lose the matrix.
+
+    The state (the array, row names, closed rows, the time window, ...) is copied by `Matrix.snapshot()`
+    in the event loop, which is a fast memory copy. The copy is written in a worker thread
+    of the `asab.ProactorService` into the `.npz` file `<path>/<matrix id>.npz`, so the loop is not blocked by the disk.
+    The file is replaced atomically, an interrupted write doesn't damage the previous snapshot.
+    The last snapshot is written when the application exits.
+
+    `matrix` is a matrix object or an id of a matrix registered in the `bspump.PumpService`.
+    """
+
+    ConfigDefaults = {
+        "path": "",  # Directory of snapshots
+        "period": 60,  # Seconds between snapshots, 0 disables periodic snapshots
+        "restore": True,  # Restore the matrix from the last snapshot at startup
+    }
+
+    def __init__(self, app, matrix, id=None, config=None):
+        svc = app.get_service("bspump.PumpService")
+        self.Matrix = svc.locate_matrix(matrix)
+        assert not isinstance(
+            self.Matrix, PersistentMatrix
+        ), "Persistent matrices are stored in files already"
+
+        self.Id = id if id is not None else self.Matrix.Id + "Snapshot"
+        super().__init__("matrix_snapshot:{}".format(self.Id), config=config)
+
+        path = self.Config["path"]
+        assert path != "", "`path` not set on " + self.Id
+        os.makedirs(path, exist_ok=True)
+        self.Path = os.path.join(path, "{}.npz".format(self.Matrix.Id))
+
+        self.Period = float(self.Config["period"])
+        self.ProactorService = app.get_service("asab.ProactorService")
+
+        # Snapshots are numbered, an older snapshot never replaces a newer one
+        self.Lock = threading.Lock()
+        self.Sequence = 0
+        self.WrittenSequence = 0
+        self.Saving = False
+
+        metrics_service = app.get_service("asab.MetricsService")
+        self.Counter = metrics_service.create_counter(
+            "bspump.matrix.snapshot",
+            tags={"matrix": self.Matrix.Id},
+            init_values={"saved": 0, "failed": 0},
+        )
+
+        if self.Config.getboolean("restore"):
+            self.restore()
+
+        if self.Period > 0:
+            self.Timer = asab.Timer(app, self._on_tick, autorestart=True)
+            app.PubSub.subscribe("Application.run!", self._start_timer)
+        else:
+            self.Timer = None
+
+        app.PubSub.subscribe("Application.exit!", self._on_exit)
+
+    def _start_timer(self, event_type):
+        self.Timer.start(self.Period)
+
+    async def _on_tick(self):
+        await self.save()
+
+    def _on_exit(self, event_type):
+        # The loop is stopping, the last snapshot is written right away
+        self._count(self._write(self._take()))
+
+    async def save(self):
+        """
+        Takes a snapshot of the matrix and writes it in a worker thread.
+        The snapshot is skipped when the previous one is still being written.
+        """
+        if self.Saving:
+            return
+
+        self.Saving = True
+        try:
+            written = await self.ProactorService.execute(self._write, self._take())
+        finally:
+            self.Saving = False
+        self._count(written)
+
+    def _take(self):
+        self.Sequence += 1
+        return self.Sequence, self.Matrix.snapshot()
+
+    def _count(self, written):
+        self.Counter.add("saved" if written else "failed", 1)
+
+    def _write(self, snapshot):
+        """
+        Writes the snapshot, it is called in a worker thread. Returns False when the write failed.
+        """
+        sequence, arrays = snapshot
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self.Path), suffix=".tmp"
+            )
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+
+            with self.Lock:
+                if sequence > self.WrittenSequence:
+                    os.replace(tmp_path, self.Path)
+                    self.WrittenSequence = sequence
+                else:
+                    os.unlink(tmp_path)
+
+        except Exception:
+            L.exception(
+                "Failed to write the snapshot of the matrix {}".format(self.Matrix.Id)
+            )
+            return False
+
+        return True
+
+    def restore(self):
+        """
+        Restores the matrix from the last snapshot, returns False when there is no usable snapshot.
+        """
+        if not os.path.exists(self.Path):
+            return False
+
+        try:
+            with np.load(self.Path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+            self.Matrix.restore(arrays)
+
+        except (OSError, ValueError, KeyError) as e:
+            L.warning(
+                "Cannot restore the matrix {} from '{}': {}".format(
+                    self.Matrix.Id, self.Path, e
+                )
+            )
+            return False
+
+        L.info("Matrix {} was restored from '{}'".format(self.Matrix.Id, self.Path))
+        return True
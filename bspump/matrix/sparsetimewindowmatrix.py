@@ -0,0 +1,455 @@
+import time
+import logging
+import collections
+
+import numpy as np
+
+from bspump.asab import Timer, PubSub
+
+from .matrix import Matrix
+from .utils.index import Index
+from .utils.closedrows import ClosedRows
+from .utils.timeconfig import TimeConfig
+from .utils.warmingupcount import WarmingUpCount
+
+###
+
+L = logging.getLogger(__name__)
+
+###
+
+
+class SparseTimeWindowMatrix(Matrix):
+    """
+    Sparse variant of the `TimeWindowMatrix` for many rows (e.g. IP addresses or users) with only a few
+    values each.
+
+    Only cells that were written are stored. Every time column is a bucket of its cells in the COO format
+    (an array of row indexes and an array of values), a shift of the time window drops the oldest bucket.
+    Row names are mapped to compact row indexes, indexes of closed rows are reused.
+
+    The API follows the `TimeWindowMatrix` (`add_row()`, `get_row_index()`, `get_column()`, `advance()`, ...),
+    but instead of the `Array` cells are accessed by `set()`, `add()` and `get()` (or their batch variants)
+    and analyzed by per-row reductions (`row_sum()`, `row_count()`, `row_min()`, `row_max()`, `row_mean()`),
+    `to_coo()` or `to_dense()`.
+
+    The `dtype` must be a scalar type, missing cells are NaN in results.
+    """
+
+    def __init__(
+        self,
+        app,
+        dtype="float_",
+        start_time=None,
+        resolution=60,
+        columns=15,
+        clock_driven=False,
+        id=None,
+        config=None,
+    ):
+        assert np.dtype(dtype).names is None, "Sparse matrix requires a scalar dtype"
+
+        self.Columns = columns
+        if start_time is None:
+            start_time = time.time()
+
+        start = (1 + (start_time // resolution)) * resolution
+        self.Start = start
+        self.Resolution = resolution
+
+        super().__init__(app, dtype=dtype, id=id, config=config)
+        self.PubSub = PubSub(app)
+
+        if clock_driven:
+            advance_period = resolution / 4
+            self.Timer = Timer(app, self.on_clock_tick, autorestart=True)
+            self.Timer.start(advance_period)
+        else:
+            self.Timer = None
+
+        self.ClockDriven = clock_driven
+        metrics_service = app.get_service("asab.MetricsService")
+        self.Counters = metrics_service.create_counter(
+            "EarlyLateEventCounter",
+            tags={
+                "matrix": self.Id,
+            },
+            init_values={
+                "events.early": 0,
+                "events.late": 0,
+            },
+        )
+
+    def zeros(self):
+        self.Index = Index()
+        self.ClosedRows = ClosedRows()
+        # Number of row indexes in use, open and closed
+        self.Rows = 0
+        self.Buckets = collections.deque(
+            ColumnBucket(self.DType) for _ in range(self.Columns)
+        )
+        self.TimeConfig = TimeConfig(self.Resolution, self.Columns, self.Start)
+        self.End = self.TimeConfig.get_end()
+        self.WarmingUpCount = WarmingUpCount(0)
+
+    def flush(self):
+        """
+        Indexes of closed rows are reused, there is nothing to flush.
+        """
+        return set(), list(self.Index.I2NMap.keys())
+
+    def add_row(self, row_name):
+        """
+        Adds new row with `row_name` to the matrix and sets `warming_up_count`.
+        """
+        assert row_name is not None
+
+        try:
+            row_index = self.ClosedRows.pop()
+        except KeyError:
+            row_index = self.Rows
+            self.Rows += 1
+            if self.Rows > len(self.WarmingUpCount):
+                self.WarmingUpCount.extend(
+                    max(16, 2 * len(self.WarmingUpCount)), self.Columns
+                )
+
+        self.WarmingUpCount.assign(row_index, self.Columns)
+        self.Index.add_row(row_name, row_index)
+        self.PubSub.publish("Matrix changed!")
+        self._update_gauge()
+        return row_index
+
+    def close_row(self, row_name, clear=True):
+        """
+        Closes the row, its cells are removed.
+        """
+        row_index = self.Index.get_row_index(row_name)
+        if row_index is None:
+            return False
+
+        self.Index.pop_index(row_index)
+        for bucket in self.Buckets:
+            bucket.discard(row_index)
+
+        self.ClosedRows.add(row_index)
+        self.PubSub.publish("Matrix changed!")
+        self._update_gauge()
+        return True
+
+    def close_rows(self, row_names, clear=True):
+        for name in row_names:
+            self.close_row(name, clear=clear)
+
+    def get_row_index(self, row_name: str):
+        return self.Index.get_row_index(row_name)
+
+    def get_row_name(self, row_index: int):
+        return self.Index.get_row_name(row_index)
+
+    def snapshot(self):
+        """
+        Returns a copy of the state of the matrix as a dictionary of NumPy arrays, see `MatrixSnapshot`.
+        """
+        rows, columns, values = self.to_coo()
+        return {
+            "rows": np.array(self.Rows, dtype=np.int64),
+            "cell_rows": rows,
+            "cell_columns": columns,
+            "cell_values": values,
+            "closed_rows": np.fromiter(self.ClosedRows.get_rows(), dtype=np.int64),
+            "row_indexes": np.fromiter(
+                self.Index.I2NMap.keys(), dtype=np.int64, count=len(self.Index)
+            ),
+            "row_names": np.array(list(self.Index.I2NMap.values()), dtype=str),
+            "time_config": self.TimeConfig.TC.copy(),
+            "warming_up_count": self.WarmingUpCount.WUC.copy(),
+        }
+
+    def restore(self, arrays):
+        """
+        Restores the matrix from a `snapshot()`, row names are restored as strings.
+        """
+        if int(arrays["time_config"]["columns"][0]) != self.Columns:
+            raise ValueError("Snapshot doesn't match the number of columns")
+
+        self.zeros()
+        self.Rows = int(arrays["rows"])
+        for row_index in arrays["closed_rows"].tolist():
+            self.ClosedRows.add(row_index)
+        for row_index, row_name in zip(
+            arrays["row_indexes"].tolist(), arrays["row_names"].tolist()
+        ):
+            self.Index.add_row(row_name, row_index)
+
+        for row_index, column, value in zip(
+            arrays["cell_rows"].tolist(),
+            arrays["cell_columns"].tolist(),
+            arrays["cell_values"].tolist(),
+        ):
+            self.set(row_index, column, value)
+
+        self.TimeConfig.TC = arrays["time_config"]
+        self.WarmingUpCount.WUC = arrays["warming_up_count"]
+        self.Start = self.TimeConfig.get_start()
+        self.End = self.TimeConfig.get_end()
+        self.PubSub.publish("Matrix changed!")
+        self._update_gauge()
+
+    def _update_gauge(self):
+        crc = len(self.ClosedRows)
+        self.Gauge.set("rows.active", self.Rows - crc)
+        self.Gauge.set("rows.closed", crc)
+
+    # Time window
+
+    def get_column(self, event_timestamp):
+        """
+        Returns the right column, where the timestamp fits.
+        If if falls earlier or later, returns `None`.
+        The timestamp should be provided in seconds.
+        """
+
+        if event_timestamp <= self.TimeConfig.get_end():
+            self.Counters.add("events.late", 1)
+            return None
+
+        if event_timestamp >= self.TimeConfig.get_start():
+            self.Counters.add("events.early", 1)
+            return None
+
+        column_idx = int(
+            (event_timestamp - self.TimeConfig.get_end())
+            // self.TimeConfig.get_resolution()
+        )
+        return min(max(column_idx, 0), self.Columns - 1)
+
+    def get_columns(self, event_timestamps):
+        """
+        Returns an array of columns of many timestamps at once, -1 for timestamps out of the time window.
+        """
+        timestamps = np.asarray(event_timestamps, dtype=np.float64)
+        late = timestamps <= self.TimeConfig.get_end()
+        early = timestamps >= self.TimeConfig.get_start()
+        self.Counters.add("events.late", int(late.sum()))
+        self.Counters.add("events.early", int(early.sum()))
+
+        columns = (
+            (timestamps - self.TimeConfig.get_end()) // self.TimeConfig.get_resolution()
+        ).astype(np.int64)
+        columns = np.clip(columns, 0, self.Columns - 1)
+        columns[late | early] = -1
+        return columns
+
+    def advance(self, target_ts):
+        """
+        Advance time window (add columns) so it covers target `timestamp` (`target_ts`)
+        Also, if `target_ts` is in top 75% of the last existing column, add a new column too.
+
+        "target_ts" must always be in seconds
+        """
+        added = 0
+        while True:
+            dt = (
+                self.TimeConfig.get_start() - target_ts
+            ) / self.TimeConfig.get_resolution()
+            if dt > 0.25:
+                break
+            self.add_column()
+            added += 1
+
+        return added
+
+    def reset_window(self, start_time):
+        """
+        Moves the time window so that its newest column covers `start_time`, cells are cleared.
+        It starts an event-time window at the timestamp of the first event, see `TimeWindowAnalyzer`.
+        """
+        resolution = self.TimeConfig.get_resolution()
+        start = (1 + (start_time // resolution)) * resolution
+        self.TimeConfig.set_start(start)
+        self.TimeConfig.set_end(start - (resolution * self.Columns))
+        self.Start = self.TimeConfig.get_start()
+        self.End = self.TimeConfig.get_end()
+
+        self.Buckets = collections.deque(
+            ColumnBucket(self.DType) for _ in range(self.Columns)
+        )
+        self.WarmingUpCount.WUC[:] = self.Columns
+
+    async def on_clock_tick(self):
+        """
+        React on timer's tick and advance the window.
+        """
+        target_ts = time.time()
+        self.advance(target_ts)
+
+    def add_column(self):
+        """
+        Drops the oldest column with its cells and adds a new empty one,
+        `Start` and `End` attributes are advanced as well.
+        """
+        self.TimeConfig.add_start(self.TimeConfig.get_resolution())
+        self.TimeConfig.add_end(self.TimeConfig.get_resolution())
+
+        self.Buckets.popleft()
+        self.Buckets.append(ColumnBucket(self.DType))
+
+        if len(self.Index) > 0:
+            self.WarmingUpCount.decrease(
+                np.fromiter(self.Index.I2NMap.keys(), dtype=np.int64)
+            )
+
+        self.Start = self.TimeConfig.get_start()
+        self.End = self.TimeConfig.get_end()
+
+    # Cells
+
+    def get(self, row_index, column):
+        """
+        Returns the value of the cell, NaN if it is not set.
+        """
+        return self.Buckets[column].get(row_index)
+
+    def set(self, row_index, column, value):
+        self.Buckets[column].set(row_index, value)
+
+    def add(self, row_index, column, value=1):
+        """
+        Adds the `value` to the cell, a missing cell starts from zero.
+        """
+        self.Buckets[column].add(row_index, value)
+
+    def add_many(self, row_indexes, columns, values=1):
+        """
+        Adds `values` to cells given by arrays of `row_indexes` and `columns`, cells with a column -1 are skipped.
+        Values of the same cell are summed up first.
+        """
+        row_indexes = np.asarray(row_indexes, dtype=np.int64)
+        columns = np.asarray(columns, dtype=np.int64)
+        values = np.broadcast_to(np.asarray(values, dtype=self.DType), columns.shape)
+
+        for column in np.unique(columns[columns >= 0]).tolist():
+            selected = columns == column
+            rows, inverse = np.unique(row_indexes[selected], return_inverse=True)
+            sums = np.zeros(len(rows), dtype=self.DType)
+            np.add.at(sums, inverse, values[selected])
+            bucket = self.Buckets[column]
+            for row_index, value in zip(rows.tolist(), sums.tolist()):
+                bucket.add(row_index, value)
+
+    # Reductions
+
+    def to_coo(self):
+        """
+        Returns all cells as three arrays: row indexes, columns and values.
+        """
+        rows = [bucket.Rows[: bucket.Size] for bucket in self.Buckets]
+        columns = [
+            np.full(bucket.Size, column, dtype=np.int64)
+            for column, bucket in enumerate(self.Buckets)
+        ]
+        values = [bucket.Values[: bucket.Size] for bucket in self.Buckets]
+        return np.concatenate(rows), np.concatenate(columns), np.concatenate(values)
+
+    def to_dense(self):
+        """
+        Returns a dense `rows × columns` float array, missing cells are NaN.
+        """
+        dense = np.full((self.Rows, self.Columns), np.nan)
+        rows, columns, values = self.to_coo()
+        dense[rows, columns] = values
+        return dense
+
+    def row_count(self):
+        """
+        Returns the number of set cells of every row.
+        """
+        rows, _, _ = self.to_coo()
+        return np.bincount(rows, minlength=self.Rows)
+
+    def row_sum(self):
+        rows, _, values = self.to_coo()
+        return np.bincount(rows, weights=values, minlength=self.Rows)
+
+    def row_mean(self):
+        """
+        Returns the mean of set cells of every row, NaN for rows without cells.
+        """
+        rows, _, values = self.to_coo()
+        counts = np.bincount(rows, minlength=self.Rows)
+        sums = np.bincount(rows, weights=values, minlength=self.Rows)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+    def row_max(self):
+        """
+        Returns the maximum of set cells of every row, NaN for rows without cells.
+        """
+        rows, _, values = self.to_coo()
+        result = np.full(self.Rows, np.nan)
+        np.fmax.at(result, rows, values)
+        return result
+
+    def row_min(self):
+        rows, _, values = self.to_coo()
+        result = np.full(self.Rows, np.nan)
+        np.fmin.at(result, rows, values)
+        return result
+
+
+class ColumnBucket(object):
+    """
+    Cells of one column in the COO format, `Positions` maps row indexes to positions in `Rows` and `Values`.
+    """
+
+    __slots__ = ("Rows", "Values", "Positions", "Size")
+
+    def __init__(self, dtype, capacity=8):
+        self.Rows = np.zeros(capacity, dtype=np.int64)
+        self.Values = np.zeros(capacity, dtype=dtype)
+        self.Positions = {}
+        self.Size = 0
+
+    def get(self, row_index):
+        position = self.Positions.get(row_index)
+        if position is None:
+            return np.nan
+        return self.Values[position]
+
+    def set(self, row_index, value):
+        position = self._position(row_index)
+        self.Values[position] = value
+
+    def add(self, row_index, value):
+        position = self._position(row_index)
+        self.Values[position] += value
+
+    def discard(self, row_index):
+        position = self.Positions.pop(row_index, None)
+        if position is None:
+            return
+
+        # The last cell takes the place of the removed one
+        self.Size -= 1
+        if position != self.Size:
+            moved = int(self.Rows[self.Size])
+            self.Rows[position] = moved
+            self.Values[position] = self.Values[self.Size]
+            self.Positions[moved] = position
+
+    def _position(self, row_index):
+        position = self.Positions.get(row_index)
+        if position is not None:
+            return position
+
+        if self.Size == len(self.Rows):
+            self.Rows = np.resize(self.Rows, 2 * self.Size)
+            self.Values = np.resize(self.Values, 2 * self.Size)
+
+        position = self.Size
+        self.Rows[position] = row_index
+        self.Values[position] = 0
+        self.Positions[row_index] = position
+        self.Size += 1
+        return position
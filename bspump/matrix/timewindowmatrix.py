@@ -209,6 +209,21 @@ class TimeWindowMatrix(NamedMatrix):
         self.WarmingUpCount.flush(saved_indexes)
         return closed_indexes, saved_indexes
 
+    def reset_window(self, start_time):
+        """
+        Moves the time window so that its newest column covers `start_time`, cells are cleared.
+        It starts an event-time window at the timestamp of the first event, see `TimeWindowAnalyzer`.
+        """
+        resolution = self.TimeConfig.get_resolution()
+        start = (1 + (start_time // resolution)) * resolution
+        self.TimeConfig.set_start(start)
+        self.TimeConfig.set_end(start - (resolution * self.Array.shape[1]))
+        self.Start = self.TimeConfig.get_start()
+        self.End = self.TimeConfig.get_end()
+
+        self.Array[...] = np.zeros((), dtype=self.Array.dtype)
+        self.WarmingUpCount.WUC[:] = self.Array.shape[1]
+
     async def on_clock_tick(self):
         """
         React on timer's tick and advance the window.
@@ -216,6 +231,23 @@ class TimeWindowMatrix(NamedMatrix):
         target_ts = time.time()
         self.advance(target_ts)
 
+    def snapshot(self):
+        arrays = super().snapshot()
+        arrays["time_config"] = self.TimeConfig.TC.copy()
+        arrays["warming_up_count"] = self.WarmingUpCount.WUC.copy()
+        return arrays
+
+    def restore(self, arrays):
+        """
+        Restores the matrix from a `snapshot()` including its time window.
+        A clock-driven matrix advances the restored window to the current time with the next tick.
+        """
+        super().restore(arrays)
+        self.TimeConfig.TC = arrays["time_config"]
+        self.WarmingUpCount.WUC = arrays["warming_up_count"]
+        self.Start = self.TimeConfig.get_start()
+        self.End = self.TimeConfig.get_end()
+
     def zeros(self):
         super().zeros()
         self.TimeConfig = TimeConfig(self.Resolution, self.Columns, self.Start)
@@ -424,6 +456,21 @@ class PersistentTimeWindowMatrix(PersistentNamedMatrix):
         self.WarmingUpCount.flush(saved_indexes)
         return closed_indexes, saved_indexes
 
+    def reset_window(self, start_time):
+        """
+        Moves the time window so that its newest column covers `start_time`, cells are cleared.
+        It starts an event-time window at the timestamp of the first event, see `TimeWindowAnalyzer`.
+        """
+        resolution = self.TimeConfig.get_resolution()
+        start = (1 + (start_time // resolution)) * resolution
+        self.TimeConfig.set_start(start)
+        self.TimeConfig.set_end(start - (resolution * self.Array.shape[1]))
+        self.Start = self.TimeConfig.get_start()
+        self.End = self.TimeConfig.get_end()
+
+        self.Array[...] = np.zeros((), dtype=self.Array.dtype)
+        self.WarmingUpCount.WUC[:] = self.Array.shape[1]
+
     async def on_clock_tick(self):
         """
         React on timer's tick and advance the window.
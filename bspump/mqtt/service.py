@@ -1,7 +1,11 @@
 import re
+import copy
 import json
-import logging
 import time
+import asyncio
+import logging
+import collections
+
 from bspump.asab import Service, Config
 from bspump.asab.web.rest.json import JSONDumper
 
@@ -107,6 +111,18 @@ def get_message_structure():
 
 
 class MQTTService(Service):
+    """
+    Publishes the pipeline topology and events of subscribed components (event taps) to MQTT.
+
+    A client subscribes to events of a component by publishing `{"count": N}` to
+    `/c/<pipeline>/c/<component>/events/subscribe`, optionally with `"sample": K` to receive only every K-th event.
+
+    Tapping is kept out of the hot path of the pipeline: the pipeline checks only a dictionary of tapped processors
+    (empty when nothing is subscribed) and a tapped event is just copied into a bounded ring buffer.
+    The events are serialized and published by a background task, at most `tap_rate` events per second.
+    When the buffer of `tap_buffer_size` events is full, the oldest events are dropped.
+    """
+
     def __init__(self, app, service_name="bspump.MQTTService", connection=None):
         super().__init__(app, service_name)
         self.App = app
@@ -121,6 +137,33 @@ class MQTTService(Service):
             )
             self.max_count = 100
 
+        self.TapBuffer = collections.deque(
+            maxlen=self._get_config("tap_buffer_size", 1000, int)
+        )
+        self.TapRate = self._get_config("tap_rate", 50, float)  # Events per second
+        self.TapReady = asyncio.Event()
+        self.TapTask = None
+
+        # (pipeline id, component id) -> publish every n-th event
+        self.Sampling = {}
+
+        metrics_service = app.get_service("asab.MetricsService")
+        self.TapCounter = metrics_service.create_counter(
+            "bspump.mqtt.tap",
+            init_values={"published": 0, "dropped": 0},
+        )
+
+    def _get_config(self, key, default, type):
+        try:
+            return type(Config["mqtt"].get(key, default))
+        except (KeyError, ValueError):
+            return default
+
+    async def finalize(self, app):
+        if self.TapTask is not None:
+            self.TapTask.cancel()
+            self.TapTask = None
+
     def components_initialize(self):
         svc = self.App.get_service("bspump.PumpService")
         self.Connection = svc.locate_connection(self.ConnectionId)
@@ -134,7 +177,6 @@ class MQTTService(Service):
 
             for depth in pipeline.Processors:
                 for component in depth:
-                    pipeline.PublishingProcessors[component.Id] = 0
                     self.Connection.subscribe_topic(
                         f"/c/{pipeline.Id}/c/{component.Id}/events/subscribe"
                     )
@@ -158,9 +200,11 @@ class MQTTService(Service):
             retain=True,
         )
 
+        if self.TapTask is None:
+            self.TapTask = asyncio.ensure_future(self._publish_taps())
+
     def on_message(self, client, userdata, message):
         payload = message.payload.decode("utf-8")
-        svc = self.App.get_service("bspump.PumpService")
         topic = message.topic
 
         # Regex patterns
@@ -185,37 +229,126 @@ class MQTTService(Service):
 
         count = min(count, self.max_count)
 
+        sample = payload.get("sample", 1)
+        if not isinstance(sample, int) or sample < 1:
+            sample = 1
+
         if events:
-            pipeline = events.group("pipeline_identifier")
-            processor = events.group("component_identifier")
-            pipeline = svc.locate(f"{pipeline}")
-
-            if pipeline is None:
-                L.warning(f"Pipeline {pipeline} not found")
-                return
-
-            source = pipeline.locate_source(f"{processor}")
-            if source is not None:
-                source.EventsToPublish = count
-            else:
-                processor = pipeline.locate_processor(f"{processor}")
-
-                if processor is None:
-                    L.warning(f"Processor {processor} not found")
-                    return
-
-                pipeline.PublishingProcessors[processor.Id] = max(
-                    count, pipeline.PublishingProcessors[processor.Id]
-                )
+            # Messages are received in the thread of the MQTT client, pipelines live in the event loop
+            self.App.Loop.call_soon_threadsafe(
+                self.subscribe_events,
+                events.group("pipeline_identifier"),
+                events.group("component_identifier"),
+                count,
+                sample,
+            )
+
+    def subscribe_events(self, pipeline_id, component_id, count, sample=1):
+        """
+        Taps `count` events of the component, only every `sample`-th event is published.
+        """
+        svc = self.App.get_service("bspump.PumpService")
+        pipeline = svc.locate(pipeline_id)
+        if pipeline is None:
+            L.warning(f"Pipeline {pipeline_id} not found")
+            return
+
+        if sample > 1:
+            self.Sampling[(pipeline.Id, component_id)] = sample
+        else:
+            self.Sampling.pop((pipeline.Id, component_id), None)
+
+        source = pipeline.locate_source(component_id)
+        if source is not None:
+            source.EventsToPublish = count
+            return
+
+        processor = pipeline.locate_processor(component_id)
+        if processor is None:
+            L.warning(f"Processor {component_id} not found")
+            return
+
+        # Only processors with a pending subscription are present in the dictionary
+        count = max(count, pipeline.PublishingProcessors.get(processor.Id, 0))
+        if count > 0:
+            pipeline.PublishingProcessors[processor.Id] = count
+
+    def tap(self, pipeline_id, component, event, count_remaining):
+        """
+        Copies the event of a tapped component into the ring buffer, to be published by the background task.
+        Returns False if the event has been skipped by the sampling.
+        """
+        sample = self.Sampling.get((pipeline_id, component.Id), 1)
+        if sample > 1 and component.EventCount % sample != 0:
+            return False
+
+        if len(self.TapBuffer) == self.TapBuffer.maxlen:
+            self.TapCounter.add("dropped", 1)
+
+        self.TapBuffer.append(
+            (
+                pipeline_id,
+                component.Id,
+                component.EventCount,
+                count_remaining,
+                _snapshot(event),
+            )
+        )
+        self.TapReady.set()
+        return True
+
+    async def _publish_taps(self):
+        interval = 1.0 / self.TapRate if self.TapRate > 0 else 0
+        while True:
+            await self.TapReady.wait()
+            while len(self.TapBuffer) > 0:
+                (
+                    pipeline_id,
+                    component_id,
+                    event_count,
+                    count_remaining,
+                    event,
+                ) = self.TapBuffer.popleft()
+                try:
+                    self._publish(
+                        pipeline_id, component_id, event, event_count, count_remaining
+                    )
+                except Exception:
+                    L.exception(
+                        "Failed to publish an event of '{}'".format(component_id)
+                    )
+                else:
+                    self.TapCounter.add("published", 1)
+
+                if interval > 0:
+                    await asyncio.sleep(interval)
+
+            self.TapReady.clear()
 
     def publish_event(self, pipeline, component, event, count_remaining):
+        """
+        Publishes the event of the component immediately, prefer `tap()` in the processing path.
+        """
+        self._publish(
+            pipeline, component.Id, event, component.EventCount, count_remaining
+        )
+
+    def _publish(self, pipeline_id, component_id, event, event_count, count_remaining):
         data = get_message_structure()
         if isinstance(event, bytes):
             event = event.decode("utf-8")
         data["data"] = event
-        data["count"] = component.EventCount
+        data["count"] = event_count
         data["remaining_subscription_count"] = count_remaining
         self.Connection.publish_to_topic(
-            f"/c/{pipeline}/c/{component.Id}/events",
+            f"/c/{pipeline_id}/c/{component_id}/events",
             json.dumps(data, default=lambda x: x.__class__.__name__),
         )
+
+
+def _snapshot(event):
+    # The event can be modified by the following processors before it is published
+    try:
+        return copy.deepcopy(event)
+    except Exception:
+        return event
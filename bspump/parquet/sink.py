@@ -1,7 +1,7 @@
 import logging
 import os
 import json
-from asab.timer import Timer
+from bspump.asab import Timer
 import pyarrow as pa
 import pyarrow.parquet as pq
 import pandas as pd
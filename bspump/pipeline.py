@@ -52,6 +52,7 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
         "async_concurency_limit": 1000,  # TODO concurrency
         "reset_profiler": True,
         "stop_on_errors": True,
+        "latency_sample": 0,  # Trace the end-to-end latency of every N-th event, 0 disables the tracing
     }
 
     def __init__(self, app, id=None, config=None):
@@ -80,6 +81,7 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
         self.AlertService = app.AlertService
 
         self.MQTTService = app.get_service("bspump.MQTTService")
+        # Processor id -> number of events to publish to MQTT, only tapped processors are present
         self.PublishingProcessors = {}
         self.StopOnErrors = self.Config["stop_on_errors"]
 
@@ -137,6 +139,20 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
         self.ProcessorsEPSMetrics = {}
         self.ProcessorsCounter = {}
 
+        # Opt-in latency tracing, only every N-th event is traced to keep the overhead bounded
+        self.LatencySample = int(self.Config["latency_sample"])
+        self.ProcessorsLatency = {}
+        self._latency_counter = 0
+        if self.LatencySample > 0:
+            self.LatencySketch = self.MetricsService.create_quantile_sketch(
+                "bspump.pipeline.latency",
+                tags={"pipeline": self.Id},
+                help="Time from the receipt of an event by the pipeline to its consumption by a sink.",
+                unit="seconds",
+            )
+        else:
+            self.LatencySketch = None
+
         app.PubSub.subscribe("Metrics.flush!", self._on_metrics_flush)
 
         # Pipeline logger
@@ -420,20 +436,31 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
         orig_ready = self.is_ready()
 
         # Do we observed an error?
-        new_ready = self._error is None
+        # inject() keeps the last event in `_error` without an exception, that is not an error
+        new_ready = self._error is None or self._error[2] is None
 
         # Are we throttled?
         if new_ready:
             new_ready = len(self._throttles) == 0
 
         if orig_ready != new_ready:
+            # Throttling may flip the readiness many times within one loop iteration,
+            # subscribers are notified only about the final state of each pipeline
             if new_ready:
                 self._ready.set()
-                self.PubSub.publish("bspump.pipeline.ready!", pipeline=self)
+                self.PubSub.publish(
+                    "bspump.pipeline.ready!",
+                    pipeline=self,
+                    coalesce=("bspump.pipeline.ready", self.Id),
+                )
                 self.MetricsDutyCycle.set("ready", True)
             else:
                 self._ready.clear()
-                self.PubSub.publish("bspump.pipeline.not_ready!", pipeline=self)
+                self.PubSub.publish(
+                    "bspump.pipeline.not_ready!",
+                    pipeline=self,
+                    coalesce=("bspump.pipeline.ready", self.Id),
+                )
                 self.MetricsDutyCycle.set("ready", False)
 
     async def ready(self):
@@ -459,30 +486,38 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
         """
         return self._ready.is_set()
 
+    def _tap(self, processor, event):
+        count = self.PublishingProcessors[processor.Id]
+        if not self.MQTTService.tap(self.Id, processor, event, count):
+            return
+
+        if count > 1:
+            self.PublishingProcessors[processor.Id] = count - 1
+        else:
+            del self.PublishingProcessors[processor.Id]
+
     def _do_process(self, event, depth, context):
         """
         Description:
 
         :return:
         """
+        if self.LatencySample > 0:
+            received_at = context.get("pipeline.received_at")
+        else:
+            received_at = None
+
+        # Processors tapped by the MQTTService, empty when there is no subscription
+        publishing = self.PublishingProcessors
+
         for processor in self.Processors[depth]:
             t0 = time.perf_counter()
             try:
                 self.ProcessorsCounter[processor.Id].add("event.in", 1)
                 event = processor.process(context, event)
                 processor.EventCount += 1
-                if (
-                    self.MQTTService
-                    and processor.Id in self.PublishingProcessors.keys()
-                    and self.PublishingProcessors[processor.Id] > 0
-                ):
-                    self.MQTTService.publish_event(
-                        self.Id,
-                        processor,
-                        event,
-                        self.PublishingProcessors[processor.Id],
-                    )
-                    self.PublishingProcessors[processor.Id] -= 1
+                if publishing and processor.Id in publishing:
+                    self._tap(processor, event)
             except SystemExit as e:
                 raise e
             except BaseException as e:
@@ -492,11 +527,14 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
                 self.set_error(context, event, e)
                 event = None  # Event is discarted
             finally:
+                t1 = time.perf_counter()
                 self.ProcessorsCounter[processor.Id].add("event.out", 1)
-                self.ProfilerCounter[processor.Id].add(
-                    "duration", time.perf_counter() - t0
-                )
+                self.ProfilerCounter[processor.Id].add("duration", t1 - t0)
                 self.ProfilerCounter[processor.Id].add("run", 1)
+                if received_at is not None:
+                    self.ProcessorsLatency[processor.Id].add(
+                        "latency", t1 - received_at
+                    )
 
             if event is None:  # Event has been consumed on the way
                 if len(self.Processors) == (depth + 1):
@@ -504,6 +542,8 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
                         # self.ProcessorsCounter[processor.Id].add('event.out', 1)
                         self.MetricsEPSCounter.add("eps.out", 1)
                         self.MetricsCounter.add("event.out", 1)
+                        if received_at is not None:
+                            self.LatencySketch.add("latency", t1 - received_at)
                     else:
                         self.ProcessorsCounter[processor.Id].add("event.drop", 1)
                         self.MetricsEPSCounter.add("eps.drop", 1)
@@ -579,6 +619,9 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
 
         """
 
+        # The time spent waiting for the pipeline counts into the latency
+        context = self.stamp_received(context)
+
         while not self.is_ready():
             await self.ready()
 
@@ -587,6 +630,30 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
 
         self.inject(context, event, depth=0)
 
+    def stamp_received(self, context):
+        """
+        Stamps every `latency_sample`-th event with the time of its arrival into the pipeline
+        (`pipeline.received_at` in the context) to trace its end-to-end latency.
+        `process()` calls it before waiting for the pipeline to be ready,
+        sources that inject events directly (e.g. `DirectSource`) call it themselves.
+
+        Returns the context, a copy when it is stamped.
+        """
+        if self.LatencySample <= 0:
+            return context
+
+        if context is not None and "pipeline.received_at" in context:
+            return context
+
+        self._latency_counter += 1
+        if self._latency_counter < self.LatencySample:
+            return context
+
+        self._latency_counter = 0
+        context = dict(context) if context is not None else dict()
+        context["pipeline.received_at"] = time.perf_counter()
+        return context
+
     def create_eps_counter(self):
         """
         Creates a dictionary with information about the :meth:`Pipeline <bspump.Pipeline()>`. It contains eps (events per second), warnings and errors.
@@ -716,6 +783,7 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
                 del depth[idx]
                 del self.ProfilerCounter[processor.Id]
                 del self.ProcessorsEPSMetrics[processor.Id]
+                self.ProcessorsLatency.pop(processor.Id, None)
                 if isinstance(processor, Analyzer):
                     del self.ProfilerCounter["analyzer_" + processor.Id]
                 return
@@ -808,6 +876,19 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
             },
         )
 
+        if self.LatencySample > 0:
+            self.ProcessorsLatency[
+                processor.Id
+            ] = self.MetricsService.create_quantile_sketch(
+                "bspump.pipeline.latency",
+                tags={
+                    "processor": processor.Id,
+                    "pipeline": self.Id,
+                },
+                help="Time from the receipt of an event by the pipeline to the end of its processing by the processor.",
+                unit="seconds",
+            )
+
         if isinstance(processor, Analyzer):
             self.ProfilerCounter[
                 "analyzer_" + processor.Id
@@ -966,6 +1047,15 @@ class Pipeline(abc.ABC, bspump.asab.Configurable):
         for processors in self.Processors:
             rest["Processors"].append(processors)
 
+        if self.LatencySketch is not None:
+            rest["Latency"] = {
+                "Pipeline": self.LatencySketch.quantiles("latency"),
+                "Processors": {
+                    processor_id: sketch.quantiles("latency")
+                    for processor_id, sketch in self.ProcessorsLatency.items()
+                },
+            }
+
         if self._error:
             error_text = str(self._error[2])  # (context, event, exc, timestamp)[2]
             error_time = self._error[3]
@@ -0,0 +1,232 @@
+import heapq
+import logging
+import math
+
+from bspump.asab import Service
+
+#
+
+L = logging.getLogger(__name__)
+
+#
+
+
+class Deadline(object):
+    """
+    A callback registered at the :meth:`DeadlineScheduler <bspump.scheduler.DeadlineScheduler()>`.
+    Use `cancel()` to prevent the callback from being called.
+    """
+
+    __slots__ = ("Scheduler", "Tick", "Callback", "Args", "Active")
+
+    def __init__(self, scheduler, tick, callback, args):
+        self.Scheduler = scheduler
+        self.Tick = tick
+        self.Callback = callback
+        self.Args = args
+        self.Active = True
+
+    def cancel(self):
+        """
+        Cancels the deadline. It is safe to call this method repeatedly or after the deadline fired.
+        """
+        if self.Active:
+            self.Active = False
+            self.Scheduler.Pending -= 1
+
+
+class DeadlineScheduler(Service):
+    """
+    Scheduler of short, typically sub-second, deadlines that are independent on `Application.tick!`.
+
+    Components register their own deadlines (e.g. "flush this bulk 50 ms after the first item")
+    instead of waiting for the next application tick, which fires once per `tick_period`.
+
+    Deadlines are stored in a hashed timer wheel with `resolution` seconds granularity,
+    so that the event loop is woken up at most once per resolution step, no matter how many deadlines are due.
+    Ticks with deadlines are kept in a heap and the loop is woken up only at the earliest of them,
+    a distant deadline doesn't wake the loop before it is due.
+
+    .. code:: python
+
+            scheduler = app.get_service("bspump.DeadlineScheduler")
+            deadline = scheduler.schedule(0.05, self.flush)
+            ...
+            deadline.cancel()
+
+    """
+
+    def __init__(
+        self, app, service_name="bspump.DeadlineScheduler", resolution=0.01, slots=512
+    ):
+        super().__init__(app, service_name)
+
+        self.Loop = app.Loop
+        self.Resolution = resolution
+        self.Wheel = [[] for _ in range(slots)]
+
+        # Loop time of the tick zero, all ticks are counted from here
+        self.Origin = self.Loop.time()
+        # The last processed tick
+        self.Cursor = 0
+        # Number of active deadlines in the wheel
+        self.Pending = 0
+        # Ticks that have deadlines in the wheel, each of them once
+        self.Ticks = []
+        self.TickSet = set()
+
+        self._handle = None
+        self._armed_tick = None
+
+    async def finalize(self, app):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+            self._armed_tick = None
+
+    def _current_tick(self):
+        return int((self.Loop.time() - self.Origin) / self.Resolution)
+
+    def schedule(self, delay, callback, *args):
+        """
+        Calls `callback(*args)` after `delay` seconds.
+        The deadline is rounded up to the scheduler resolution, so the callback is never called too early.
+
+        **Parameters**
+
+        delay : float
+                        Delay in seconds.
+
+        callback : callable
+                        A regular (not coroutine) function to be called.
+
+        :return: :meth:`Deadline <bspump.scheduler.Deadline()>` that can be cancelled.
+
+        """
+        if self._handle is None:
+            # The wheel has been idle, nothing is pending between the cursor and now
+            self.Cursor = max(self.Cursor, self._current_tick())
+
+        tick = math.ceil((self.Loop.time() + delay - self.Origin) / self.Resolution)
+        if tick <= self.Cursor:
+            tick = self.Cursor + 1
+
+        deadline = Deadline(self, tick, callback, args)
+        self.Wheel[tick % len(self.Wheel)].append(deadline)
+        self.Pending += 1
+
+        if tick not in self.TickSet:
+            self.TickSet.add(tick)
+            heapq.heappush(self.Ticks, tick)
+
+        if self._armed_tick is None or tick < self._armed_tick:
+            self._arm(tick)
+
+        return deadline
+
+    def _arm(self, tick):
+        if self._handle is not None:
+            self._handle.cancel()
+        self._armed_tick = tick
+        self._handle = self.Loop.call_at(
+            self.Origin + tick * self.Resolution, self._advance
+        )
+
+    def _advance(self):
+        # The loop may call us a clock resolution early, the armed tick counts as reached anyway
+        now_tick = max(self._current_tick(), self._armed_tick)
+        slots = len(self.Wheel)
+
+        while len(self.Ticks) > 0 and self.Ticks[0] <= now_tick:
+            tick = heapq.heappop(self.Ticks)
+            self.TickSet.discard(tick)
+            # Deadlines scheduled from callbacks must land after the current tick
+            self.Cursor = max(self.Cursor, tick)
+
+            i = tick % slots
+            entries = self.Wheel[i]
+            self.Wheel[i] = remaining = []
+            for deadline in entries:
+                if not deadline.Active:
+                    continue
+                if deadline.Tick != tick:
+                    # Due in one of the next revolutions
+                    remaining.append(deadline)
+                    continue
+
+                deadline.Active = False
+                self.Pending -= 1
+                try:
+                    deadline.Callback(*deadline.Args)
+                except Exception:
+                    L.exception("Error in the deadline callback")
+
+        self.Cursor = max(self.Cursor, now_tick)
+
+        # The handle is released only here, so that callbacks above don't arm the wheel again
+        self._handle = None
+        self._armed_tick = None
+        # Ticks of cancelled deadlines are visited too, to release them from the wheel
+        if len(self.Ticks) > 0:
+            self._arm(self.Ticks[0])
+
+
+class Batcher(object):
+    """
+    Collects items into batches and hands every batch over to `on_batch(batch)`.
+
+    A batch is completed when it reaches `batch_size` items, `batch_timeout` seconds after its first item
+    (measured by the `bspump.DeadlineScheduler`) or when the application stops.
+
+    .. code-block:: python
+
+            self.Batcher = Batcher(app, self.store, batch_size=1000, batch_timeout=1)
+            ...
+            self.Batcher.append(item)
+
+    """
+
+    def __init__(self, app, on_batch, batch_size, batch_timeout):
+        self.OnBatch = on_batch
+        self.BatchSize = batch_size
+        self.BatchTimeout = batch_timeout
+
+        self.Batch = []
+        self.DeadlineScheduler = app.get_service("bspump.DeadlineScheduler")
+        self.Deadline = None
+
+        app.PubSub.subscribe("Application.stop!", self._on_application_stop)
+
+    def __len__(self):
+        return len(self.Batch)
+
+    def _on_application_stop(self, _, __):
+        self.flush()
+
+    def _on_deadline(self):
+        self.Deadline = None
+        self.flush()
+
+    def append(self, item):
+        self.Batch.append(item)
+        if len(self.Batch) >= self.BatchSize:
+            self.flush()
+        elif self.Deadline is None:
+            self.Deadline = self.DeadlineScheduler.schedule(
+                self.BatchTimeout, self._on_deadline
+            )
+
+    def flush(self):
+        """
+        Completes the current batch and hands it over, if it is not empty.
+        """
+        if self.Deadline is not None:
+            self.Deadline.cancel()
+            self.Deadline = None
+
+        if len(self.Batch) == 0:
+            return
+
+        batch = self.Batch
+        self.Batch = []
+        self.OnBatch(batch)
@@ -11,12 +11,29 @@ class SubProcessSource(Source):
     Sub-Process Source is capable of calling any command and fetch result from stdin as event
 
     Can be useful with commands like `tail -f`, `tshark -l -n -T ek -i wlan0` or others
+
+    The source can run a pool of `workers` identical children, their output lines are merged into the pipeline.
+    The output is read in chunks of `chunk_size` bytes and every chunk is split into lines at once.
+    Lines are emitted as bytes, including the line terminator.
+
+    With `stdin` enabled, data passed to `put()` are queued and every piece is written to the stdin of one
+    of the children, the one that is first ready to take it.
+
+    A child that exits with a return code not in `ok_return_codes` is restarted after `restart_delay` seconds,
+    the delay doubles with every consecutive failure up to `restart_max_delay`.
+    The source ends when all children exited with an OK return code.
     """
 
     ConfigDefaults = {
         "command": "",
         "line_len_limit": 2**20,
         "ok_return_codes": "0",  # Multiple codes must be separated by commas, e.g. 'ok_return_codes': '0,1,2',
+        "workers": 1,  # Number of identical child processes
+        "chunk_size": 64 * 1024,  # Bytes read from the stdout of a child at once
+        "stdin": False,  # Feed data from `put()` to the stdin of children
+        "stdin_queue_size": 1000,
+        "restart_delay": 1,  # Initial delay before the restart of a failed child, in seconds
+        "restart_max_delay": 60,
     }
 
     def __init__(self, app, pipeline, *, id=None, config=None):
@@ -30,28 +47,163 @@ class SubProcessSource(Source):
             int(i.strip()) for i in self.Config["ok_return_codes"].split(",")
         ]
 
+        self.Loop = app.Loop
+        self.LineLenLimit = int(self.Config["line_len_limit"])
+        self.Workers = int(self.Config["workers"])
+        self.ChunkSize = int(self.Config["chunk_size"])
+        self.RestartDelay = float(self.Config["restart_delay"])
+        self.RestartMaxDelay = float(self.Config["restart_max_delay"])
+
+        if self.Config.getboolean("stdin"):
+            self.StdinQueue = asyncio.Queue(int(self.Config["stdin_queue_size"]))
+        else:
+            self.StdinQueue = None
+
+        # Running child processes, by the worker index
+        self.Processes = {}
+
+        metrics_service = app.get_service("asab.MetricsService")
+        self.Counters = [
+            metrics_service.create_counter(
+                "bspump.subprocess",
+                tags={"pipeline": pipeline.Id, "source": self.Id, "worker": str(i)},
+                init_values={"lines": 0, "bytes": 0, "restarts": 0},
+            )
+            for i in range(self.Workers)
+        ]
+
+    async def put(self, data):
+        """
+        Queues `data` (bytes) to be written to the stdin of one of the children.
+        Waits when the queue is full.
+        """
+        assert self.StdinQueue is not None, "`stdin` not enabled on " + self.Id
+        await self.StdinQueue.put(data)
+
     async def main(self):
-        self._process = await asyncio.create_subprocess_shell(
+        workers = [asyncio.ensure_future(self._worker(i)) for i in range(self.Workers)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _worker(self, index):
+        delay = self.RestartDelay
+        while True:
+            started_at = self.Loop.time()
+            returncode = await self._run_child(index)
+            if returncode in self.OKReturnCodes:
+                return
+
+            # Print error, wait a bit and retry again
+            L.error(
+                "Command {} has exited with return code: {}, restarting in {}s".format(
+                    self.Command, returncode, delay
+                )
+            )
+            self.Counters[index].add("restarts", 1)
+
+            if self.Loop.time() - started_at > self.RestartMaxDelay:
+                # The child was running long enough, start the backoff from scratch
+                delay = self.RestartDelay
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.RestartMaxDelay)
+
+    async def _run_child(self, index):
+        process = await asyncio.create_subprocess_shell(
             self.Command,
-            shell=True,
+            stdin=asyncio.subprocess.PIPE if self.StdinQueue is not None else None,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.DEVNULL,
-            limit=self.Config.get("line_len_limit"),
         )
-        # Check if process is running
-        while self._process.returncode is None:
+        self.Processes[index] = process
+        if index == 0:
+            self._process = process
+
+        feeder = None
+        if self.StdinQueue is not None:
+            feeder = asyncio.ensure_future(self._feed(process))
+
+        try:
+            await self._read(index, process.stdout)
+
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+            raise
+
+        finally:
+            del self.Processes[index]
+            if feeder is not None:
+                feeder.cancel()
+                # The process is not finished, until all its pipes are closed
+                process.stdin.close()
+            await process.wait()
+
+        return process.returncode
+
+    async def _read(self, index, stdout):
+        counter = self.Counters[index]
+        pending = b""
+        # The rest of a too long line is being skipped
+        discarding = False
+        while True:
             await self.Pipeline.ready()
-            event = await self._process.stdout.readline()
-            await self.process(event)
-        # Error message, when process has been terminated
-        if (
-            self._process.returncode not in self.OKReturnCodes
-            and self._process.returncode is not None
-        ):
-            # Print error, wait a bit and retry again
-            L.error(
-                "Command {} has exited with return code: {}".format(
-                    self.Command, self._process.returncode
+            chunk = await stdout.read(self.ChunkSize)
+            if len(chunk) == 0:
+                break
+
+            counter.add("bytes", len(chunk))
+            data = pending + chunk if len(pending) > 0 else chunk
+
+            start = 0
+            if discarding:
+                pos = data.find(b"\n")
+                if pos == -1:
+                    continue
+                start = pos + 1
+                discarding = False
+
+            lines = 0
+            while True:
+                pos = data.find(b"\n", start)
+                if pos == -1:
+                    break
+                await self.process(data[start : pos + 1])
+                start = pos + 1
+                lines += 1
+
+            counter.add("lines", lines)
+
+            pending = data[start:]
+            if len(pending) > self.LineLenLimit:
+                L.warning(
+                    "Line of the command {} exceeds {} bytes, discarded".format(
+                        self.Command, self.LineLenLimit
+                    )
                 )
-            )
-            await asyncio.sleep(5)
+                pending = b""
+                discarding = True
+
+        if len(pending) > 0:
+            # The last line without a terminator
+            counter.add("lines", 1)
+            await self.process(pending)
+
+    async def _feed(self, process):
+        stdin = process.stdin
+        while True:
+            data = await self.StdinQueue.get()
+            try:
+                stdin.write(data)
+                await stdin.drain()
+            except ConnectionError:
+                # The child is gone, let another one take the data
+                try:
+                    self.StdinQueue.put_nowait(data)
+                except asyncio.QueueFull:
+                    L.warning("Input of the command {} dropped".format(self.Command))
+                return
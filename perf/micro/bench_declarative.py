@@ -0,0 +1,50 @@
+import os
+
+import bspump
+import bspump.common
+import bspump.declarative
+
+from harness import benchmark, build_pipeline
+
+#
+
+EVENTS = 50000
+DATADIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+def _declarative_benchmark(app, fname):
+    with open(os.path.join(DATADIR, fname)) as f:
+        declaration = f.read()
+
+    pipeline = build_pipeline(app, bspump.common.DirectSource, bspump.common.NullSink)
+    processor = bspump.declarative.DeclarativeProcessor(app, pipeline, declaration)
+    app.Loop.run_until_complete(processor.initialize())
+
+    actions = ["/Access", "/Communicate", "/Other"]
+    events = [
+        {
+            "protocol": "tcp" if i % 3 else "udp",
+            "action": actions[i % len(actions)],
+            "port": 443 if i % 2 else 80,
+            "bytes.in": i,
+            "bytes.out": 2 * i,
+        }
+        for i in range(EVENTS)
+    ]
+
+    def run():
+        process = processor.process
+        for event in events:
+            process({}, event)
+
+    return run
+
+
+@benchmark("declarative.filter", number=EVENTS)
+def declarative_filter(app):
+    return _declarative_benchmark(app, "filter.yaml")
+
+
+@benchmark("declarative.enrich", number=EVENTS)
+def declarative_enrich(app):
+    return _declarative_benchmark(app, "enrich.yaml")
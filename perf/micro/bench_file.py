@@ -0,0 +1,57 @@
+import atexit
+import os
+import tempfile
+
+import bspump
+import bspump.common
+import bspump.file
+
+from harness import benchmark, build_pipeline
+
+#
+
+LINES = 100000
+
+
+def _write_file(header, line_format):
+    fd, fname = tempfile.mkstemp(prefix="bspump-perf-", suffix=".txt")
+    with os.fdopen(fd, "w") as f:
+        if header is not None:
+            f.write(header + "\n")
+        for i in range(LINES):
+            f.write(line_format.format(i) + "\n")
+    atexit.register(os.unlink, fname)
+    return fname
+
+
+def _file_benchmark(app, source_class, fname):
+    # The source is never started, the file is read directly so that file locking and renaming are not measured
+    pipeline = build_pipeline(app, source_class, bspump.common.NullSink)
+    source = pipeline.Sources[0]
+    source.LinesPerEvent = LINES + 1
+    mode = source.Config["mode"]
+
+    async def run():
+        with open(fname, mode) as f:
+            await source.read(fname, f)
+
+    return run
+
+
+@benchmark("file.line_source", number=LINES)
+def file_line_source(app):
+    fname = _write_file(
+        None, "<133>1 2018-03-24T02:37:01+00:00 machine program {} - Event"
+    )
+    return _file_benchmark(app, bspump.file.FileLineSource, fname)
+
+
+@benchmark("file.csv_source", number=LINES)
+def file_csv_source(app):
+    fname = _write_file("id,country,position", "{0},CZ,{0}.5")
+
+    def source_class(app, pipeline):
+        # The default empty escapechar is rejected by the csv module of recent Python versions
+        return bspump.file.FileCSVSource(app, pipeline, config={"escapechar": "\\"})
+
+    return _file_benchmark(app, source_class, fname)
@@ -0,0 +1,62 @@
+import bspump
+import bspump.cache
+
+from harness import benchmark
+
+#
+
+LOOKUPS = 100000
+KEYS = 1000
+
+
+def _cached_get(cache, backend, key):
+    # The read-through pattern of database lookups, e.g. MySQLLookup.get()
+    try:
+        return cache[key]
+    except KeyError:
+        value = backend.get(key)
+        cache[key] = value
+        return value
+
+
+def _lookup_benchmark(cache, hit_ratio):
+    backend = {"key-{}".format(i): {"value": i} for i in range(KEYS)}
+    hot = int(KEYS * hit_ratio)
+    keys = []
+    for i in range(LOOKUPS):
+        if i % 10 < hit_ratio * 10:
+            keys.append("key-{}".format(i % max(hot, 1)))
+        else:
+            keys.append("key-{}".format(hot + i % (KEYS - hot)))
+
+    def run():
+        cache.clear()
+        for key in keys:
+            _cached_get(cache, backend, key)
+
+    return run
+
+
+@benchmark("lookup.dictionary.get", number=LOOKUPS)
+def lookup_dictionary_get(app):
+    lookup = bspump.DictionaryLookup(app, "BenchDictionaryLookup")
+    lookup.set({"key-{}".format(i): {"value": i} for i in range(KEYS)})
+    keys = ["key-{}".format(i % KEYS) for i in range(LOOKUPS)]
+
+    def run():
+        for key in keys:
+            lookup[key]
+
+    return run
+
+
+@benchmark("lookup.cache.cachedict", number=LOOKUPS)
+def lookup_cache_cachedict(app):
+    return _lookup_benchmark(bspump.cache.CacheDict(), hit_ratio=0.9)
+
+
+@benchmark("lookup.cache.lrucachedict", number=LOOKUPS)
+def lookup_cache_lrucachedict(app):
+    return _lookup_benchmark(
+        bspump.cache.LRUCacheDict(app, max_size=KEYS // 2), hit_ratio=0.9
+    )
@@ -0,0 +1,58 @@
+import time
+
+import bspump.matrix
+
+from harness import benchmark
+
+#
+
+ROWS = 10000
+COLUMNS = 60
+
+
+@benchmark("matrix.named.add_row", number=ROWS)
+def matrix_named_add_row(app):
+    names = ["row-{}".format(i) for i in range(ROWS)]
+
+    def run():
+        # A fresh matrix for every run, so that the rows are really added, not reused
+        matrix = bspump.matrix.NamedMatrix(app, id="BenchNamedMatrix")
+        add_row = matrix.add_row
+        for name in names:
+            add_row(name)
+
+    return run
+
+
+@benchmark("matrix.timewindow.add_row", number=ROWS)
+def matrix_timewindow_add_row(app):
+    names = ["row-{}".format(i) for i in range(ROWS)]
+
+    def run():
+        matrix = bspump.matrix.TimeWindowMatrix(
+            app, resolution=60, columns=COLUMNS, id="BenchTimeWindowMatrix"
+        )
+        add_row = matrix.add_row
+        for name in names:
+            add_row(name)
+
+    return run
+
+
+@benchmark("matrix.timewindow.advance", number=COLUMNS)
+def matrix_timewindow_advance(app):
+    matrix = bspump.matrix.TimeWindowMatrix(
+        app, resolution=60, columns=COLUMNS, id="BenchTimeWindowMatrixAdvance"
+    )
+    for i in range(1000):
+        matrix.add_row("row-{}".format(i))
+
+    now = [time.time()]
+
+    def run():
+        # Advances the window by COLUMNS columns, one at a time
+        for _ in range(COLUMNS):
+            now[0] += 60
+            matrix.advance(now[0])
+
+    return run
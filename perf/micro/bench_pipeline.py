@@ -0,0 +1,149 @@
+import bspump
+import bspump.common
+
+from harness import benchmark, build_pipeline
+
+#
+
+EVENTS = 100000
+
+
+class PassProcessor(bspump.Processor):
+    def process(self, context, event):
+        return event
+
+
+def _event(i):
+    return {"id": i, "protocol": "tcp", "port": 443, "bytes.in": 100, "bytes.out": 200}
+
+
+@benchmark("pipeline.inject.depth_1", number=EVENTS)
+def pipeline_inject_depth_1(app):
+    pipeline = build_pipeline(app, bspump.common.DirectSource, bspump.common.NullSink)
+    events = [_event(i) for i in range(EVENTS)]
+
+    def run():
+        inject = pipeline.inject
+        for event in events:
+            inject(None, event, 0)
+
+    return run
+
+
+@benchmark("pipeline.inject.depth_10", number=EVENTS)
+def pipeline_inject_depth_10(app):
+    pipeline = build_pipeline(
+        app, bspump.common.DirectSource, *([PassProcessor] * 9), bspump.common.NullSink
+    )
+    events = [_event(i) for i in range(EVENTS)]
+
+    def run():
+        inject = pipeline.inject
+        for event in events:
+            inject(None, event, 0)
+
+    return run
+
+
+@benchmark("pipeline.process.async", number=EVENTS)
+def pipeline_process_async(app):
+    pipeline = build_pipeline(app, bspump.common.DirectSource, bspump.common.NullSink)
+    events = [_event(i) for i in range(EVENTS)]
+
+    async def run():
+        process = pipeline.process
+        for event in events:
+            await process(event)
+
+    return run
+
+
+@benchmark("pipeline.width_10", number=EVENTS)
+def pipeline_width_10(app):
+    # Ten independent pipelines fed round-robin, as a pump with many small pipelines does
+    pipelines = [
+        build_pipeline(
+            app, bspump.common.DirectSource, PassProcessor, bspump.common.NullSink
+        )
+        for _ in range(10)
+    ]
+    events = [_event(i) for i in range(EVENTS)]
+
+    def run():
+        injects = [pipeline.inject for pipeline in pipelines]
+        for i, event in enumerate(events):
+            injects[i % 10](None, event, 0)
+
+    return run
+
+
+@benchmark("routing.internal_source", number=EVENTS)
+def routing_internal_source(app):
+    target = build_pipeline(app, bspump.common.InternalSource, bspump.common.NullSink)
+    source = target.Sources[0]
+    # The queue is unbounded so that no backpressure kicks in during the benchmark
+    source.Queue._maxsize = 0
+    source.BackPressureLimit = None
+    events = [_event(i) for i in range(EVENTS)]
+
+    async def run():
+        for event in events:
+            source.put({}, event)
+
+        queue = source.Queue
+        while not queue.empty():
+            context, event = queue.get_nowait()
+            await source.process(event, context={"ancestor": context})
+            queue.task_done()
+
+    return run
+
+
+@benchmark("routing.tee_processor", number=EVENTS)
+def routing_tee_processor(app):
+    target = build_pipeline(app, bspump.common.InternalSource, bspump.common.NullSink)
+    source = target.Sources[0]
+    source.Queue._maxsize = 0
+    source.BackPressureLimit = None
+
+    pipeline = build_pipeline(
+        app,
+        bspump.common.DirectSource,
+        bspump.common.TeeProcessor,
+        bspump.common.NullSink,
+    )
+    pipeline.Processors[0][0].bind(source.locate_address())
+    events = [_event(i) for i in range(EVENTS)]
+
+    def run():
+        inject = pipeline.inject
+        for event in events:
+            inject(None, event, 0)
+
+        # Drop routed events, only the tee and the event copy are measured
+        while not source.Queue.empty():
+            source.Queue.get_nowait()
+
+    return run
+
+
+@benchmark("aggregator.list", number=EVENTS)
+def aggregator_list(app):
+    pipeline = bspump.Pipeline(app, "BenchAggregatorPipeline")
+    # The completion size is never reached, only the aggregation itself is measured
+    aggregator = bspump.common.Aggregator(
+        app,
+        pipeline,
+        aggregation_strategy=bspump.common.ListAggregationStrategy(),
+        config={"completion_size": EVENTS + 1},
+    )
+    events = [_event(i) for i in range(EVENTS)]
+
+    def run():
+        process = aggregator.process
+        for event in events:
+            process({}, event)
+        aggregator.AggregationStrategy.flush()
+        aggregator.CurrentSize = 0
+
+    return run
@@ -0,0 +1,118 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+import bspump
+import bspump.common
+
+from harness import benchmark, build_pipeline, Skip
+
+#
+
+EVENTS = 50000
+SCHEMA = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..",
+    "data",
+    "sample-for-avro-schema.avsc",
+)
+
+
+def _skip_missing(e, *modules):
+    """
+    A missing optional dependency skips the benchmark, any other import failure is an error.
+    """
+    if getattr(e, "name", None) in modules:
+        raise Skip(e)
+    raise e
+
+
+def _event(i):
+    return {"Country": "CZ", "Position": "{}.{}".format(i, i % 90)}
+
+
+def _processor_benchmark(app, processor_class, events):
+    pipeline = build_pipeline(app, bspump.common.DirectSource, bspump.common.NullSink)
+    processor = processor_class(app, pipeline)
+
+    def run():
+        process = processor.process
+        for event in events:
+            process({}, event)
+
+    return run
+
+
+@benchmark("serializer.json.std_dict_to_json", number=EVENTS)
+def serializer_std_dict_to_json(app):
+    events = [_event(i) for i in range(EVENTS)]
+    return _processor_benchmark(app, bspump.common.StdDictToJsonParser, events)
+
+
+@benchmark("serializer.json.dict_to_json_bytes", number=EVENTS)
+def serializer_dict_to_json_bytes(app):
+    events = [_event(i) for i in range(EVENTS)]
+    return _processor_benchmark(app, bspump.common.DictToJsonBytesParser, events)
+
+
+@benchmark("serializer.json.std_json_to_dict", number=EVENTS)
+def serializer_std_json_to_dict(app):
+    events = ['{{"Country": "CZ", "Position": "{}"}}'.format(i) for i in range(EVENTS)]
+    return _processor_benchmark(app, bspump.common.StdJsonToDictParser, events)
+
+
+@benchmark("serializer.avro", number=EVENTS)
+def serializer_avro(app):
+    try:
+        import bspump.avro
+    except ImportError as e:
+        _skip_missing(e, "fastavro")
+
+    pipeline = bspump.Pipeline(app, "BenchAvroPipeline")
+    serializer = bspump.avro.AvroSerializer(
+        app, pipeline, config={"schema_file": SCHEMA, "max_block_size": 1000}
+    )
+    pipeline.build(
+        bspump.common.DirectSource(app, pipeline),
+        serializer,
+        bspump.common.NullSink(app, pipeline),
+    )
+    pipeline._evaluate_ready()
+    events = [_event(i) for i in range(EVENTS)]
+
+    async def run():
+        generate = serializer.generate
+        for event in events:
+            await generate({}, event, 1)
+
+    return run
+
+
+@benchmark("serializer.parquet", number=EVENTS)
+def serializer_parquet(app):
+    try:
+        import bspump.parquet
+    except ImportError as e:
+        _skip_missing(e, "pyarrow", "pandas")
+
+    tmpdir = tempfile.mkdtemp(prefix="bspump-perf-")
+    atexit.register(shutil.rmtree, tmpdir, ignore_errors=True)
+    pipeline = build_pipeline(app, bspump.common.DirectSource, bspump.common.NullSink)
+    sink = bspump.parquet.ParquetSink(
+        app,
+        pipeline,
+        config={
+            "rows_in_chunk": 10000,
+            "rows_per_file": EVENTS,
+            "file_name_template": os.path.join(tmpdir, "sink{index}.parquet"),
+        },
+    )
+    events = [_event(i) for i in range(EVENTS)]
+
+    def run():
+        process = sink.process
+        for event in events:
+            process({}, dict(event))
+
+    return run
@@ -0,0 +1,163 @@
+import asyncio
+import fnmatch
+import platform
+import statistics
+import sys
+import time
+
+#
+
+Benchmarks = []
+
+#
+
+
+class benchmark(object):
+    """
+    Registers a benchmark.
+
+    The decorated function receives the application object, prepares the fixture
+    and returns a function (or a coroutine function) that performs `number` operations.
+    Only the returned function is timed.
+
+    .. code:: python
+
+            @benchmark("cache.dict.get", number=100000)
+            def cache_dict_get(app):
+                    cache = bspump.cache.CacheDict({"key": "value"})
+
+                    def run():
+                            for _ in range(100000):
+                                    cache.get("key")
+
+                    return run
+
+    """
+
+    def __init__(self, name, number):
+        self.Name = name
+        self.Number = number
+
+    def __call__(self, setup):
+        Benchmarks.append((self.Name, self.Number, setup))
+        return setup
+
+
+class Skip(Exception):
+    """
+    Raise from a benchmark setup when an optional dependency is not available.
+    """
+
+    pass
+
+
+def _timeit(app, fn):
+    t0 = time.perf_counter()
+    if asyncio.iscoroutinefunction(fn):
+        app.Loop.run_until_complete(fn())
+    else:
+        fn()
+    return time.perf_counter() - t0
+
+
+def run_benchmarks(app, pattern="*", repeat=5):
+    """
+    Runs all registered benchmarks with a name matching the `pattern` and returns results as a dictionary.
+    Every benchmark is warmed up by one untimed run and then timed `repeat` times.
+    """
+    results = {}
+    for name, number, setup in Benchmarks:
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+
+        try:
+            fn = setup(app)
+            _timeit(app, fn)  # Warm up
+            timings = [_timeit(app, fn) for _ in range(repeat)]
+        except Skip as e:
+            results[name] = {"skipped": str(e)}
+            print("{:<48} skipped: {}".format(name, e), file=sys.stderr)
+            continue
+        except Exception as e:
+            results[name] = {"error": "{}: {}".format(e.__class__.__name__, e)}
+            print(
+                "{:<48} error: {}".format(name, results[name]["error"]), file=sys.stderr
+            )
+            continue
+
+        best = min(timings)
+        results[name] = {
+            "number": number,
+            "best": best,
+            "median": statistics.median(timings),
+            "ops_per_sec": number / best if best > 0 else None,
+        }
+        print(
+            "{:<48} {:>14,.0f} ops/s".format(name, results[name]["ops_per_sec"] or 0),
+            file=sys.stderr,
+        )
+
+    return results
+
+
+def environment():
+    import bspump
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "bspump": bspump.__version__,
+        "timestamp": time.time(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Compares `results` with the `baseline` results.
+    Returns a list of (name, baseline ops/s, current ops/s, ratio) of benchmarks that
+    are slower than the baseline by more than `threshold` (e.g. 0.1 for 10 %).
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current.get("ops_per_sec") is None or previous.get("ops_per_sec") is None:
+            continue
+
+        ratio = current["ops_per_sec"] / previous["ops_per_sec"]
+        if ratio < 1.0 - threshold:
+            regressions.append(
+                (name, previous["ops_per_sec"], current["ops_per_sec"], ratio)
+            )
+
+    return regressions
+
+
+_pipeline_counter = 0
+
+
+def build_pipeline(app, source_class, *processor_classes, config=None):
+    """
+    Builds a ready :meth:`Pipeline <bspump.Pipeline()>` with a unique id from a source class and processor classes
+    (or any callables with the `(app, pipeline)` signature)
+    and registers it at the PumpService, so that routers can locate it.
+    Sources are not started, benchmarks feed the pipeline directly.
+    """
+    import bspump
+
+    global _pipeline_counter
+    _pipeline_counter += 1
+
+    pipeline = bspump.Pipeline(
+        app, "BenchPipeline{}".format(_pipeline_counter), config=config
+    )
+    pipeline.build(
+        source_class(app, pipeline),
+        *[processor_class(app, pipeline) for processor_class in processor_classes],
+    )
+    app.get_service("bspump.PumpService").add_pipeline(pipeline)
+    pipeline._evaluate_ready()
+    return pipeline
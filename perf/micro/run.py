@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bspump  # noqa: E402
+
+import harness  # noqa: E402
+
+# Importing benchmark modules registers their benchmarks
+import bench_pipeline  # noqa: E402,F401
+import bench_declarative  # noqa: E402,F401
+import bench_matrix  # noqa: E402,F401
+import bench_lookup  # noqa: E402,F401
+import bench_serializer  # noqa: E402,F401
+import bench_file  # noqa: E402,F401
+
+###
+
+L = logging.getLogger(__name__)
+
+###
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Runs BSPump microbenchmarks and compares them against a stored baseline."
+    )
+    parser.add_argument(
+        "-k", "--filter", default="*", help="glob of benchmark names to run"
+    )
+    parser.add_argument(
+        "-r", "--repeat", type=int, default=5, help="timed runs per benchmark"
+    )
+    parser.add_argument("-o", "--output", help="write JSON results into this file")
+    parser.add_argument(
+        "-b", "--baseline", default=DEFAULT_BASELINE, help="baseline JSON file"
+    )
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative slowdown that is reported as a regression (default 0.1)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline",
+    )
+    parser.add_argument(
+        "-l", "--list", action="store_true", help="list benchmarks and exit"
+    )
+    args = parser.parse_args()
+
+    if args.list:
+        for name, number, _ in harness.Benchmarks:
+            print(name)
+        return 0
+
+    # Keep the log quiet, benchmarks emit a lot of pipeline activity
+    logging.disable(logging.WARNING)
+
+    app = bspump.BSPumpApplication(args=[])
+    report = {
+        "environment": harness.environment(),
+        "results": harness.run_benchmarks(app, pattern=args.filter, repeat=args.repeat),
+    }
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            f.write(text)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(
+            "No baseline found at '{}', comparison skipped.".format(args.baseline),
+            file=sys.stderr,
+        )
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = harness.compare(
+        report["results"], baseline["results"], args.threshold
+    )
+    for name, previous, current, ratio in regressions:
+        print(
+            "REGRESSION {:<40} {:>14,.0f} -> {:>14,.0f} ops/s ({:+.1%})".format(
+                name, previous, current, ratio - 1.0
+            ),
+            file=sys.stderr,
+        )
+
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
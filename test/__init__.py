@@ -3,9 +3,18 @@ from .common import *
 from .crypto import *
 from .file import *
 from .filter import *
+from .http import *
 from .kafka import *
 from .matrix import *
 from .declarative import *
 from .integrity import *
+from .ipc import *
 from .test_config_defaults import *
 from .test_metrics_service import *
+from .test_metrics import *
+from .test_scheduler import *
+from .test_pubsub import *
+from .mqtt import *
+from .subprocess import *
+from .lookup import *
+from .anomaly import *
@@ -4,3 +4,5 @@ from .test_latch import *
 from .test_timedriftanalyzer import *
 from .test_timewindowanalyzer import *
 from .test_sessionanalyzer import *
+from .test_sessionaccumulator import *
+from .test_threshold import *
@@ -18,3 +18,23 @@ class TestGeoAnalyzer(bspump.unittest.ProcessorTestCase):
         )
 
         # TODO test self.Pipeline.Processor.Matrix
+
+    def test_geo_analyzer_batch(self):
+        events = [
+            (None, {"lat": 50, "lon": 10}),
+            (None, {"lat": 50, "lon": 10}),
+            (None, {"lat": 80, "lon": 10}),
+            (None, {"lon": 10}),
+            (None, {"lat": 45, "lon": 30}),
+        ]
+        self.set_up_processor(
+            bspump.analyzer.GeoAnalyzer, config={"batch_size": 2, "batch_timeout": 60}
+        )
+
+        output = self.execute(events)
+        self.assertEqual(len(output), 5)
+
+        matrix = self.Pipeline.Processor.GeoMatrix
+        self.assertEqual(matrix.Array[matrix.project_equirectangular(50, 10)], 2)
+        self.assertEqual(matrix.Array[matrix.project_equirectangular(45, 30)], 1)
+        self.assertEqual(matrix.Array.sum(), 3)
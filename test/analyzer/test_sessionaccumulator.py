@@ -0,0 +1,28 @@
+import bspump.analyzer
+import bspump.unittest
+
+
+class TestSessionAccumulator(bspump.unittest.ProcessorTestCase):
+    def test_session_accumulator(self):
+        events = [
+            (None, {"id": "a", "count": 1, "name": "first"}),
+            (None, {"id": "b", "count": 2}),
+            (None, {"id": "a", "count": 3, "other": True}),
+        ]
+        self.set_up_processor(
+            bspump.analyzer.SessionAccumulator,
+            dtype=[("count", "i8"), ("name", "U10")],
+            config={"batch_size": 2},
+        )
+
+        output = self.execute(events)
+
+        self.assertEqual(
+            [event for context, event in output], [event for context, event in events]
+        )
+
+        sessions = self.Pipeline.Processor.Sessions
+        a = sessions.decode_row(sessions.get_row_index("a"))
+        self.assertEqual((a["count"], a["name"]), (3, "first"))
+        b = sessions.decode_row(sessions.get_row_index("b"))
+        self.assertEqual(b["count"], 2)
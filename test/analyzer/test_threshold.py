@@ -0,0 +1,161 @@
+import bspump.analyzer
+import bspump.unittest
+
+
+class RecordingThresholdAnalyzer(bspump.analyzer.ThresholdAnalyzer):
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id=id, config=config)
+        self.Alarms = []
+
+    def alarm(self, x, y, count, index):
+        self.Alarms.append((x, y, count, index))
+
+
+class TestThresholdAnalyzer(bspump.unittest.ProcessorTestCase):
+    def set_up(self, **config):
+        config.update(
+            {
+                "event_attribute": "server",
+                "event_value": "load",
+                "upper_bound": 10,
+                "symptom_occurrence": 3,
+            }
+        )
+        self.set_up_processor(RecordingThresholdAnalyzer, config=config)
+        self.Analyzer = self.Pipeline.Processor
+        self.Matrix = self.Analyzer.TimeWindow
+
+    def evaluate(self, server, column, load):
+        timestamp = self.Matrix.TimeConfig.get_end() + (column + 0.5) * 60
+        self.Analyzer.evaluate(
+            None, {"server": server, "@timestamp": timestamp, "load": load}
+        )
+
+    def test_incremental(self):
+        self.set_up(incremental=True)
+        self.evaluate("a", 0, 1)
+        # The row is warmed up after the time window advances
+        self.Matrix.add_column()
+        self.evaluate("b", 1, 50)
+        self.evaluate("b", 2, 50)
+        self.evaluate("b", 3, 50)
+
+        self.evaluate("a", 1, 20)
+        self.evaluate("a", 2, 30)
+        self.Analyzer.analyze()
+        self.assertEqual(self.Analyzer.Alarms, [])
+
+        # The run continues after the shift of the time window
+        self.Matrix.add_column()
+        self.evaluate("a", 2, 40)
+        self.Analyzer.analyze()
+        self.assertEqual(len(self.Analyzer.Alarms), 1)
+        x, y, counts, indexes = self.Analyzer.Alarms[0]
+        a = self.Matrix.get_row_index("a")
+        self.assertEqual(counts.tolist(), [3])
+        self.assertEqual(x[indexes].tolist(), [a])
+        self.assertEqual(y[indexes].tolist(), [2])
+
+        # A value within bounds resets the run
+        self.Analyzer.Alarms = []
+        self.evaluate("a", 3, 5)
+        self.evaluate("a", 4, 50)
+        self.evaluate("a", 5, 50)
+        self.Analyzer.analyze()
+        self.assertEqual(self.Analyzer.Alarms, [])
+        self.assertEqual(self.Analyzer.Runs[a], 2)
+
+        # Nothing written, nothing checked
+        self.Analyzer.analyze()
+        self.assertEqual(self.Analyzer.Alarms, [])
+
+    def test_full_scan(self):
+        self.set_up()
+        self.evaluate("a", 0, 1)
+        self.evaluate("b", 0, 1)
+        self.Matrix.add_column()
+        for column in range(1, 4):
+            self.evaluate("a", column, 20)
+        self.evaluate("b", 1, 20)
+        self.Analyzer.analyze()
+
+        self.assertEqual(len(self.Analyzer.Alarms), 1)
+        x, y, count, index = self.Analyzer.Alarms[0]
+        self.assertEqual(count, 3)
+        self.assertEqual(x[index], self.Matrix.get_row_index("a"))
+
+    def test_incremental_rewritten_cell(self):
+        self.set_up(incremental=True)
+        self.evaluate("a", 0, 1)
+        self.Matrix.add_column()
+
+        # A cell written again is not counted again
+        for _ in range(3):
+            self.evaluate("a", 1, 50)
+            self.Analyzer.analyze()
+        self.assertEqual(self.Analyzer.Alarms, [])
+        self.assertEqual(self.Analyzer.Runs[self.Matrix.get_row_index("a")], 1)
+
+    def test_incremental_rewritten_last_column(self):
+        self.set_up(incremental=True)
+        self.evaluate("a", 0, 1)
+        self.Matrix.add_column()
+        a = self.Matrix.get_row_index("a")
+
+        self.evaluate("a", 1, 50)
+        self.evaluate("a", 2, 50)
+        self.evaluate("a", 3, 5)
+        self.Analyzer.analyze()
+        self.assertEqual(self.Analyzer.Runs[a], 0)
+
+        # The value written again to the last counted column replaces its contribution to the run
+        self.evaluate("a", 3, 50)
+        self.Analyzer.analyze()
+        self.assertEqual(self.Analyzer.Runs[a], 3)
+        self.assertEqual(len(self.Analyzer.Alarms), 1)
+        x, y, counts, indexes = self.Analyzer.Alarms[0]
+        self.assertEqual(counts.tolist(), [3])
+        self.assertEqual(y[indexes].tolist(), [3])
+
+        self.Analyzer.Alarms = []
+        self.evaluate("a", 3, 5)
+        self.evaluate("a", 4, 50)
+        self.Analyzer.analyze()
+        self.assertEqual(self.Analyzer.Alarms, [])
+        self.assertEqual(self.Analyzer.Runs[a], 1)
+
+    def test_incremental_closed_row(self):
+        self.set_up(incremental=True)
+        self.Matrix.MaxClosedRowsCapacity = 2
+        self.evaluate("a", 0, 1)
+        self.Matrix.add_column()
+        self.evaluate("a", 1, 50)
+        self.evaluate("a", 2, 50)
+        self.Analyzer.analyze()
+        a = self.Matrix.get_row_index("a")
+        self.assertEqual(self.Analyzer.Runs[a], 2)
+
+        # The run of a closed row is dropped, so are its cells that were not analyzed yet
+        self.evaluate("a", 3, 50)
+        self.Matrix.close_row("a")
+        self.assertEqual(self.Analyzer.Runs[a], 0)
+        self.assertEqual(self.Matrix.add_row("b"), a)
+        self.Matrix.WarmingUpCount.WUC[a] = 0
+        self.evaluate("b", 4, 50)
+        self.Analyzer.analyze()
+        self.assertEqual(self.Analyzer.Alarms, [])
+        self.assertEqual(self.Analyzer.Runs[a], 1)
+
+    def test_incremental_flush(self):
+        self.set_up(incremental=True)
+        self.evaluate("a", 0, 1)
+        self.evaluate("b", 0, 1)
+        self.Matrix.add_column()
+        self.evaluate("b", 1, 50)
+
+        # Cells written before the flush are not applied to rows after it
+        self.Matrix.close_row("a")
+        self.Matrix.flush()
+        self.assertEqual(self.Analyzer.WrittenRows, [])
+        self.Analyzer.analyze()
+        self.assertEqual(self.Analyzer.Runs.tolist(), [0] * self.Matrix.Array.shape[0])
@@ -1,3 +1,5 @@
+import numpy as np
+
 import bspump.analyzer
 import bspump.unittest
 
@@ -20,3 +22,139 @@ class TestTimeWindowAnalyzer(bspump.unittest.ProcessorTestCase):
         )
 
         # TODO test self.Pipeline.Processor.Matrix
+
+
+class CountingTimeWindowAnalyzer(bspump.analyzer.TimeWindowAnalyzer):
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, columns=5, resolution=10, id=id, config=config)
+        self.Analyses = []
+
+    def evaluate(self, context, event):
+        row = self.TimeWindow.get_row_index(event["key"])
+        if row is None:
+            row = self.TimeWindow.add_row(event["key"])
+        column = self.TimeWindow.get_column(event["@timestamp"])
+        if column is not None:
+            # New columns are empty (NaN)
+            value = np.nan_to_num(self.TimeWindow.Array[row, column])
+            self.TimeWindow.Array[row, column] = value + 1
+
+    def analyze(self):
+        self.Analyses.append(self.TimeWindow.TimeConfig.get_start())
+
+
+class FakeInternalSource(object):
+    def __init__(self):
+        self.Events = []
+
+    def put(self, context, event, copy_event=False):
+        self.Events.append(event)
+
+
+class TestEventTimeWindowAnalyzer(bspump.unittest.ProcessorTestCase):
+    def set_up(self, **config):
+        config.update(
+            {
+                "event_time": True,
+                "source_attr": "source",
+                "analyze_period": 20,
+                "late_events_source": "LatePipeline.*InternalSource",
+            }
+        )
+        self.set_up_processor(CountingTimeWindowAnalyzer, config=config)
+        self.Analyzer = self.Pipeline.Processor
+        self.Matrix = self.Analyzer.TimeWindow
+        self.Analyzer.LateEventsSource = FakeInternalSource()
+
+    def process(self, events):
+        for timestamp, source in events:
+            self.Analyzer.process(
+                None, {"@timestamp": timestamp, "source": source, "key": "k"}
+            )
+
+    def test_replay(self):
+        self.set_up(allowed_lateness=15)
+        # Historical data far from the current time
+        self.process(
+            [
+                (1000, "a"),
+                (1005, "b"),
+                (1012, "a"),
+                (1008, "b"),
+                (1031, "a"),
+                (1015, "b"),
+                (1003, "a"),
+                (1044, "b"),
+            ]
+        )
+
+        # The window follows the events, not the clock
+        self.assertEqual(self.Matrix.TimeConfig.get_start(), 1050)
+        self.assertEqual(self.Matrix.TimeConfig.get_end(), 1000)
+        self.assertEqual(np.nan_to_num(self.Matrix.Array[0]).tolist(), [4, 2, 0, 1, 1])
+        # Analyzed every 20 seconds of the event time
+        self.assertEqual(self.Analyzer.Analyses, [1020, 1040])
+
+        # Events older than the watermark (1031 - 15) go to the side output
+        self.process([(1010, "a"), (1017, "b")])
+        self.assertEqual(
+            [event["@timestamp"] for event in self.Analyzer.LateEventsSource.Events],
+            [1010],
+        )
+        self.assertEqual(np.nan_to_num(self.Matrix.Array[0]).tolist(), [4, 3, 0, 1, 1])
+
+    def test_slowest_source(self):
+        self.set_up()
+        self.process([(1000, "a"), (1500, "b")])
+
+        # Source "a" holds the window back, its next events are not lost
+        self.assertEqual(self.Matrix.TimeConfig.get_end(), 990)
+        self.process([(1001, "a")])
+        self.assertEqual(self.Analyzer.LateEventsSource.Events, [])
+        self.assertEqual(self.Matrix.Array[0, 1], 2)
+        # The event of the faster source waits for the window
+        self.assertEqual(len(self.Analyzer.Pending), 1)
+        self.process([(1480, "a")])
+        self.assertEqual(len(self.Analyzer.Pending), 0)
+        self.assertEqual(np.nansum(self.Matrix.Array[0]), 2)
+
+    def test_pipeline(self):
+        self.set_up()
+        output = self.execute(
+            [
+                (None, {"@timestamp": 1000, "source": "a", "key": "k"}),
+                (None, {"@timestamp": 1500, "source": "b", "key": "k"}),
+            ]
+        )
+        self.assertEqual(len(output), 2)
+
+        # Pending events are evaluated when the application stops
+        self.assertEqual(len(self.Analyzer.Pending), 0)
+        self.assertEqual(self.Matrix.TimeConfig.get_start(), 1510)
+        self.assertEqual(np.nansum(self.Matrix.Array[0]), 1)
+
+
+class TestWatermark(bspump.unittest.TestCase):
+    def test_watermark(self):
+        watermark = bspump.analyzer.Watermark(allowed_lateness=30)
+        self.assertIsNone(watermark.get())
+        self.assertFalse(watermark.is_late(0))
+
+        watermark.update("a", 1000)
+        self.assertEqual(watermark.update("b", 990), 960)
+        self.assertEqual(watermark.update("b", 900), 960)
+        self.assertTrue(watermark.is_late(950))
+        self.assertFalse(watermark.is_late(960))
+        self.assertEqual(watermark.MaxTimestamp, 1000)
+
+    def test_idle_source(self):
+        watermark = bspump.analyzer.Watermark(idle_timeout=60)
+        watermark.update("a", 1000)
+        watermark.update("b", 500)
+        self.assertEqual(watermark.get(), 500)
+
+        watermark.Sources["b"][1] -= 120
+        self.assertEqual(watermark.get(), 1000)
+        # All sources idle
+        watermark.Sources["a"][1] -= 120
+        self.assertEqual(watermark.get(), 500)
@@ -0,0 +1,282 @@
+from unittest.mock import MagicMock
+import math
+import time
+
+import orjson
+
+import bspump.anomaly
+import bspump.elasticsearch.data_feeder
+import bspump.unittest
+
+
+class FakeResponse(object):
+    def __init__(self, body):
+        self.status = 200
+        self.Body = body
+
+    async def json(self):
+        return self.Body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+
+class FakeElasticSearchConnection(object):
+    def __init__(self, hits):
+        self.Hits = hits
+        self.Requests = []
+        self.Bulks = []
+        self.Bulk = None
+        self.BulkErrors = False
+        self.InsertMetric = MagicMock()
+        self.FailLogMaxSize = 20
+        self.FilterPath = "errors,took,items.*.error"
+
+    def get_url(self):
+        return "http://localhost:9200/"
+
+    def get_session(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def request(self, method, url, json=None, headers=None):
+        self.Requests.append((method, url, dict(json or {})))
+        if url.endswith("_pit?keep_alive=1m") or method == "DELETE":
+            return FakeResponse({"id": "pit"})
+
+        start = 0
+        if "search_after" in json:
+            start = json["search_after"][0]
+        hits = self.Hits[start : start + json["size"]]
+        return FakeResponse({"hits": {"hits": hits}})
+
+    async def post(self, url, data=None, headers=None, timeout=None):
+        return FakeResponse(
+            {"errors": self.BulkErrors, "items": [{"index": {"error": "failed"}}]}
+        )
+
+    def consume(self, index, data_feeder_generator, bulk_class=None):
+        if self.Bulk is None:
+            self.Bulk = bulk_class(self, index, 10**6)
+        self.Bulk.consume(data_feeder_generator)
+        header, document = list(data_feeder_generator)
+        self.Bulks.append((index, orjson.loads(header), orjson.loads(document)))
+
+    async def upload(self):
+        bulk = self.Bulk
+        self.Bulk = None
+        return await bulk.upload(self.get_url(), self, 10)
+
+
+class TestOpenAnomalies(bspump.unittest.TestCase):
+    def test_due(self):
+        anomalies = bspump.anomaly.storage.OpenAnomalies()
+        anomalies["a"] = {}
+        anomalies["b"] = {}
+        self.assertEqual(anomalies.due(0), {"a", "b"})
+        self.assertEqual(anomalies.due(0), set())
+
+        anomalies.schedule("a", 100)
+        anomalies.schedule("b", None)
+        anomalies["c"] = {}
+        anomalies.schedule("c", math.inf)
+        self.assertEqual(anomalies.due(50), {"b"})
+        self.assertEqual(anomalies.due(100), {"a"})
+
+        # Rescheduled and removed anomalies are not due at the old deadline
+        anomalies.schedule("a", 200)
+        anomalies.schedule("a", 300)
+        anomalies.touch("c")
+        del anomalies["b"]
+        self.assertEqual(anomalies.due(250), {"c"})
+        self.assertEqual(anomalies.due(300), {"a"})
+
+
+class TestAnomalyStorage(bspump.unittest.TestCase):
+    def hit(self, i, timestamp):
+        return {
+            "_id": "anomaly{}".format(i),
+            "_source": {
+                "@timestamp": timestamp * 1000,
+                "type": "default",
+                "status": "open",
+                "symptoms": [{"@timestamp": timestamp}],
+            },
+            "sort": [i + 1],
+        }
+
+    def test_load_flush(self):
+        now = int(time.time())
+        hits = [self.hit(i, now - 100) for i in range(25)]
+        hits.append(dict(self.hit(25, now), _id="b_backup"))
+        connection = FakeElasticSearchConnection(hits)
+        storage = bspump.anomaly.AnomalyStorage(
+            self.App, connection, config={"load_page_size": 10}
+        )
+        self.App.Loop.run_until_complete(storage.LoadTasks[0])
+
+        self.assertEqual(len(storage["open"]), 25)
+        self.assertEqual(storage["open"]["anomaly3"]["@timestamp"], now - 100)
+        searches = [r for r in connection.Requests if r[1].endswith("/_search")]
+        self.assertEqual(len(searches), 3)
+        self.assertEqual(searches[1][2]["search_after"], [10])
+        self.assertEqual(connection.Requests[-1][0], "DELETE")
+
+        # Loaded anomalies are persisted already, they are evaluated but not written
+        self.assertTrue(storage["open"]["anomaly3"].Persisted)
+        self.App.Loop.run_until_complete(storage.flush("test"))
+        self.assertEqual(len(connection.Bulks), 0)
+
+        # Nothing is due until a symptom closes an anomaly
+        self.App.Loop.run_until_complete(storage.flush("test"))
+        self.assertEqual(len(connection.Bulks), 0)
+
+        storage["open"]["anomaly7"].add_symptom({"@timestamp": now, "status": "closed"})
+        storage["open"].touch("anomaly7")
+        self.App.Loop.run_until_complete(storage.flush("test"))
+        self.assertEqual(len(connection.Bulks), 1)
+        self.assertEqual(connection.Bulks[0][0], "bs_anomaly")
+        # Only changed fields are updated
+        self.assertEqual(connection.Bulks[-1][1], {"update": {"_id": "anomaly7"}})
+        document = connection.Bulks[-1][2]["doc"]
+        self.assertEqual(document["status"], "closed")
+        self.assertEqual(document["symptoms_count"], 2)
+        self.assertEqual(len(document["symptoms"]), 2)
+        self.assertNotIn("type", document)
+        self.assertNotIn("@timestamp", document)
+        self.assertNotIn("anomaly7", storage["open"])
+        self.assertIn("anomaly7", storage["closed"])
+
+    def test_persisted_after_bulk(self):
+        now = int(time.time())
+        connection = FakeElasticSearchConnection([])
+        storage = bspump.anomaly.AnomalyStorage(self.App, connection)
+        self.App.Loop.run_until_complete(storage.LoadTasks[0])
+
+        anomaly = bspump.anomaly.GeneralAnomaly()
+        anomaly["@timestamp"] = now
+        anomaly["type"] = "default"
+        anomaly["status"] = "open"
+        anomaly.add_symptom({"@timestamp": now})
+        storage["open"]["a"] = anomaly
+
+        # The anomaly is indexed as a whole until ElasticSearch accepts it
+        self.App.Loop.run_until_complete(storage.flush("test"))
+        self.assertFalse(anomaly.Persisted)
+        storage["open"].touch("a")
+        self.App.Loop.run_until_complete(storage.flush("test"))
+        self.assertEqual(
+            [header for _, header, _ in connection.Bulks],
+            [{"index": {"_id": "a"}}, {"index": {"_id": "a"}}],
+        )
+        self.assertEqual(connection.Bulks[-1][2]["@timestamp"], now * 1000)
+
+        # A failed document is indexed again
+        connection.BulkErrors = True
+        self.assertTrue(self.App.Loop.run_until_complete(connection.upload()))
+        self.assertFalse(anomaly.Persisted)
+
+        # ... on the next flush, even without a change
+        bulks = len(connection.Bulks)
+        self.App.Loop.run_until_complete(storage.flush("test"))
+        self.assertEqual(len(connection.Bulks), bulks + 1)
+        self.assertEqual(connection.Bulks[-1][1], {"index": {"_id": "a"}})
+        connection.BulkErrors = False
+        self.App.Loop.run_until_complete(connection.upload())
+        self.assertTrue(anomaly.Persisted)
+
+        anomaly.add_symptom({"@timestamp": now + 2})
+        storage["open"].touch("a")
+        self.App.Loop.run_until_complete(storage.flush("test"))
+        self.assertEqual(connection.Bulks[-1][1], {"update": {"_id": "a"}})
+
+    def test_closed_rewritten(self):
+        now = int(time.time())
+        connection = FakeElasticSearchConnection([])
+        storage = bspump.anomaly.AnomalyStorage(self.App, connection)
+        self.App.Loop.run_until_complete(storage.LoadTasks[0])
+        # Closed anomalies are due for removal right after they are written
+        storage.ClosedAnomalyLongevity = -10
+
+        anomaly = bspump.anomaly.GeneralAnomaly()
+        anomaly["@timestamp"] = now
+        anomaly["type"] = "default"
+        anomaly["status"] = "open"
+        anomaly.add_symptom({"@timestamp": now})
+        anomaly.add_symptom({"@timestamp": now, "status": "closed"})
+        storage["open"]["a"] = anomaly
+        self.App.Loop.run_until_complete(storage.flush("test"))
+        self.assertIn("a", storage["closed"])
+
+        # Other documents may share the bulk
+        connection.Bulk.consume(
+            bspump.elasticsearch.data_feeder.data_feeder_index({"x": 1}, "b")
+        )
+
+        # The failed closed anomaly is kept and written again
+        connection.BulkErrors = True
+        self.App.Loop.run_until_complete(connection.upload())
+        self.assertFalse(anomaly.Persisted)
+        self.App.Loop.run_until_complete(storage.flush("test"))
+        self.assertIn("a", storage["closed"])
+        self.assertEqual(connection.Bulks[-1][1], {"index": {"_id": "a"}})
+
+        connection.BulkErrors = False
+        self.App.Loop.run_until_complete(connection.upload())
+        self.assertTrue(anomaly.Persisted)
+        bulks = len(connection.Bulks)
+        self.App.Loop.run_until_complete(storage.flush("test"))
+        self.assertNotIn("a", storage["closed"])
+        self.assertEqual(len(connection.Bulks), bulks)
+
+
+class TestGeneralAnomaly(bspump.unittest.TestCase):
+    def test_next_tick(self):
+        anomaly = bspump.anomaly.GeneralAnomaly()
+        anomaly["type"] = "default"
+        anomaly["symptoms"] = [{"@timestamp": 100}]
+        self.assertEqual(anomaly.next_tick(100), math.inf)
+
+        class TimedAnomaly(bspump.anomaly.GeneralAnomaly):
+            CloseRules = {"default": "60"}
+
+        anomaly = TimedAnomaly()
+        anomaly["type"] = "default"
+        anomaly["symptoms"] = [{"@timestamp": 100}]
+        self.assertEqual(anomaly.next_tick(100), 160)
+        anomaly.add_symptom({"@timestamp": 130})
+        self.assertEqual(anomaly.next_tick(130), 190)
+
+    def test_symptoms(self):
+        anomaly = bspump.anomaly.GeneralAnomaly()
+        self.assertFalse(hasattr(anomaly, "__dict__"))
+        anomaly["@timestamp"] = 10
+        anomaly["type"] = "default"
+        for timestamp in range(10, 20):
+            anomaly.add_symptom({"@timestamp": timestamp}, max_symptoms=3)
+        anomaly.add_symptom({"@timestamp": 5, "status": "closed"}, max_symptoms=3)
+
+        self.assertEqual(
+            [symptom["@timestamp"] for symptom in anomaly["symptoms"]], [18, 19, 5]
+        )
+        self.assertEqual(anomaly["symptoms_count"], 11)
+        self.assertEqual(anomaly["ts_first_symptom"], 5)
+        self.assertEqual(anomaly["ts_last_symptom"], 19)
+        self.assertEqual(anomaly["last_symptom_status"], "open")
+
+        document = anomaly.to_document()
+        self.assertEqual(len(document["symptoms"]), 3)
+        self.assertEqual(anomaly.to_document(changes_only=True), {})
+        anomaly.close(30)
+        self.assertEqual(
+            anomaly.to_document(changes_only=True),
+            {"ts_end": 30, "D": 20, "status": "closed"},
+        )
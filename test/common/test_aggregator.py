@@ -1,3 +1,5 @@
+import asyncio
+
 import bspump.unittest
 from bspump.common import (
     Aggregator,
@@ -110,3 +112,20 @@ class TestAggregator(bspump.unittest.ProcessorTestCase):
         self.assertEqual(1, len(output))
 
         self.assertEqual(({}, "one;two;three"), output[0])
+
+    def test_aggregator_completion_timeout(self):
+        self.set_up_processor(
+            Aggregator, config={"completion_size": "10", "completion_timeout": "0.05"}
+        )
+        aggregator = self.Pipeline.Processor
+
+        aggregator.process({}, {"message": "one"})
+        aggregator.process({}, {"message": "two"})
+        self.assertIsNotNone(aggregator.Deadline)
+        self.assertFalse(aggregator.AggregationStrategy.is_empty())
+
+        self.App.Loop.run_until_complete(asyncio.sleep(0.1))
+
+        self.assertIsNone(aggregator.Deadline)
+        self.assertEqual(0, aggregator.CurrentSize)
+        self.assertTrue(aggregator.AggregationStrategy.is_empty())
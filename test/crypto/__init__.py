@@ -1,2 +1,3 @@
 from .test_hashing import *
 from .test_aes import *
+from .test_batch import *
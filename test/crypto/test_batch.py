@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+
+import bspump
+import bspump.crypto
+import bspump.unittest
+
+
+class ListSink(bspump.Sink):
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id=id, config=config)
+        self.Output = []
+
+    def process(self, context, event):
+        self.Output.append((context, event))
+
+
+class BatchProcessorTestCase(bspump.unittest.TestCase):
+    def run_batch(self, processor_class, events, config=None):
+        config = dict(config or {})
+        config.setdefault("batch_size", 10)
+        config.setdefault("workers", 3)
+        config.setdefault("min_chunk_size", 2)
+
+        pipeline = bspump.Pipeline(self.App, "BatchPipeline")
+        processor = processor_class(self.App, pipeline, config=config)
+        sink = ListSink(self.App, pipeline)
+        pipeline.build(
+            bspump.unittest.UnitTestSource(self.App, pipeline), processor, sink
+        )
+        pipeline._evaluate_ready()
+
+        async def run():
+            for event in events:
+                processor.process({}, event)
+            processor.flush()
+            await asyncio.wait([processor.PendingBlock])
+
+        self.App.Loop.run_until_complete(run())
+        return sink.Output
+
+
+class TestAESBatchProcessor(BatchProcessorTestCase):
+    def test_roundtrip(self):
+        events = [
+            ("event {}".format(i) * (i % 5 + 1)).encode("ascii") for i in range(25)
+        ]
+
+        encrypted = self.run_batch(bspump.crypto.EncryptAESBatchProcessor, events)
+        encryptor = bspump.crypto.EncryptAESProcessor(
+            self.App, bspump.Pipeline(self.App, "P")
+        )
+        self.assertEqual(
+            [event for _, event in encrypted],
+            [encryptor.process(None, event) for event in events],
+        )
+
+        decrypted = self.run_batch(
+            bspump.crypto.DecryptAESBatchProcessor, [event for _, event in encrypted]
+        )
+        self.assertEqual([event for _, event in decrypted], events)
+
+    def test_corrupted_event(self):
+        encryptor = bspump.crypto.EncryptAESProcessor(
+            self.App, bspump.Pipeline(self.App, "P")
+        )
+        events = [encryptor.process(None, str(i).encode("ascii")) for i in range(6)]
+        # Not a multiple of the AES block size
+        events[1] = events[1][:-1]
+
+        output = self.run_batch(
+            bspump.crypto.DecryptAESBatchProcessor, events, config={"batch_size": 2}
+        )
+        self.assertEqual([event for _, event in output], [b"0", b"2", b"3", b"4", b"5"])
+
+    def test_failed_block(self):
+        class FailingProcessor(bspump.crypto.BatchProcessor):
+            def process_batch(self, chunk):
+                if any(event == b"fail" for _, event in chunk):
+                    raise RuntimeError("Failed block")
+                return super().process_batch(chunk)
+
+            def process_event(self, context, event):
+                return event
+
+        events = [b"0", b"fail", b"2", b"3", b"4"]
+        output = self.run_batch(FailingProcessor, events, config={"batch_size": 2})
+        # The failed block is dropped, the following blocks are forwarded
+        self.assertEqual([event for _, event in output], [b"2", b"3", b"4"])
+
+    def test_split(self):
+        processor = bspump.crypto.EncryptAESBatchProcessor(
+            self.App,
+            bspump.Pipeline(self.App, "P"),
+            config={"workers": 4, "min_chunk_size": 3},
+        )
+        block = list(range(10))
+        chunks = processor._split(block)
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual([item for chunk in chunks for item in chunk], block)
+        self.assertEqual(processor._split(block[:5]), [block[:5]])
+
+
+class TestHashingBatchProcessor(BatchProcessorTestCase):
+    def test_hashing(self):
+        events = [str(i).encode("ascii") for i in range(23)]
+        output = self.run_batch(bspump.crypto.HashingBatchProcessor, events)
+        self.assertEqual(
+            [event for _, event in output],
+            [hashlib.sha256(event).digest() for event in events],
+        )
+
+    def test_cohashing(self):
+        events = [str(i).encode("ascii") for i in range(23)]
+        output = self.run_batch(
+            bspump.crypto.CoHashingBatchProcessor, events, config={"algorithm": "md5"}
+        )
+        self.assertEqual([event for _, event in output], events)
+        self.assertEqual(
+            [context["hash"] for context, _ in output],
+            [hashlib.md5(event).digest() for event in events],
+        )
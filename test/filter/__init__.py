@@ -1,3 +1,4 @@
 from .test_attributefilter import *
 from .test_contentfilter import *
 from .test_timedriftfilter import *
+from .test_querycompiler import *
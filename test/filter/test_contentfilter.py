@@ -58,3 +58,11 @@ class TestContentFilter(bspump.unittest.ProcessorTestCase):
             self.set_up_processor(
                 bspump.filter.ContentFilter, query={"foo": {"$in": None}}
             )
+
+    def test_content_filter_process_batch(self):
+        self.set_up_processor(ContentFilterOnHitPassOnly, query={"foo": "bar"})
+        events = [{"foo": "bar"}, {"fizz": "buzz"}, {"foo": ["bar"]}]
+
+        output = self.Pipeline.Processors[0][0].process_batch(None, events)
+
+        self.assertEqual(output, [{"foo": "bar"}, {"foo": ["bar"]}])
@@ -0,0 +1,100 @@
+import re
+import unittest
+
+import mongoquery
+
+import bspump.filter
+
+
+EVENTS = [
+    {},
+    {"foo": "bar"},
+    {"foo": "baz", "num": 5},
+    {"foo": ["bar", "qux"], "num": 10},
+    {"num": 3.5, "nested": {"a": 1, "b": [1, 2, 3]}},
+    {"num": "5", "nested": {"a": 2}},
+    {"nested": [{"a": 1}, {"a": 3}]},
+    {"foo": None, "num": None},
+    {"tags": ["x", "y"], "foo": "BAR"},
+]
+
+QUERIES = [
+    {},
+    {"foo": "bar"},
+    {"foo": {"$eq": "bar"}},
+    {"foo": {"$ne": "bar"}},
+    {"num": {"$gt": 4}},
+    {"num": {"$gte": 5, "$lt": 10}},
+    {"num": {"$lte": 5}},
+    {"foo": {"$in": ["bar", "baz"]}},
+    {"foo": {"$nin": ["bar"]}},
+    {"tags": {"$in": ["y", ["x"]]}},
+    {"foo": {"$exists": True}},
+    {"foo": {"$exists": False}},
+    {"num": {"$exists": True, "$gt": 1}},
+    {"nested.a": {"$exists": True}},
+    {"nested.a": 1},
+    {"nested.b.1": 2},
+    {"nested.b": 3},
+    {"$or": [{"foo": "bar"}, {"num": {"$gt": 6}}]},
+    {"$and": [{"num": {"$gt": 1}}, {"foo": {"$regex": "^ba"}}]},
+    {"$nor": [{"foo": "bar"}, {"num": 5}]},
+    {"num": {"$not": {"$gt": 4}}},
+    {"foo": {"$regex": "/^bar$/i"}},
+    {"foo": {"$regex": re.compile("a")}},
+    {"num": {"$type": "number"}},
+    {"nested.b": {"$size": 3}},
+    {"foo": "bar", "num": {"$gt": 1}, "tags": {"$regex": "x"}},
+]
+
+
+class TestCompiledQuery(unittest.TestCase):
+    def test_same_as_mongoquery(self):
+        for query in QUERIES:
+            expected = [mongoquery.Query(query).match(event) for event in EVENTS]
+            compiled = bspump.filter.compile_query(query)
+            with self.subTest(query=query):
+                self.assertEqual([compiled.match(event) for event in EVENTS], expected)
+                self.assertEqual(compiled.match_batch(EVENTS), expected)
+
+    def test_clause_order(self):
+        compiled = bspump.filter.compile_query(
+            {"foo": {"$regex": "^b"}, "num": {"$gt": 1}, "bar": 1}
+        )
+        costs = [cost for cost, _ in compiled.Clauses]
+        self.assertEqual(costs, sorted(costs))
+
+        # The regex is not evaluated, when the equality fails
+        calls = []
+
+        class Probe(str):
+            def __eq__(self, other):
+                calls.append("eq")
+                return False
+
+            __hash__ = str.__hash__
+
+        compiled = bspump.filter.compile_query(
+            {"foo": {"$regex": "^b"}, "bar": Probe("x")}
+        )
+        self.assertFalse(compiled.match({"foo": 1, "bar": "y"}))
+        self.assertEqual(calls, ["eq"])
+
+    def test_match_batch_empty(self):
+        compiled = bspump.filter.compile_query({"foo": "bar"})
+        self.assertEqual(compiled.match_batch([]), [])
+
+    def test_reordered_clause_error(self):
+        # `$exists` is evaluated before `$regex`, mongoquery never passes the float to it
+        events = EVENTS + [{"x": 1.5}, {"x": "abc"}, {"x": "b"}, {}]
+        queries = [
+            {"x": {"$regex": "^a", "$not": {"$exists": False}}},
+            {"x": {"$regex": "^a", "$not": {"$exists": True}}},
+            {"$and": [{"x": {"$regex": "^a"}}, {"x": {"$not": {"$exists": False}}}]},
+        ]
+        for query in queries:
+            expected = [mongoquery.Query(query).match(event) for event in events]
+            compiled = bspump.filter.compile_query(query)
+            with self.subTest(query=query):
+                self.assertEqual([compiled.match(event) for event in events], expected)
+                self.assertEqual(compiled.match_batch(events), expected)
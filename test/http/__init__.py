@@ -0,0 +1,3 @@
+from .test_webservicesink import *
+from .test_webroutesource import *
+from .test_multiclientsource import *
@@ -0,0 +1,136 @@
+import aiohttp.test_utils
+import aiohttp.web
+
+import bspump
+import bspump.http
+import bspump.unittest
+
+
+class CollectingSink(bspump.Sink):
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id=id, config=config)
+        self.Events = []
+
+    def process(self, context, event):
+        self.Events.append((context["http.url"].rsplit("/", 1)[-1], event))
+
+
+class FailingOnceSource(bspump.http.HTTPMultiClientSource):
+    """
+    The first body is broken in the middle of reading.
+    """
+
+    Failed = False
+
+    async def read(self, response, context):
+        if not self.Failed:
+            self.Failed = True
+            raise aiohttp.ClientPayloadError("Response payload is not completed")
+        await super().read(response, context)
+
+
+class TestHTTPMultiClientSource(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.Requests = []
+
+    def build(self, source_class, paths, config=None):
+        self.Pipeline = bspump.Pipeline(self.App, "HTTPMultiClientPipeline")
+        self.Source = source_class(
+            self.App,
+            self.Pipeline,
+            urls=[str(self.Server.make_url(path)) for path in paths],
+            config=config,
+        )
+        self.Sink = CollectingSink(self.App, self.Pipeline)
+        self.Pipeline.build(self.Source, self.Sink)
+        self.Pipeline._evaluate_ready()
+
+    async def cached(self, request):
+        self.Requests.append(request.path)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return aiohttp.web.Response(status=304)
+        return aiohttp.web.Response(body=b"payload", headers={"ETag": '"v1"'})
+
+    async def linked(self, request):
+        self.Requests.append(request.path)
+        page = int(request.query.get("page", "0"))
+        headers = {}
+        if page < 2:
+            headers["Link"] = '</linked?page={}>; rel="next"'.format(page + 1)
+        return aiohttp.web.Response(text="page {}".format(page), headers=headers)
+
+    async def cursor(self, request):
+        self.Requests.append(request.path)
+        cursor = int(request.query.get("cursor", "0"))
+        return aiohttp.web.json_response(
+            {"items": [cursor], "meta": {"next": cursor + 1 if cursor < 2 else None}}
+        )
+
+    async def lines(self, request):
+        response = aiohttp.web.StreamResponse()
+        await response.prepare(request)
+        for i in range(3):
+            await response.write("line {}\n".format(i).encode("utf-8"))
+        await response.write_eof()
+        return response
+
+    def run_cycles(self, source_class, paths, cycles=1, config=None):
+        async def run():
+            webapp = aiohttp.web.Application()
+            webapp.router.add_get("/cached", self.cached)
+            webapp.router.add_get("/cached2", self.cached)
+            webapp.router.add_get("/linked", self.linked)
+            webapp.router.add_get("/cursor", self.cursor)
+            webapp.router.add_get("/lines", self.lines)
+            self.Server = aiohttp.test_utils.TestServer(webapp)
+            await self.Server.start_server()
+            try:
+                self.build(source_class, paths, config)
+                async with aiohttp.ClientSession() as session:
+                    for _ in range(cycles):
+                        await self.Source.cycle(session)
+            finally:
+                await self.Server.close()
+
+        self.App.Loop.run_until_complete(run())
+
+    def test_conditional(self):
+        self.run_cycles(
+            bspump.http.HTTPMultiClientSource, ["/cached", "/cached2"], cycles=2
+        )
+        # The second cycle gets 304 for both URLs, no events
+        self.assertEqual(
+            [("cached", b"payload"), ("cached2", b"payload")], sorted(self.Sink.Events)
+        )
+        self.assertEqual(4, len(self.Requests))
+
+    def test_conditional_failed_body(self):
+        self.run_cycles(FailingOnceSource, ["/cached"], cycles=2)
+        # The validators of the failed body are not remembered, the second cycle fetches it again
+        self.assertEqual([("cached", b"payload")], self.Sink.Events)
+        self.assertEqual(2, len(self.Requests))
+
+    def test_link_pagination(self):
+        self.run_cycles(
+            bspump.http.HTTPMultiClientSource,
+            ["/linked"],
+            config={"pagination": "link"},
+        )
+        self.assertEqual(
+            [b"page 0", b"page 1", b"page 2"], [e for _, e in self.Sink.Events]
+        )
+
+    def test_cursor_pagination(self):
+        self.run_cycles(
+            bspump.http.HTTPMultiClientSource,
+            ["/cursor"],
+            config={"pagination": "cursor", "cursor_path": "meta.next"},
+        )
+        self.assertEqual([[0], [1], [2]], [e["items"] for _, e in self.Sink.Events])
+
+    def test_lines(self):
+        self.run_cycles(bspump.http.HTTPMultiClientLineSource, ["/lines"])
+        self.assertEqual(
+            ["line 0", "line 1", "line 2"], [e for _, e in self.Sink.Events]
+        )
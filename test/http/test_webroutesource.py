@@ -0,0 +1,82 @@
+import asyncio
+
+import aiohttp.test_utils
+import aiohttp.web
+
+import bspump
+import bspump.abc.connection
+import bspump.http.web.server
+import bspump.unittest
+
+
+class FakeWebServerConnection(bspump.abc.connection.Connection):
+    def __init__(self, app, id=None, config=None):
+        super().__init__(app, id=id, config=config)
+        self.aiohttp_app = aiohttp.web.Application()
+
+
+class PendingSink(bspump.Sink):
+    """
+    Keeps the requests in flight until they are released by the test.
+    """
+
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id=id, config=config)
+        self.Events = []
+
+    def process(self, context, event):
+        self.Events.append(event)
+
+    def release(self):
+        for event in self.Events:
+            event["response_future"].set_result(
+                aiohttp.web.json_response({"body": event.get("body")})
+            )
+        self.Events = []
+
+
+class TestWebRouteSource(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.Connection = FakeWebServerConnection(self.App, "FakeWebServerConnection")
+        self.Pipeline = bspump.Pipeline(self.App, "WebRoutePipeline")
+        self.Source = bspump.http.web.server.WebRouteSource(
+            self.App,
+            self.Pipeline,
+            connection=self.Connection,
+            method="POST",
+            route="/route",
+            config={"max_in_flight": 2, "parse_body": "json"},
+        )
+        self.Sink = PendingSink(self.App, self.Pipeline)
+        self.Pipeline.build(self.Source, self.Sink)
+        self.Pipeline._evaluate_ready()
+
+    def test_admission_control(self):
+        async def run():
+            async with aiohttp.test_utils.TestClient(
+                aiohttp.test_utils.TestServer(self.Connection.aiohttp_app)
+            ) as client:
+                first = asyncio.ensure_future(client.post("/route", json={"n": 1}))
+                second = asyncio.ensure_future(client.post("/route", json={"n": 2}))
+                while len(self.Sink.Events) < 2:
+                    await asyncio.sleep(0.01)
+
+                self.assertEqual(2, self.Source.InFlight)
+                self.assertFalse(self.Pipeline.is_ready())
+
+                rejected = await client.post("/route", json={"n": 3})
+                self.assertEqual(503, rejected.status)
+                self.assertEqual("1", rejected.headers["Retry-After"])
+
+                self.Sink.release()
+                bodies = [await (await r).json() for r in (first, second)]
+                self.assertEqual([{"body": {"n": 1}}, {"body": {"n": 2}}], bodies)
+
+                self.assertEqual(0, self.Source.InFlight)
+                self.assertTrue(self.Pipeline.is_ready())
+
+                invalid = await client.post("/route", data=b"{not json")
+                self.assertEqual(400, invalid.status)
+
+        self.App.Loop.run_until_complete(run())
@@ -0,0 +1,50 @@
+import aiohttp.test_utils
+import aiohttp.web
+
+import bspump
+import bspump.common
+import bspump.http
+import bspump.unittest
+
+
+class TestWebServiceSink(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.Pipeline = bspump.Pipeline(self.App, "WebServiceSinkPipeline")
+        self.Sink = bspump.http.WebServiceSink(
+            self.App, self.Pipeline, config={"high_water": 15, "low_water": 5}
+        )
+        self.Pipeline.build(
+            bspump.common.DirectSource(self.App, self.Pipeline), self.Sink
+        )
+        self.Throttles = []
+
+    async def endpoint(self, request):
+        response = await self.Sink.response(request)
+        async with response:
+            context = {self.Sink.CONTEXT_RESPONSE_ID: response.Id}
+            self.Sink.process(context, b"first;")
+            self.Sink.process(context, b"second;")
+            self.Sink.process(context, b"third;")
+            self.Throttles.append(response in self.Pipeline.get_throttles())
+            await response.flush_events()
+            self.Throttles.append(response in self.Pipeline.get_throttles())
+            self.Sink.process(context, b"last")
+        return response
+
+    def test_stream(self):
+        async def run():
+            webapp = aiohttp.web.Application()
+            webapp.router.add_get("/stream", self.endpoint)
+            async with aiohttp.test_utils.TestClient(
+                aiohttp.test_utils.TestServer(webapp)
+            ) as client:
+                resp = await client.get("/stream")
+                return await resp.read()
+
+        body = self.App.Loop.run_until_complete(run())
+
+        self.assertEqual(b"first;second;third;last", body)
+        # Throttled when the buffer exceeded the high water mark, released when written
+        self.assertEqual([True, False], self.Throttles)
+        self.assertEqual(0, len(self.Sink.Responses))
@@ -1,5 +1,12 @@
+import asyncio
+
 import bspump.unittest
-from bspump.integrity import IntegrityEnricher
+from bspump.integrity import (
+    IntegrityEnricher,
+    IntegrityBlockEnricher,
+    merkle_root,
+    verify_block,
+)
 
 
 class TestIntegrityEnricher(bspump.unittest.ProcessorTestCase):
@@ -51,3 +58,72 @@ class TestIntegrityEnricher(bspump.unittest.ProcessorTestCase):
         # 	output[0][1],
         # 	b'\x86ex\x08\x1a\x1d\xeas\xbeG\xdc\xdeE3K\x17\xb2\xcc\xc0=\x88-\xa2\xd0\xfb\x1eQ\xec\x9d\xdcse'
         # )
+
+
+class TestIntegrityBlockEnricher(bspump.unittest.ProcessorTestCase):
+    def test_blocks(self):
+        self.set_up_processor(IntegrityBlockEnricher, config={"batch_size": 3})
+        enricher = self.Pipeline.Processor
+        self.Pipeline._evaluate_ready()
+
+        async def run():
+            for i in range(7):
+                enricher.process({}, {"number": i})
+            enricher.flush()
+            await enricher.PendingBlock
+
+        self.App.Loop.run_until_complete(run())
+        events = [event for context, event in self.Pipeline.Sink.Output]
+
+        # Order and the chain are kept across blocks
+        self.assertEqual([event["number"] for event in events], list(range(7)))
+        self.assertNotIn("_prev_id", events[0])
+        for previous, event in zip(events, events[1:]):
+            self.assertEqual(event["_prev_id"], previous["_id"])
+
+        blocks = [events[0:3], events[3:6], events[6:7]]
+        self.assertEqual(len({block[0]["_block"] for block in blocks}), 3)
+
+        previous_hash = None
+        for block in blocks:
+            self.assertTrue(verify_block(block, previous_hash=previous_hash))
+            previous_hash = block[-1]["_id"]
+
+        # Tampering is detected within the block
+        blocks[1][1]["number"] = 100
+        self.assertFalse(verify_block(blocks[1]))
+        self.assertTrue(verify_block(blocks[2], previous_hash=blocks[1][-1]["_id"]))
+
+        # A block is not complete
+        self.assertFalse(verify_block(blocks[0][:2]))
+
+    def test_merkle_root(self):
+        digests = ["00" * 32, "11" * 32, "22" * 32]
+        self.assertEqual(len(merkle_root(digests, "sha256")), 64)
+        self.assertNotEqual(
+            merkle_root(digests, "sha256"), merkle_root(digests[:2], "sha256")
+        )
+        self.assertNotEqual(
+            merkle_root(digests, "sha256"),
+            merkle_root(list(reversed(digests)), "sha256"),
+        )
+
+    def test_failed_block(self):
+        self.set_up_processor(IntegrityBlockEnricher, config={"batch_size": 2})
+        enricher = self.Pipeline.Processor
+        self.Pipeline._evaluate_ready()
+
+        async def run():
+            enricher.process({}, {"number": 0})
+            # A set cannot be serialized, the whole block fails
+            enricher.process({}, {"number": 1, "tags": {"a"}})
+            enricher.process({}, {"number": 2})
+            enricher.process({}, {"number": 3})
+            await asyncio.wait([enricher.PendingBlock])
+
+        self.App.Loop.run_until_complete(run())
+        events = [event for context, event in self.Pipeline.Sink.Output]
+
+        # The block that follows the failed one is forwarded
+        self.assertEqual([event["number"] for event in events], [2, 3])
+        self.assertTrue(verify_block(events))
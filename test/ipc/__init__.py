@@ -0,0 +1,2 @@
+from .test_framing import *
+from .test_datagram import *
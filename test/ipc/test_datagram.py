@@ -0,0 +1,71 @@
+import asyncio
+import socket
+
+import bspump
+import bspump.common
+import bspump.ipc
+import bspump.ipc.datagram
+import bspump.unittest
+
+
+class CollectingSink(bspump.Sink):
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id=id, config=config)
+        self.Events = []
+
+    def process(self, context, event):
+        self.Events.append(event)
+
+
+class TestDatagramSource(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.Pipeline = bspump.Pipeline(self.App, "DatagramPipeline")
+        self.Source = bspump.ipc.DatagramSource(
+            self.App,
+            self.Pipeline,
+            config={"address": "127.0.0.1 0", "sockets": 2, "receive_batch": 10},
+        )
+        self.Sink = CollectingSink(self.App, self.Pipeline)
+        self.Pipeline.build(self.Source, self.Sink)
+        self.Pipeline._evaluate_ready()
+
+    def tearDown(self) -> None:
+        for sock in self.Source.Sockets:
+            sock.close()
+        super().tearDown()
+
+    def test_receive_burst(self):
+        address = self.Source.Socket.getsockname()
+        self.assertEqual(2, len(self.Source.Sockets))
+        for sock in self.Source.Sockets:
+            self.assertEqual(address, sock.getsockname())
+
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for i in range(100):
+            client.sendto("datagram {}".format(i).encode("ascii"), address)
+        client.close()
+
+        async def receive():
+            tasks = [
+                asyncio.ensure_future(self.Source._receive(sock))
+                for sock in self.Source.Sockets
+            ]
+            await asyncio.sleep(0.1)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks)
+
+        self.App.Loop.run_until_complete(receive())
+
+        self.assertEqual(
+            sorted("datagram {}".format(i).encode("ascii") for i in range(100)),
+            sorted(self.Sink.Events),
+        )
+
+    def test_kernel_stats(self):
+        rx_queue, drops = bspump.ipc.datagram.read_udp_socket_stats(self.Source.Sockets)
+        if rx_queue is None:
+            self.skipTest("/proc/net/udp is not available")
+        self.assertEqual(0, rx_queue)
+        self.assertEqual(0, drops)
@@ -0,0 +1,107 @@
+import struct
+
+import bspump.ipc
+import bspump.unittest
+
+
+class FakeStream(object):
+    def __init__(self, chunks):
+        self.Chunks = list(chunks)
+
+    async def recv_into(self, buf):
+        if len(self.Chunks) == 0:
+            return 0
+        chunk = self.Chunks.pop(0)
+        if len(chunk) > len(buf):
+            # Deliver the rest in the next call, as a socket would do
+            self.Chunks.insert(0, chunk[len(buf) :])
+            chunk = chunk[: len(buf)]
+        buf[: len(chunk)] = chunk
+        return len(chunk)
+
+
+class FakePipeline(object):
+    async def ready(self):
+        return True
+
+
+class FakeSource(object):
+    def __init__(self):
+        self.Pipeline = FakePipeline()
+        self.Events = []
+
+    async def process(self, event, context=None):
+        self.Events.append(event)
+
+
+class TestFraming(bspump.unittest.TestCase):
+    def handle(self, protocol_class, chunks, config=None):
+        cfg = {"decode": "utf-8"}
+        if config is not None:
+            cfg.update(config)
+
+        protocol = protocol_class(self.App, None, cfg)
+        source = FakeSource()
+        self.App.Loop.run_until_complete(
+            protocol.handle(source, FakeStream(chunks), {})
+        )
+        return source.Events
+
+    def test_lines(self):
+        events = self.handle(
+            bspump.ipc.LineSourceProtocol,
+            [b"first\nsec", b"ond\n", b"third\nfourth\nfif", b"th\n"],
+        )
+        self.assertEqual(["first", "second", "third", "fourth", "fifth"], events)
+
+    def test_lines_split_eol(self):
+        events = self.handle(
+            bspump.ipc.LineSourceProtocol,
+            [b"first\r", b"\nsecond\r\n"],
+            config={"eol": "\\r\\n", "decode": "bytes"},
+        )
+        self.assertEqual([b"first", b"second"], events)
+
+    def test_lines_buffer_reuse(self):
+        # Many lines through a small buffer, so that it is compacted and grown
+        lines = ["line {}".format(i) * (i % 7 + 1) for i in range(500)]
+        data = "".join(line + "\n" for line in lines).encode("utf-8")
+        chunks = [data[i : i + 37] for i in range(0, len(data), 37)]
+        events = self.handle(
+            bspump.ipc.LineSourceProtocol, chunks, config={"buffer_size": 16}
+        )
+        self.assertEqual(lines, events)
+
+    def test_lines_max_length(self):
+        with self.assertRaises(RuntimeError):
+            self.handle(
+                bspump.ipc.LineSourceProtocol,
+                [b"short\n", b"x" * 100],
+                config={"max_frame_length": 50},
+            )
+
+    def test_length_prefixed(self):
+        data = b"".join(
+            struct.pack(">I", len(m)) + m for m in (b"alpha", b"", b"gamma" * 10)
+        )
+        events = self.handle(
+            bspump.ipc.LengthPrefixedSourceProtocol,
+            [data[:3], data[3:20], data[20:]],
+        )
+        self.assertEqual(["alpha", "", "gamma" * 10], events)
+
+    def test_octet_counting(self):
+        messages = [
+            b"<34>1 2003-10-11T22:14:15.003Z mymachine su - ID47 - 'su root' failed",
+            b"<13>1 - - - - - line\nwith LF inside",
+        ]
+        data = b"".join(str(len(m)).encode("ascii") + b" " + m for m in messages)
+        # Non-transparent framing on the same connection
+        data += b"<13>Oct 11 22:14:15 legacy message\n"
+        chunks = [data[i : i + 10] for i in range(0, len(data), 10)]
+        events = self.handle(bspump.ipc.OctetCountingSourceProtocol, chunks)
+        self.assertEqual(
+            [m.decode("utf-8") for m in messages]
+            + ["<13>Oct 11 22:14:15 legacy message"],
+            events,
+        )
@@ -0,0 +1,2 @@
+from .test_ipgeolookup import *
+from .test_index import *
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import random
+
+import numpy as np
+
+import bspump.lookup
+import bspump.matrix
+import bspump.unittest
+
+
+DTYPE = [
+    ("country", "U2"),
+    ("start", "i8"),
+    ("end", "i8"),
+]
+
+
+class TestBitSet(bspump.unittest.TestCase):
+    def test_add_discard(self):
+        bitset = bspump.lookup.BitSet([5, 700, 64, 5])
+        self.assertEqual(bitset.indexes().tolist(), [5, 64, 700])
+        self.assertEqual(len(bitset), 3)
+        self.assertIn(700, bitset)
+        self.assertNotIn(6, bitset)
+
+        bitset.discard([5, 64, 1000])
+        self.assertEqual(bitset.indexes().tolist(), [700])
+        # Only words around the remaining member are kept
+        self.assertEqual(len(bitset.Words), 1)
+
+        bitset.discard([700])
+        self.assertFalse(bitset)
+
+    def test_and_or(self):
+        a = bspump.lookup.BitSet([1, 2, 130, 200])
+        b = bspump.lookup.BitSet([2, 200, 5000])
+        self.assertEqual((a & b).indexes().tolist(), [2, 200])
+        self.assertEqual((a | b).indexes().tolist(), [1, 2, 130, 200, 5000])
+        self.assertFalse(a & bspump.lookup.BitSet([3000]))
+
+
+class TestIndex(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.Matrix = bspump.matrix.SessionMatrix(self.App, dtype=DTYPE)
+
+    def store(self, name, country, start, end):
+        row_index = self.Matrix.get_row_index(name)
+        if row_index is None:
+            row_index = self.Matrix.add_row(name)
+        self.Matrix.store_event(
+            row_index, {"country": country, "start": start, "end": end}
+        )
+        return row_index
+
+    def open_rows(self):
+        return list(self.Matrix.Index.I2NMap.keys())
+
+    def expected_country(self, country):
+        return {
+            i for i in self.open_rows() if self.Matrix.Array[i]["country"] == country
+        }
+
+    def expected_range(self, value):
+        return {
+            i
+            for i in self.open_rows()
+            if self.Matrix.Array[i]["start"] <= value < self.Matrix.Array[i]["end"]
+        }
+
+    def test_bitmap_index(self):
+        self.store("a", "CZ", 0, 0)
+        self.store("b", "US", 0, 0)
+        self.store("c", "CZ", 0, 0)
+        index = bspump.lookup.BitMapIndex("country", self.Matrix)
+        self.assertEqual(index.search("CZ"), self.expected_country("CZ"))
+        self.assertEqual(index.search("DE"), set())
+
+        self.store("d", "DE", 0, 0)
+        self.store("a", "US", 0, 0)
+        self.Matrix.close_row("c")
+        index.update(self.Matrix)
+        self.assertEqual(index.search("CZ"), set())
+        self.assertEqual(index.search("US"), self.expected_country("US"))
+        self.assertEqual(index.search("DE"), self.expected_country("DE"))
+        self.assertEqual(index.Keys.tolist(), ["DE", "US"])
+
+    def test_add_close_row(self):
+        index = bspump.lookup.BitMapIndex("country", self.Matrix)
+        row_index = self.store("a", "CZ", 0, 0)
+        index.add_row(row_index, self.Matrix)
+        self.assertEqual(index.search("CZ"), {row_index})
+
+        self.store("a", "SK", 0, 0)
+        index.add_row(row_index, self.Matrix)
+        self.assertEqual(index.search("CZ"), set())
+        self.assertEqual(index.search("SK"), {row_index})
+
+        index.close_row(row_index)
+        self.assertEqual(index.search("SK"), set())
+        self.assertEqual(len(index.Keys), 0)
+
+    def test_tree_range_index(self):
+        self.store("a", "", 10, 20)
+        self.store("b", "", 15, 30)
+        self.store("c", "", 40, 50)
+        index = bspump.lookup.TreeRangeIndex("start", "end", self.Matrix)
+        for value in (5, 10, 15, 19, 20, 29, 30, 45, 50):
+            self.assertEqual(index.search(value), self.expected_range(value), value)
+        self.assertEqual(index.MinValue, 10)
+        self.assertEqual(index.MaxValue, 50)
+
+        self.Matrix.close_row("b")
+        self.store("c", "", 0, 12)
+        index.update(self.Matrix)
+        for value in (0, 11, 12, 15, 29, 45):
+            self.assertEqual(index.search(value), self.expected_range(value), value)
+        # Boundaries of closed and modified ranges are dropped
+        self.assertEqual(index.Boundaries.tolist(), [0, 10, 12, 20])
+        self.assertEqual(len(index.Segments), 3)
+
+    def test_random_updates(self):
+        rnd = random.Random(7)
+        bitmap = bspump.lookup.BitMapIndex("country", self.Matrix)
+        ranges = bspump.lookup.TreeRangeIndex("start", "end", self.Matrix)
+        names = ["row{}".format(i) for i in range(60)]
+        for _ in range(30):
+            for _ in range(20):
+                name = rnd.choice(names)
+                if rnd.random() < 0.3:
+                    self.Matrix.close_row(name)
+                else:
+                    start = rnd.randint(0, 100)
+                    self.store(name, rnd.choice(["CZ", "SK", "US"]), start, start + 7)
+
+            if rnd.random() < 0.2:
+                self.Matrix.flush()
+
+            bitmap.update(self.Matrix)
+            ranges.update(self.Matrix)
+            for country in ("CZ", "SK", "US"):
+                self.assertEqual(bitmap.search(country), self.expected_country(country))
+            for value in range(-1, 110, 3):
+                self.assertEqual(ranges.search(value), self.expected_range(value))
+
+    def test_serialize(self):
+        self.store("a", "CZ", 10, 20)
+        self.store("b", "US", 15, 30)
+        bitmap = bspump.lookup.BitMapIndex("country", self.Matrix)
+        ranges = bspump.lookup.TreeRangeIndex("start", "end", self.Matrix)
+
+        empty = bspump.matrix.SessionMatrix(self.App, dtype=DTYPE)
+        bitmap2 = bspump.lookup.BitMapIndex("country", empty)
+        bitmap2.deserialize(json.loads(json.dumps(bitmap.serialize())))
+        ranges2 = bspump.lookup.TreeRangeIndex("start", "end", empty)
+        ranges2.deserialize(json.loads(json.dumps(ranges.serialize())))
+
+        self.assertEqual(bitmap2.search("CZ"), bitmap.search("CZ"))
+        self.assertEqual(ranges2.search(17), ranges.search(17))
+        self.assertEqual(ranges2.MaxValue, 30)
+
+        # The deserialized index continues incrementally
+        self.Matrix.close_row("a")
+        bitmap2.update(self.Matrix)
+        ranges2.update(self.Matrix)
+        self.assertEqual(bitmap2.search("CZ"), set())
+        self.assertEqual(ranges2.search(17), self.expected_range(17))
+
+    def test_search_indexes(self):
+        lookup = bspump.lookup.MatrixLookup(self.App, id="TestMatrixLookup")
+        lookup.Matrix = self.Matrix
+        self.store("a", "CZ", 10, 20)
+        self.store("b", "US", 15, 30)
+        self.store("c", "CZ", 18, 40)
+        lookup.create_index(
+            bspump.lookup.BitMapIndex, "country", self.Matrix, id="country"
+        )
+        lookup.create_index(
+            bspump.lookup.TreeRangeIndex, "start", "end", self.Matrix, id="range"
+        )
+
+        rows = lookup.search_indexes({"country": "CZ", "range": 19})
+        self.assertEqual(
+            set(rows.tolist()), self.expected_country("CZ") & self.expected_range(19)
+        )
+        self.assertEqual(len(lookup.search_indexes({"country": "US", "range": 12})), 0)
+        self.assertEqual(len(lookup.search_indexes({"country": "DE", "range": 19})), 0)
+        np.testing.assert_array_equal(lookup.search_indexes({}), [])
+
+    def test_lookup_applies_row_changes(self):
+        # A lookup with a local source is the master, it maintains its indexes
+        lookup = bspump.lookup.MatrixLookup(
+            self.App,
+            dtype=DTYPE,
+            id="TestRowChangesLookup",
+            config={"source_url": "/nonexistent/lookup.json"},
+        )
+        self.Matrix = lookup.Matrix
+        bitmap = lookup.create_index(
+            bspump.lookup.BitMapIndex, "country", self.Matrix, id="country"
+        )
+        ranges = lookup.create_index(
+            bspump.lookup.TreeRangeIndex, "start", "end", self.Matrix, id="range"
+        )
+
+        # Only a flush of the matrix resyncs all rows
+        self.Matrix.MaxClosedRowsCapacity = 2
+        updates = []
+        update = bitmap.update
+
+        def counting_update(matrix):
+            updates.append(matrix)
+            update(matrix)
+
+        bitmap.update = counting_update
+
+        def run():
+            self.App.Loop.run_until_complete(asyncio.sleep(0))
+
+        self.store("a", "CZ", 10, 20)
+        self.store("b", "US", 15, 30)
+        self.Matrix.store_events([{"id": "c", "country": "CZ", "start": 18, "end": 40}])
+        run()
+        self.assertEqual(bitmap.search("CZ"), self.expected_country("CZ"))
+        self.assertEqual(ranges.search(19), self.expected_range(19))
+
+        # A closed row is reused by a new one within the same iteration
+        self.Matrix.close_row("a")
+        self.store("d", "SK", 0, 5)
+        self.store("b", "CZ", 15, 30)
+        run()
+        for country in ("CZ", "SK", "US"):
+            self.assertEqual(bitmap.search(country), self.expected_country(country))
+        for value in (3, 12, 19, 35):
+            self.assertEqual(ranges.search(value), self.expected_range(value))
+        self.assertEqual(updates, [])
+
+        self.Matrix.flush()
+        run()
+        self.assertEqual(updates, [self.Matrix])
+        self.assertEqual(bitmap.search("CZ"), self.expected_country("CZ"))
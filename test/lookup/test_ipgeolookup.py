@@ -0,0 +1,90 @@
+import ipaddress
+import os
+import shutil
+import tempfile
+
+import bspump.lookup
+import bspump.unittest
+
+
+IPV4_CSV = """\
+"0","16777215","-","-","-","-","0.000000","0.000000"
+"16777216","16777471","US","United States of America","California","Los Angeles","34.052230","-118.243680"
+"16777472","16778239","CN","China","Fujian","Fuzhou","26.061390","119.306110"
+"16778240","16779263","AU","Australia","Victoria","Melbourne","-37.814000","144.963320"
+"""
+
+IPV6_CSV = """\
+"281470698520576","281470698520831","US","United States of America","California","Los Angeles","34.052230","-118.243680"
+"58569105395146355079250494851844669440","58569105474374517593514832445388619775","JP","Japan","Tokyo","Tokyo","35.689500","139.691710"
+"""
+
+
+class TestIPGeoLookup(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.Dir = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.Dir)
+        super().tearDown()
+
+    def create(self, content, **config):
+        path = os.path.join(self.Dir, "db.csv")
+        with open(path, "w") as f:
+            f.write(content)
+        config["path"] = path
+        lookup = bspump.lookup.IPGeoLookup(self.App, config=config)
+        self.assertTrue(self.App.Loop.run_until_complete(lookup.load()))
+        return lookup
+
+    def test_ipv4(self):
+        lookup = self.create(IPV4_CSV)
+        self.assertEqual(
+            lookup.lookup_location("1.0.0.1"),
+            {
+                "lat": 34.05223,
+                "lon": -118.24368,
+                "country": "US",
+                "region": "California",
+                "city": "Los Angeles",
+            },
+        )
+        self.assertEqual(lookup.lookup_location("1.0.4.0")["city"], "Melbourne")
+        self.assertEqual(lookup.lookup_location("0.0.0.1"), {"lat": None, "lon": None})
+        # Past the last range
+        self.assertIsNone(lookup.lookup_location("1.0.8.0"))
+
+    def test_ipv6(self):
+        lookup = self.create(IPV6_CSV, ipv4mapped="yes")
+        self.assertEqual(lookup.lookup_location("1.0.0.1")["country"], "US")
+        self.assertEqual(lookup.lookup_location("2c0f:ffd8::1")["country"], "JP")
+        self.assertIsNone(lookup.lookup_location("2c0f:ffd7::1"))
+        self.assertIsNone(lookup.lookup_location("1.0.1.0"))
+
+    def test_batch(self):
+        lookup = self.create(IPV4_CSV)
+        addresses = ["1.0.4.0", "1.0.8.0", "1.0.0.0", "1.0.1.0", "0.0.0.0"]
+        self.assertEqual(
+            lookup.lookup_locations(addresses),
+            [lookup.lookup_location(address) for address in addresses],
+        )
+        self.assertEqual(
+            list(
+                lookup.search_batch([int(ipaddress.IPv4Address(a)) for a in addresses])
+            ),
+            [3, -1, 1, 2, 0],
+        )
+
+    def test_index(self):
+        index = os.path.join(self.Dir, "index")
+        lookup = self.create(IPV6_CSV, index=index)
+        self.assertTrue(os.path.exists(os.path.join(index, "source.json")))
+
+        # The second load maps the index
+        lookup = bspump.lookup.IPGeoLookup(
+            self.App, config={"path": os.path.join(self.Dir, "db.csv"), "index": index}
+        )
+        self.App.Loop.run_until_complete(lookup.load())
+        self.assertEqual(lookup.Starts.__class__.__name__, "memmap")
+        self.assertEqual(lookup.lookup_location("2c0f:ffd8::1")["city"], "Tokyo")
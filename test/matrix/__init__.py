@@ -3,3 +3,5 @@ from .test_named_matrix import *
 from .test_geo_matrix import *
 from .test_session_matrix import *
 from .test_time_window_matrix import *
+from .test_sparse_time_window_matrix import *
+from .test_snapshot import *
@@ -66,3 +66,63 @@ class TestGeoMatrix(bspump.unittest.TestCase):
             row_, column_ = matrix.project_equirectangular(lat, lon)
             self.assertEqual(row_, row)
             self.assertEqual(column_, column)
+
+    def test_matrix_arrays(self):
+        bbox = {
+            "min_lon": 14.259097,
+            "max_lon": 14.589601,
+            "min_lat": 49.974702,
+            "max_lat": 50.160150,
+        }
+        matrix = bspump.matrix.GeoMatrix(app=self.App, bbox=bbox, resolution=1)
+        rnd = np.random.RandomState(3)
+        lats = rnd.uniform(49.9, 50.2, 200)
+        lons = rnd.uniform(14.2, 14.6, 200)
+
+        mask = matrix.is_in_boundaries_array(lats, lons)
+        self.assertEqual(
+            mask.tolist(),
+            [matrix.is_in_boundaries(lat, lon) for lat, lon in zip(lats, lons)],
+        )
+
+        rows, columns = matrix.project_equirectangular_array(lats[mask], lons[mask])
+        self.assertEqual(
+            list(zip(rows.tolist(), columns.tolist())),
+            [
+                matrix.project_equirectangular(lat, lon)
+                for lat, lon in zip(lats[mask], lons[mask])
+            ],
+        )
+
+    def test_matrix_add_points(self):
+        bbox = {
+            "min_lon": 14.259097,
+            "max_lon": 14.589601,
+            "min_lat": 49.974702,
+            "max_lat": 50.160150,
+        }
+        matrix = bspump.matrix.GeoMatrix(app=self.App, bbox=bbox, resolution=5)
+        lats = [50.0, 50.0, 50.1, 51.0]
+        lons = [14.3, 14.3, 14.5, 14.3]
+        mask = matrix.add_points(lats, lons)
+        self.assertEqual(mask.tolist(), [True, True, True, False])
+        self.assertEqual(matrix.Array[matrix.project_equirectangular(50.0, 14.3)], 2)
+        self.assertEqual(matrix.Array.sum(), 3)
+
+        matrix.add_points(lats, lons, values=[1, 2, 3, 4])
+        self.assertEqual(matrix.Array[matrix.project_equirectangular(50.0, 14.3)], 5)
+        self.assertEqual(matrix.Array[matrix.project_equirectangular(50.1, 14.5)], 4)
+
+    def test_matrix_distance_matrix(self):
+        matrix = bspump.matrix.GeoMatrix(app=self.App, resolution=100)
+        lats1, lons1 = [50.0, 48.2], [14.4, 16.4]
+        lats2, lons2 = [50.0, 52.5, 41.9], [14.4, 13.4, 12.5]
+        distances = matrix.get_gps_distance_matrix(lats1, lons1, lats2, lons2)
+        self.assertEqual(distances.shape, (2, 3))
+        for i in range(2):
+            for j in range(3):
+                self.assertAlmostEqual(
+                    distances[i, j],
+                    matrix.get_gps_distance(lats1[i], lons1[i], lats2[j], lons2[j]),
+                )
+        self.assertAlmostEqual(distances[0, 0], 0)
@@ -81,3 +81,58 @@ class TestSessionMatrix(bspump.unittest.TestCase):
         self.assertEqual(len(event), 2)
         self.assertEqual(event["event_id"], event_id)
         self.assertEqual(event["f0"], matrix.Array[index]["f0"])
+
+    def test_matrix_store_events(self):
+        dtype = [("f1", "U20"), ("f2", "i8"), ("f3", "(2,)f8")]
+        matrix = bspump.matrix.SessionMatrix(app=self.App, dtype=dtype)
+        existing = matrix.add_row("a")
+        matrix.store_event(existing, {"f1": "old", "f2": 1})
+
+        events = [
+            {"id": "a", "f2": 10},
+            {"id": "b", "f1": "bbb", "f2": 20, "f3": [1.0, 2.0]},
+            {"f1": "no id"},
+            {"id": "c", "f1": "ccc", "f0": 7},
+            {"id": "b", "f2": 21},
+        ]
+        row_indexes = matrix.store_events(events)
+
+        self.assertEqual(row_indexes[0], existing)
+        self.assertEqual(row_indexes[2], -1)
+        self.assertEqual(row_indexes[1], row_indexes[4])
+        self.assertEqual(row_indexes[1], matrix.get_row_index("b"))
+        self.assertEqual(row_indexes[3], matrix.get_row_index("c"))
+
+        self.assertEqual(matrix.decode_row(existing)["f1"], "old")
+        self.assertEqual(matrix.decode_row(existing)["f2"], 10)
+        b = matrix.decode_row(row_indexes[1])
+        self.assertEqual((b["f1"], b["f2"]), ("bbb", 21))
+        self.assertEqual(b["f3"].tolist(), [1.0, 2.0])
+        self.assertEqual(matrix.decode_row(row_indexes[3])["f2"], 0)
+
+        # Only selected keys are stored
+        matrix.store_events([{"id": "c", "f1": "x", "f2": 5}], keys=["f2"])
+        self.assertEqual(matrix.decode_row(row_indexes[3])["f1"], "ccc")
+        self.assertEqual(matrix.decode_row(row_indexes[3])["f2"], 5)
+
+    def test_matrix_decode_rows(self):
+        dtype = [("f1", "U20"), ("f2", "i8")]
+        matrix = bspump.matrix.SessionMatrix(app=self.App, dtype=dtype)
+        row_indexes = matrix.store_events(
+            [{"id": "id_{}".format(i), "f1": str(i), "f2": i} for i in range(50)]
+        )
+
+        columns = matrix.decode_rows(row_indexes[10:13])
+        self.assertEqual(columns["id"].tolist(), ["id_10", "id_11", "id_12"])
+        self.assertEqual(columns["f1"].tolist(), ["10", "11", "12"])
+        self.assertEqual(columns["f2"].tolist(), [10, 11, 12])
+
+        columns = matrix.decode_rows(row_indexes[:2], keys=["f2"])
+        self.assertEqual(sorted(columns), ["f2", "id"])
+
+    def test_matrix_store_events_without_columns(self):
+        matrix = bspump.matrix.SessionMatrix(app=self.App)
+        with self.assertRaises(TypeError):
+            matrix.store_events([{"id": "a"}])
+        with self.assertRaises(TypeError):
+            matrix.decode_rows([0])
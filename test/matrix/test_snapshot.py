@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import bspump.matrix
+import bspump.unittest
+
+
+class TestMatrixSnapshot(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.Dir = tempfile.mkdtemp()
+        self.Svc = self.App.get_service("bspump.PumpService")
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.Dir)
+        super().tearDown()
+
+    def snapshot(self, matrix, **config):
+        config["path"] = self.Dir
+        return bspump.matrix.MatrixSnapshot(self.App, matrix, config=config)
+
+    def save(self, snapshot):
+        self.App.Loop.run_until_complete(snapshot.save())
+
+    def test_session_matrix(self):
+        dtype = [("f1", "U10"), ("f2", "i8")]
+        matrix = bspump.matrix.SessionMatrix(self.App, dtype=dtype, id="Sessions")
+        matrix.store_events(
+            [{"id": "id_{}".format(i), "f1": str(i), "f2": i} for i in range(20)]
+        )
+        matrix.close_row("id_3")
+        snapshot = self.snapshot(matrix)
+        self.save(snapshot)
+        self.assertTrue(os.path.exists(os.path.join(self.Dir, "Sessions.npz")))
+
+        restored = bspump.matrix.SessionMatrix(self.App, dtype=dtype, id="Sessions2")
+        snapshot.Matrix = restored
+        self.assertTrue(snapshot.restore())
+
+        np.testing.assert_array_equal(restored.Array, matrix.Array)
+        self.assertEqual(restored.get_row_index("id_7"), matrix.get_row_index("id_7"))
+        self.assertIsNone(restored.get_row_index("id_3"))
+        self.assertEqual(restored.ClosedRows.get_rows(), matrix.ClosedRows.get_rows())
+        # The restored matrix continues
+        self.assertEqual(restored.add_row("new"), matrix.add_row("new"))
+
+    def test_time_window_matrix(self):
+        matrix = bspump.matrix.TimeWindowMatrix(
+            self.App, start_time=1000, resolution=10, columns=5, id="TW"
+        )
+        row = matrix.add_row("a")
+        matrix.Array[row, 2] = 42
+        matrix.add_column()
+        self.Svc.add_matrix(matrix)
+        self.save(self.snapshot("TW"))
+
+        restored = bspump.matrix.TimeWindowMatrix(
+            self.App, start_time=5000, resolution=10, columns=5, id="TW"
+        )
+        self.Svc.Matrixes["TW"] = restored
+        self.snapshot("TW")
+
+        self.assertEqual(restored.Start, matrix.Start)
+        self.assertEqual(restored.TimeConfig.get_end(), matrix.TimeConfig.get_end())
+        self.assertEqual(restored.Array[restored.get_row_index("a"), 1], 42)
+        self.assertEqual(
+            restored.WarmingUpCount.WUC[row], matrix.WarmingUpCount.WUC[row]
+        )
+
+    def test_sparse_time_window_matrix(self):
+        matrix = bspump.matrix.SparseTimeWindowMatrix(
+            self.App, start_time=1000, resolution=10, columns=5, id="Sparse"
+        )
+        a = matrix.add_row("a")
+        b = matrix.add_row("b")
+        matrix.add(a, 1, 3)
+        matrix.add(b, 4, 5)
+        matrix.close_row("a")
+        snapshot = self.snapshot(matrix)
+        self.save(snapshot)
+
+        restored = bspump.matrix.SparseTimeWindowMatrix(
+            self.App, start_time=1000, resolution=10, columns=5, id="Sparse2"
+        )
+        snapshot.Matrix = restored
+        self.assertTrue(snapshot.restore())
+        np.testing.assert_array_equal(restored.to_dense(), matrix.to_dense())
+        self.assertEqual(restored.get_row_index("b"), b)
+        self.assertEqual(restored.add_row("c"), a)
+
+    def test_mismatch(self):
+        matrix = bspump.matrix.SessionMatrix(self.App, dtype=[("f", "i8")], id="M")
+        matrix.add_row("a")
+        snapshot = self.snapshot(matrix)
+        self.save(snapshot)
+
+        other = bspump.matrix.SessionMatrix(self.App, dtype=[("g", "f8")], id="M2")
+        snapshot.Matrix = other
+        self.assertFalse(snapshot.restore())
+        self.assertIsNone(other.get_row_index("a"))
+
+    def test_geo_matrix(self):
+        matrix = bspump.matrix.GeoMatrix(self.App, resolution=100, id="Geo")
+        matrix.Array[3, 4] = 7
+        snapshot = self.snapshot(matrix)
+        self.save(snapshot)
+
+        restored = bspump.matrix.GeoMatrix(self.App, resolution=100, id="Geo2")
+        snapshot.Matrix = restored
+        self.assertTrue(snapshot.restore())
+        self.assertEqual(restored.Array[3, 4], 7)
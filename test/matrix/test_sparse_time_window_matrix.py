@@ -0,0 +1,89 @@
+import numpy as np
+
+import bspump.matrix
+import bspump.unittest
+
+
+class TestSparseTimeWindowMatrix(bspump.unittest.TestCase):
+    def create(self, **kwargs):
+        return bspump.matrix.SparseTimeWindowMatrix(
+            app=self.App, start_time=1000, resolution=10, columns=5, **kwargs
+        )
+
+    def test_rows(self):
+        matrix = self.create()
+        a = matrix.add_row("a")
+        b = matrix.add_row("b")
+        self.assertEqual((a, b), (0, 1))
+        self.assertEqual(matrix.get_row_index("b"), b)
+        self.assertEqual(matrix.get_row_name(a), "a")
+
+        matrix.set(a, 1, 5)
+        matrix.set(b, 1, 7)
+        self.assertTrue(matrix.close_row("a"))
+        self.assertFalse(matrix.close_row("a"))
+        self.assertTrue(np.isnan(matrix.get(a, 1)))
+        self.assertEqual(matrix.get(b, 1), 7)
+
+        # The index of the closed row is reused
+        self.assertEqual(matrix.add_row("c"), a)
+        self.assertEqual(matrix.Rows, 2)
+
+    def test_columns(self):
+        matrix = self.create()
+        # The window spans from 960 to 1010
+        self.assertIsNone(matrix.get_column(960))
+        self.assertIsNone(matrix.get_column(1010))
+        self.assertEqual(matrix.get_column(961), 0)
+        self.assertEqual(matrix.get_column(1009), 4)
+        self.assertEqual(
+            matrix.get_columns([950, 975, 1009, 2000]).tolist(), [-1, 1, 4, -1]
+        )
+
+    def test_advance(self):
+        matrix = self.create()
+        a = matrix.add_row("a")
+        matrix.set(a, 0, 1)
+        matrix.set(a, 4, 2)
+        self.assertEqual(matrix.WarmingUpCount.WUC[a], 5)
+
+        self.assertEqual(matrix.advance(1020), 2)
+        self.assertEqual(matrix.Start, 1030)
+        self.assertEqual(matrix.WarmingUpCount.WUC[a], 3)
+        # The first column was dropped, the rest is shifted
+        self.assertEqual(matrix.get(a, 2), 2)
+        self.assertEqual(matrix.row_count().tolist(), [1])
+
+    def test_reductions(self):
+        matrix = self.create()
+        a = matrix.add_row("a")
+        b = matrix.add_row("b")
+        c = matrix.add_row("c")
+        matrix.add_many([a, a, a, b], [0, 0, 3, 2], [1, 2, 4, 8])
+        matrix.add(b, 2, 1)
+        matrix.add_many([c], [-1], 5)
+
+        self.assertEqual(matrix.get(a, 0), 3)
+        self.assertEqual(matrix.row_count().tolist(), [2, 1, 0])
+        self.assertEqual(matrix.row_sum().tolist(), [7, 9, 0])
+        np.testing.assert_array_equal(matrix.row_max(), [4, 9, np.nan])
+        np.testing.assert_array_equal(matrix.row_min(), [3, 9, np.nan])
+        np.testing.assert_array_equal(matrix.row_mean(), [3.5, 9, np.nan])
+
+        dense = matrix.to_dense()
+        self.assertEqual(dense.shape, (3, 5))
+        self.assertEqual(dense[a, 3], 4)
+        self.assertTrue(np.isnan(dense[c]).all())
+
+    def test_many_cells(self):
+        matrix = self.create(dtype="i8")
+        rows = [matrix.add_row(str(i)) for i in range(100)]
+        for row in rows:
+            matrix.add(row, row % 5, row)
+        matrix.close_row("50")
+
+        dense = np.zeros((100, 5))
+        for row in rows:
+            if row != 50:
+                dense[row, row % 5] = row
+        np.testing.assert_array_equal(matrix.row_sum(), dense.sum(axis=1))
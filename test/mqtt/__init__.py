@@ -0,0 +1 @@
+from .test_tap import *
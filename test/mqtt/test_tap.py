@@ -0,0 +1,105 @@
+import asyncio
+import json
+
+import bspump
+import bspump.abc.source
+import bspump.mqtt.service
+import bspump.unittest
+
+
+class FakeMQTTConnection(object):
+    def __init__(self):
+        self.Published = []
+
+    def publish_to_topic(self, topic, payload, qos=0, retain=False):
+        self.Published.append((topic, json.loads(payload)))
+
+
+class IdleSource(bspump.abc.source.Source):
+    async def main(self):
+        pass
+
+
+class Enricher(bspump.Processor):
+    def process(self, context, event):
+        event["enriched"] = True
+        return event
+
+
+class ListSink(bspump.Sink):
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id=id, config=config)
+        self.Events = []
+
+    def process(self, context, event):
+        # Modifies the event after the tap
+        event["sunk"] = True
+        self.Events.append(event)
+
+
+class TestMQTTTap(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.Service = bspump.mqtt.service.MQTTService(
+            self.App, service_name="bspump.MQTTServiceTest"
+        )
+        self.Service.Connection = FakeMQTTConnection()
+        self.Service.TapRate = 0
+
+        svc = self.App.get_service("bspump.PumpService")
+        self.Pipeline = bspump.Pipeline(self.App, "TapPipeline")
+        self.Pipeline.MQTTService = self.Service
+        self.Pipeline.build(
+            IdleSource(self.App, self.Pipeline),
+            Enricher(self.App, self.Pipeline, id="Enricher"),
+            ListSink(self.App, self.Pipeline),
+        )
+        svc.add_pipeline(self.Pipeline)
+        self.Pipeline._evaluate_ready()
+
+    def _run(self, events):
+        async def run():
+            for event in events:
+                await self.Pipeline.process(event)
+            task = asyncio.ensure_future(self.Service._publish_taps())
+            await asyncio.sleep(0.01)
+            task.cancel()
+
+        self.App.Loop.run_until_complete(run())
+
+    def test_no_subscription(self):
+        self._run([{"n": i} for i in range(3)])
+        self.assertEqual(self.Pipeline.PublishingProcessors, {})
+        self.assertEqual(self.Service.Connection.Published, [])
+
+    def test_tap(self):
+        self.Service.subscribe_events("TapPipeline", "Enricher", 2)
+        self.assertEqual(self.Pipeline.PublishingProcessors, {"Enricher": 2})
+
+        self._run([{"n": i} for i in range(4)])
+
+        # The subscription is removed, when it is exhausted
+        self.assertEqual(self.Pipeline.PublishingProcessors, {})
+
+        published = self.Service.Connection.Published
+        self.assertEqual(
+            [topic for topic, _ in published], ["/c/TapPipeline/c/Enricher/events"] * 2
+        )
+        # The tap is a copy of the event at the processor
+        self.assertEqual(published[0][1]["data"], {"n": 0, "enriched": True})
+        self.assertEqual(published[1][1]["remaining_subscription_count"], 1)
+
+    def test_sampling(self):
+        self.Service.subscribe_events("TapPipeline", "Enricher", 2, sample=3)
+        self._run([{"n": i} for i in range(9)])
+
+        published = self.Service.Connection.Published
+        self.assertEqual([data["data"]["n"] for _, data in published], [2, 5])
+
+    def test_ring_buffer(self):
+        self.Service.TapBuffer = type(self.Service.TapBuffer)(maxlen=2)
+        self.Service.subscribe_events("TapPipeline", "Enricher", 5)
+        self._run([{"n": i} for i in range(5)])
+
+        published = self.Service.Connection.Published
+        self.assertEqual([data["data"]["n"] for _, data in published], [3, 4])
@@ -0,0 +1 @@
+from .test_source import *
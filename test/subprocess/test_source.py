@@ -0,0 +1,106 @@
+import asyncio
+
+import bspump
+import bspump.subprocess
+import bspump.unittest
+
+
+class ListSink(bspump.Sink):
+    def __init__(self, app, pipeline, id=None, config=None):
+        super().__init__(app, pipeline, id=id, config=config)
+        self.Events = []
+
+    def process(self, context, event):
+        self.Events.append(event)
+
+
+class TestSubProcessSource(bspump.unittest.TestCase):
+    def build(self, config):
+        self.Pipeline = bspump.Pipeline(self.App, "SubProcessPipeline")
+        self.Source = bspump.subprocess.SubProcessSource(
+            self.App, self.Pipeline, config=config
+        )
+        self.Sink = ListSink(self.App, self.Pipeline)
+        self.Pipeline.build(self.Source, self.Sink)
+        self.Pipeline._evaluate_ready()
+
+    def test_workers(self):
+        self.build(
+            {
+                "command": "printf 'a\\nbb\\nccc'",
+                "workers": 3,
+                "chunk_size": 2,
+            }
+        )
+        self.App.Loop.run_until_complete(asyncio.wait_for(self.Source.main(), 5))
+
+        self.assertEqual(
+            sorted(self.Sink.Events), [b"a\n"] * 3 + [b"bb\n"] * 3 + [b"ccc"] * 3
+        )
+        self.assertEqual(self.Source.Processes, {})
+
+    def test_line_len_limit(self):
+        self.build(
+            {
+                "command": "printf 'short\\n%0100d\\nnext\\n' 0",
+                "chunk_size": 16,
+                "line_len_limit": 32,
+            }
+        )
+        self.App.Loop.run_until_complete(asyncio.wait_for(self.Source.main(), 5))
+        self.assertEqual(self.Sink.Events, [b"short\n", b"next\n"])
+
+    def test_restart_backoff(self):
+        self.build(
+            {
+                "command": "echo x; exit 3",
+                "restart_delay": 0.05,
+                "restart_max_delay": 0.1,
+            }
+        )
+
+        async def run():
+            task = asyncio.ensure_future(self.Source.main())
+            await asyncio.sleep(0.5)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        self.App.Loop.run_until_complete(run())
+
+        # Delays 0.05, 0.1, 0.1, ... give a handful of restarts, not one per event loop iteration
+        restarts = len(self.Sink.Events) - 1
+        self.assertGreaterEqual(restarts, 2)
+        self.assertLessEqual(restarts, 8)
+        self.assertEqual(self.Source.Processes, {})
+
+    def test_stdin(self):
+        self.build({"command": "cat", "workers": 2, "stdin": True})
+
+        async def run():
+            task = asyncio.ensure_future(self.Source.main())
+            for i in range(10):
+                await self.Source.put("{}\n".format(i).encode("ascii"))
+            for _ in range(100):
+                if len(self.Sink.Events) == 10:
+                    break
+                await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        self.App.Loop.run_until_complete(run())
+        self.assertEqual(
+            sorted(self.Sink.Events),
+            sorted("{}\n".format(i).encode("ascii") for i in range(10)),
+        )
+        self.assertEqual(self.Source.Processes, {})
+
+    def test_stdin_exit(self):
+        self.build({"command": "head -n 1", "stdin": True})
+
+        async def run():
+            task = asyncio.ensure_future(self.Source.main())
+            await self.Source.put(b"first\nsecond\n")
+            await asyncio.wait_for(task, 5)
+
+        self.App.Loop.run_until_complete(run())
+        self.assertEqual(self.Sink.Events, [b"first\n"])
@@ -0,0 +1,81 @@
+import bspump.asab.metrics
+import bspump.unittest
+
+
+class TestMetrics(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.MetricsService = self.App.get_service("asab.MetricsService")
+
+    def test_counter_measured_at_flush(self):
+        counter = self.MetricsService.create_counter("test.counter", reset=False)
+        counter.add("events", 3)
+        counter.add("events", 2)
+        counter.sub("events", 1)
+
+        counter.flush(1234.0)
+        field = counter.Storage["fieldset"][0]
+        self.assertEqual({"events": 4}, field["values"])
+        self.assertEqual(1234.0, field["measured_at"])
+
+    def test_histogram_buckets(self):
+        histogram = self.MetricsService.create_histogram(
+            "test.histogram", buckets=[1, 5, 10]
+        )
+        for value in [0.5, 1, 3, 7, 100]:
+            histogram.set("duration", value)
+
+        histogram.flush(1234.0)
+        values = histogram.Storage["fieldset"][0]["values"]
+        self.assertEqual(
+            {
+                1.0: {"duration": 2},
+                5.0: {"duration": 3},
+                10.0: {"duration": 4},
+                float("inf"): {"duration": 5},
+            },
+            values["buckets"],
+        )
+        self.assertEqual(5, values["count"])
+        self.assertEqual(111.5, values["sum"])
+
+    def test_histogram_dynamic_tags(self):
+        histogram = self.MetricsService.create_histogram(
+            "test.histogram.dynamic", buckets=[1, 5], dynamic_tags=True
+        )
+        histogram.set("duration", 2, tags={"method": "GET"})
+        histogram.set("duration", 0.1, tags={"method": "GET"})
+
+        field = histogram.locate_field({"method": "GET"})
+        self.assertEqual(
+            {1.0: {"duration": 1}, 5.0: {"duration": 2}, float("inf"): {"duration": 2}},
+            field["actuals"]["buckets"],
+        )
+
+    def test_quantile_sketch(self):
+        sketch = self.MetricsService.create_quantile_sketch(
+            "test.sketch", quantiles=(0.5, 0.99), relative_accuracy=0.01
+        )
+        for i in range(1, 1001):
+            sketch.add("duration", i / 1000.0)
+
+        quantiles = sketch.quantiles("duration")
+        self.assertEqual(1000, quantiles["duration.count"])
+        self.assertAlmostEqual(0.5, quantiles["duration.p50"], delta=0.5 * 0.01)
+        self.assertAlmostEqual(0.99, quantiles["duration.p99"], delta=0.99 * 0.01)
+
+        sketch.flush(1234.0)
+        field = sketch.Storage["fieldset"][0]
+        self.assertEqual(1000, field["values"]["duration.count"])
+        self.assertEqual({}, sketch.quantiles("duration"))
+
+    def test_sketch_merge(self):
+        a = bspump.asab.metrics.DDSketch()
+        b = bspump.asab.metrics.DDSketch()
+        for i in range(1, 501):
+            a.add(float(i))
+            b.add(float(i + 500))
+        a.merge(b)
+
+        self.assertEqual(1000, a.Count)
+        self.assertAlmostEqual(500.0, a.quantile(0.5), delta=500.0 * 0.01)
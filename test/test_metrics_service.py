@@ -1,3 +1,6 @@
+import asyncio
+import time
+
 import bspump.common
 from bspump import Processor, Pipeline
 from bspump.trigger import PubSubTrigger
@@ -61,3 +64,52 @@ class TestMetricsService(bspump.unittest.ProcessorTestCase):
 
         self.assertEqual([({}, "ok")], self.Pipeline.Sink.Output)
         self.assertEqual(0, self.ErrorCount)
+
+    def test_latency_tracing(self):
+        svc = self.App.get_service("bspump.PumpService")
+
+        self.Pipeline = WarningPipeline(self.App, config={"latency_sample": 2})
+
+        self.Pipeline.Source.Input = [(None, "ok")] * 10
+        svc.add_pipeline(self.Pipeline)
+        self.App.run()
+
+        self.assertEqual(10, len(self.Pipeline.Sink.Output))
+
+        # Metrics are flushed when the application exits
+        values = self.Pipeline.LatencySketch.Storage["fieldset"][0]["values"]
+        self.assertEqual(5, values["latency.count"])
+        self.assertGreaterEqual(values["latency.p99"], 0.0)
+        self.assertEqual(
+            {"RaisingProcessor", "UnitTestSink"},
+            set(self.Pipeline.rest_get()["Latency"]["Processors"].keys()),
+        )
+
+    def test_latency_stamped_before_throttling(self):
+        pipeline = Pipeline(self.App, "LatencyPipeline", config={"latency_sample": 1})
+        source = UnitTestSource(self.App, pipeline)
+        sink = UnitTestSink(self.App, pipeline)
+        pipeline.build(source, sink)
+        pipeline._evaluate_ready()
+
+        # The time the event waits for a throttled pipeline is a part of its latency
+        pipeline.throttle("test", True)
+        task = self.App.Loop.create_task(source.process("throttled"))
+        self.App.Loop.run_until_complete(asyncio.sleep(0.05))
+        unthrottled_at = time.perf_counter()
+        pipeline.throttle("test", False)
+        self.App.Loop.run_until_complete(task)
+
+        context, event = sink.Output[0]
+        self.assertEqual("throttled", event)
+        self.assertGreaterEqual(unthrottled_at - context["pipeline.received_at"], 0.05)
+
+    def test_latency_direct_source(self):
+        pipeline = Pipeline(self.App, "DirectPipeline", config={"latency_sample": 1})
+        source = bspump.common.DirectSource(self.App, pipeline)
+        sink = UnitTestSink(self.App, pipeline)
+        pipeline.build(source, sink)
+
+        source.put({}, "direct")
+        context, event = sink.Output[0]
+        self.assertIn("pipeline.received_at", context)
@@ -0,0 +1,111 @@
+import asyncio
+import gc
+
+import bspump
+import bspump.unittest
+
+
+class Receiver(object):
+    def __init__(self):
+        self.Messages = []
+
+    def on_message(self, message_type, *args, **kwargs):
+        self.Messages.append((message_type, args, kwargs))
+
+    async def on_message_async(self, message_type, *args, **kwargs):
+        self.Messages.append((message_type, args, kwargs))
+
+
+class TestPubSub(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.PubSub = self.App.PubSub
+
+    def _run_loop(self):
+        self.App.Loop.run_until_complete(asyncio.sleep(0.01))
+
+    def test_publish(self):
+        receiver = Receiver()
+        self.PubSub.subscribe("Test.message!", receiver.on_message)
+        self.PubSub.subscribe("Test.message!", receiver.on_message_async)
+
+        async def publish():
+            # Coroutine subscribers are delivered by a task in the running loop
+            self.PubSub.publish("Test.message!", 1, key="value")
+            self.assertEqual(
+                [("Test.message!", (1,), {"key": "value"})], receiver.Messages
+            )
+            await asyncio.sleep(0.01)
+
+        self.App.Loop.run_until_complete(publish())
+        self.assertEqual(2, len(receiver.Messages))
+
+    def test_dispatch_rebuilt_on_unsubscribe(self):
+        receiver = Receiver()
+        self.PubSub.subscribe("Test.message!", receiver.on_message)
+        self.PubSub.publish("Test.message!")
+
+        self.PubSub.unsubscribe("Test.message!", receiver.on_message)
+        self.PubSub.publish("Test.message!")
+
+        self.assertEqual(1, len(receiver.Messages))
+        self.assertNotIn("Test.message!", self.PubSub.Subscribers)
+
+    def test_subscriber_garbage_collected(self):
+        receiver = Receiver()
+        self.PubSub.subscribe("Test.message!", receiver.on_message)
+        self.PubSub.publish("Test.message!")
+
+        del receiver
+        gc.collect()
+
+        self.assertNotIn("Test.message!", self.PubSub.Subscribers)
+        self.PubSub.publish("Test.message!")
+
+    def test_coalesce(self):
+        receiver = Receiver()
+        self.PubSub.subscribe("Test.on!", receiver.on_message)
+        self.PubSub.subscribe("Test.off!", receiver.on_message)
+
+        for _ in range(5):
+            self.PubSub.publish("Test.on!", coalesce="Test.state")
+            self.PubSub.publish("Test.off!", coalesce="Test.state")
+        self.PubSub.publish("Test.on!", state=True, coalesce="Test.state")
+        self.assertEqual([], receiver.Messages)
+
+        self._run_loop()
+        self.assertEqual([("Test.on!", (), {"state": True})], receiver.Messages)
+
+
+class TestPipelineReadiness(bspump.unittest.TestCase):
+    def test_two_pipelines_flip_in_one_iteration(self):
+        pipeline_a = bspump.Pipeline(self.App, "PipelineA")
+        pipeline_b = bspump.Pipeline(self.App, "PipelineB")
+        # Pipelines reporting to one bus, such as the application PubSub
+        pipeline_b.PubSub = pipeline_a.PubSub
+
+        receiver = Receiver()
+        pipeline_a.PubSub.subscribe("bspump.pipeline.ready!", receiver.on_message)
+        pipeline_a.PubSub.subscribe("bspump.pipeline.not_ready!", receiver.on_message)
+
+        # Both pipelines are ready, B is throttled
+        pipeline_a._evaluate_ready()
+        pipeline_b._evaluate_ready()
+        pipeline_b.throttle("test", True)
+        self.App.Loop.run_until_complete(asyncio.sleep(0.01))
+        receiver.Messages = []
+
+        pipeline_a.throttle("test", True)
+        pipeline_b.throttle("test", False)
+        self.App.Loop.run_until_complete(asyncio.sleep(0.01))
+
+        self.assertEqual(
+            sorted(
+                (message_type, kwargs["pipeline"].Id)
+                for message_type, _, kwargs in receiver.Messages
+            ),
+            [
+                ("bspump.pipeline.not_ready!", "PipelineA"),
+                ("bspump.pipeline.ready!", "PipelineB"),
+            ],
+        )
@@ -0,0 +1,101 @@
+import asyncio
+
+import bspump.unittest
+from bspump.scheduler import Batcher
+
+
+class TestDeadlineScheduler(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.Scheduler = self.App.get_service("bspump.DeadlineScheduler")
+        self.Fired = []
+
+    def _on_deadline(self, name):
+        self.Fired.append((name, self.App.Loop.time()))
+
+    def _sleep(self, delay):
+        self.App.Loop.run_until_complete(asyncio.sleep(delay))
+
+    def test_deadline_order(self):
+        start = self.App.Loop.time()
+        self.Scheduler.schedule(0.05, self._on_deadline, "second")
+        self.Scheduler.schedule(0.02, self._on_deadline, "first")
+        self._sleep(0.1)
+
+        self.assertEqual(["first", "second"], [name for name, _ in self.Fired])
+        self.assertGreaterEqual(self.Fired[0][1] - start, 0.02)
+        self.assertGreaterEqual(self.Fired[1][1] - start, 0.05)
+        self.assertEqual(0, self.Scheduler.Pending)
+
+    def test_deadline_cancel(self):
+        deadline = self.Scheduler.schedule(0.02, self._on_deadline, "cancelled")
+        deadline.cancel()
+        deadline.cancel()
+        self.Scheduler.schedule(0.03, self._on_deadline, "kept")
+        self._sleep(0.1)
+
+        self.assertEqual(["kept"], [name for name, _ in self.Fired])
+        self.assertEqual(0, self.Scheduler.Pending)
+
+    def test_deadline_beyond_revolution(self):
+        # 0.1 seconds is longer than a revolution of a wheel with 4 slots
+        self.Scheduler.Wheel = [[] for _ in range(4)]
+        start = self.App.Loop.time()
+        self.Scheduler.schedule(0.1, self._on_deadline, "late")
+        self._sleep(0.15)
+
+        self.assertEqual(["late"], [name for name, _ in self.Fired])
+        self.assertGreaterEqual(self.Fired[0][1] - start, 0.1)
+
+    def test_deadline_reschedule_from_callback(self):
+        def reschedule(name):
+            self._on_deadline(name)
+            if len(self.Fired) < 3:
+                self.Scheduler.schedule(0.01, reschedule, name)
+
+        self.Scheduler.schedule(0.01, reschedule, "repeated")
+        self._sleep(0.1)
+
+        self.assertEqual(3, len(self.Fired))
+
+    def test_distant_deadline_sleeps(self):
+        # The loop is woken up only at the earliest deadline, not every resolution step
+        wakeups = []
+        advance = self.Scheduler._advance
+
+        def counting_advance():
+            wakeups.append(self.App.Loop.time())
+            advance()
+
+        self.Scheduler._advance = counting_advance
+        self.Scheduler.schedule(0.2, self._on_deadline, "distant")
+        self.Scheduler.schedule(0.03, self._on_deadline, "near")
+        self._sleep(0.25)
+
+        self.assertEqual(["near", "distant"], [name for name, _ in self.Fired])
+        self.assertEqual(2, len(wakeups))
+
+
+class TestBatcher(bspump.unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.Batches = []
+        self.Batcher = Batcher(self.App, self.Batches.append, 3, 0.05)
+
+    def test_batch_size(self):
+        for item in range(7):
+            self.Batcher.append(item)
+
+        self.assertEqual([[0, 1, 2], [3, 4, 5]], self.Batches)
+        self.assertEqual(1, len(self.Batcher))
+
+    def test_batch_timeout(self):
+        self.Batcher.append(1)
+        self.App.Loop.run_until_complete(asyncio.sleep(0.1))
+
+        self.assertEqual([[1]], self.Batches)
+        self.assertIsNone(self.Batcher.Deadline)
+
+    def test_flush_empty(self):
+        self.Batcher.flush()
+        self.assertEqual([], self.Batches)